@@ -22,7 +22,7 @@ class DiscoveryAgent:
 
         # Get trending posts
         keywords = user_preferences.preferred_keywords or ["tech", "innovation", "AI"]
-        trending_posts = self.circlo_api.get_trending_posts(keywords)
+        trending_posts = self.circlo_api.get_trending_posts_fanout(keywords)
 
         # Analyze multiple aspects
         trend_analysis = self._analyze_comprehensive_trends(trending_posts)
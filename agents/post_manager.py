@@ -1,43 +1,200 @@
-from typing import List, Dict  # Pastikan import ini ada
+import time
+from concurrent.futures import Future
+from datetime import datetime
+from typing import List, Dict, Optional  # Pastikan import ini ada
+from config.settings import settings
 from models.content_models import GeneratedContent, PostResult
+from services.bounded_executor import run_with_deadlines
 from services.circlo_api import CircloAPI
+from services.dedupe_store import content_fingerprints, content_fingerprint
 
 
 class PostManager:
     def __init__(self):
         self.circlo_api = CircloAPI()
+        self.fingerprints = content_fingerprints
 
-    def post_content_to_circlo(self, content_list: List[GeneratedContent]) -> List[PostResult]:
+    def post_content_to_circlo(self, content_list: List[GeneratedContent],
+                               concurrency: Optional[int] = None,
+                               deadline: Optional[float] = None) -> List[PostResult]:
         """Post generated content to Circlo"""
         print("📮 Posting content to Circlo...")
 
-        results = []
+        already_posted = [self._is_already_posted(content) for content in content_list]
+        results = iter(self.post_batch([content for content, posted in zip(content_list, already_posted)
+                                        if not posted], concurrency, deadline))
+        # One result per input, in input order: duplicates get a skipped result in place
+        return [self._skipped_result(content) if posted else next(results)
+                for content, posted in zip(content_list, already_posted)]
 
-        for content in content_list:
-            post_data = {
-                "media_type": content.content_type,
-                "media_source": content.media_source,
-                "caption": content.caption,
-                "keywords": content.keywords[:8],  # Limit to 8 keywords
-                "niche": "Tech Reviewer"  # Default niche
-            }
+    def post_batch(self, content_list: List[GeneratedContent],
+                   concurrency: Optional[int] = None,
+                   deadline: Optional[float] = None,
+                   keep_claims: bool = False) -> List[PostResult]:
+        """Post every item, returning one result per item in input order.
+
+        A failed post frees its generation claim unless `keep_claims` is set, as the
+        outbox does for entries it will retry; it calls release_claim() when it gives up.
+        """
+        concurrency = concurrency or settings.POST_CONCURRENCY
+        deadline = deadline or settings.POST_DEADLINE_SECONDS
+        return self._post_with_deadlines(content_list, concurrency, deadline, keep_claims)
+
+    def _post_with_deadlines(self, content_list: List[GeneratedContent],
+                             concurrency: int, deadline: float, keep_claims: bool = False) -> List[PostResult]:
+        """Post with at most `concurrency` posts in flight, keeping input order.
+
+        Every batch, even a single post, runs on worker threads so a create_post
+        fallback chain cannot hold the caller past `deadline`.
+        """
+        if concurrency > 1 and len(content_list) > 1:
+            print(f"   ⚡ Posting {len(content_list)} pieces with concurrency {concurrency}")
+
+        return run_with_deadlines(lambda content: self._post_single(content, deadline, keep_claims),
+                                  content_list, concurrency, deadline,
+                                  on_timeout=lambda content, future: self._timed_out_result(content, future, deadline),
+                                  thread_name_prefix="circlo-post")
+
+    def skip_if_posted(self, content: GeneratedContent) -> Optional[PostResult]:
+        """A skipped result for content that was already posted, otherwise None"""
+        return self._skipped_result(content) if self._is_already_posted(content) else None
+
+    def queued_result(self, content: GeneratedContent) -> PostResult:
+        """Result for content the outbox has not delivered yet"""
+        return PostResult(
+            success=False,
+            post_id="",
+            content_type=content.content_type,
+            posted_at=datetime.now(),
+            engagement_metrics={},
+            status="queued",
+            content_id=self.fingerprint(content)
+        )
+
+    def _is_already_posted(self, content: GeneratedContent) -> bool:
+        """Whether content's fingerprint was already posted (logged and counted as a skip)"""
+        if not self.is_posted(content):
+            return False
+        self.fingerprints.record_skip()
+        print(f"♻️ Skipping already posted {content.content_type}: {content.caption[:50]}...")
+        return True
+
+    def fingerprint(self, content: GeneratedContent) -> str:
+        """Content fingerprint, also used as the post's idempotency key"""
+        return content_fingerprint(content.content_type, content.caption, content.keywords, content.media_prompt)
+
+    def is_posted(self, content: GeneratedContent) -> bool:
+        return self.fingerprints.contains(self.fingerprint(content), "posted")
+
+    def find_posted(self, content: GeneratedContent) -> Optional[PostResult]:
+        """Look content up on Circlo and record it as posted if it is there; raises if the lookup failed"""
+        post_id = self.circlo_api.find_post(self._build_post_data(content))
+        if not post_id:
+            return None
+
+        fingerprint = self.fingerprint(content)
+        self.fingerprints.add(fingerprint, "posted")
+        self.fingerprints.commit(fingerprint, "generated")
+        print(f"🔎 Found {content.content_type} already on Circlo (ID: {post_id})")
+        return PostResult(
+            success=True,
+            post_id=post_id,
+            content_type=content.content_type,
+            posted_at=datetime.now(),
+            engagement_metrics={},
+            content_id=fingerprint
+        )
+
+    def release_claim(self, content: GeneratedContent):
+        """Let the factories produce this content again"""
+        self.fingerprints.release(self.fingerprint(content), "generated")
+
+    def _post_single(self, content: GeneratedContent, deadline: Optional[float] = None,
+                     keep_claim: bool = False) -> PostResult:
+        """Post one piece of content and report the outcome; retries stop at `deadline` seconds"""
+        deadline_at = time.monotonic() + deadline if deadline else None
+        result = self.circlo_api.create_post(self._build_post_data(content), deadline_at)
+
+        # Settle the factory's tentative claim: kept once published, freed if this attempt
+        # failed and nobody will retry it
+        fingerprint = self.fingerprint(content)
+        result.content_id = fingerprint
+        if result.success:
+            self.fingerprints.add(fingerprint, "posted")
+            self.fingerprints.commit(fingerprint, "generated")
+            print(f"✅ Successfully posted {content.content_type} (ID: {result.post_id})")
+        else:
+            if not keep_claim:
+                self.release_claim(content)
+            print(f"❌ Failed to post {content.content_type}")
+
+        return result
+
+    def _build_post_data(self, content: GeneratedContent) -> Dict:
+        """Build the create_post request for a piece of content"""
+        return {
+            "media_type": content.content_type,
+            "media_source": content.media_source,
+            "caption": content.caption,
+            "keywords": content.keywords[:8],  # Limit to 8 keywords
+            "niche": "Tech Reviewer",  # Default niche
+            "idempotency_key": self.fingerprint(content)
+        }
+
+    def _skipped_result(self, content: GeneratedContent) -> PostResult:
+        """Result for content that was not posted because it already had been"""
+        return PostResult(
+            success=False,
+            post_id="",
+            content_type=content.content_type,
+            posted_at=datetime.now(),
+            engagement_metrics={},
+            status="skipped",
+            content_id=self.fingerprint(content)
+        )
+
+    def _timed_out_result(self, content: GeneratedContent, future: Optional[Future],
+                          deadline: float) -> PostResult:
+        """Result for a post that did not finish before its deadline.
 
-            result = self.circlo_api.create_post(post_data)
-            results.append(result)
+        A post that never started is a plain failure. One still in flight may yet
+        succeed, so it is reported as "unknown": its fingerprint is recorded if it
+        does, and the next attempt reconciles with is_posted() instead of reposting.
+        """
+        if future is None:
+            print(f"⏱️ Posting {content.content_type} never started within the batch deadline")
+            status = "failed"
+        else:
+            print(f"⏱️ Posting {content.content_type} exceeded {deadline}s deadline, outcome unknown")
+            future.add_done_callback(lambda done: self._log_late_outcome(content, done))
+            status = "unknown"
 
-            if result.success:
-                print(f"✅ Successfully posted {content.content_type} (ID: {result.post_id})")
-            else:
-                print(f"❌ Failed to post {content.content_type}")
+        return PostResult(
+            success=False,
+            post_id="",
+            content_type=content.content_type,
+            posted_at=datetime.now(),
+            engagement_metrics={},
+            status=status,
+            content_id=self.fingerprint(content)
+        )
 
-        return results
+    def _log_late_outcome(self, content: GeneratedContent, future: Future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        result = future.result()
+        outcome = f"posted (ID: {result.post_id})" if result.success else "failed"
+        print(f"⏱️ Timed-out {content.content_type} post finished late: {outcome}")
 
     def generate_analytics_report(self,
                                   content_created: List[GeneratedContent],
                                   post_results: List[PostResult]) -> Dict:
         """Generate analytics report for the content cycle"""
         successful_posts = [r for r in post_results if r.success]
-        failed_posts = [r for r in post_results if not r.success]
+        unknown_posts = [r for r in post_results if r.status == "unknown"]
+        skipped_posts = [r for r in post_results if r.status == "skipped"]
+        queued_posts = [r for r in post_results if r.status == "queued"]
+        failed_posts = [r for r in post_results if r.status == "failed"]
 
         total_viral_score = sum(content.viral_score for content in content_created)
         avg_viral_score = total_viral_score / len(content_created) if content_created else 0
@@ -49,7 +206,12 @@ class PostManager:
                 "total_content_created": len(content_created),
                 "successful_posts": len(successful_posts),
                 "failed_posts": len(failed_posts),
-                "success_rate": len(successful_posts) / len(post_results) if post_results else 0,
+                "unknown_posts": len(unknown_posts),
+                "skipped_posts": len(skipped_posts),
+                "queued_posts": len(queued_posts),
+                # Skipped and still-queued posts have no outcome yet, so they don't count either way
+                "success_rate": (len(successful_posts) / (len(post_results) - len(skipped_posts) - len(queued_posts))
+                                 if len(post_results) > len(skipped_posts) + len(queued_posts) else 0),
                 "average_viral_score": avg_viral_score,
                 "total_trends_used": len(set([kw for content in content_created for kw in content.trend_alignment]))
             },
@@ -1,46 +1,101 @@
-from typing import List, Dict
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import List, Dict, Optional
+from config.settings import settings
 from models.series_models import Series, SeriesEpisode
 from models.content_models import GeneratedContent
-from services.gemini_media_api import GeminiMediaAPI
+from services.dedupe_store import content_fingerprints, content_fingerprint
+from services.media_router import media_router
 import random
 from datetime import datetime
 
 
 class SeriesFactory:
-    """Series Factory for producing AI-generated 60-second episodes"""
+    """Series Factory for producing AI-generated short video episodes"""
 
     def __init__(self):
         self.active_series = None
-        self.gemini_api = GeminiMediaAPI()
+        self.media_api = media_router
+        self.fingerprints = content_fingerprints
 
-    def produce_series_content(self, series_plan: Dict, trend_data: Dict,
-                               user_prefs: Dict) -> List[GeneratedContent]:
-        """Produce series episodes with AI-generated videos"""
-        print("🎥 Series Factory: Producing AI-generated 60-second episodes...")
+    def produce_series_content(self, series_plan: Dict, trend_data: Dict, user_prefs: Dict,
+                               deadline_at: Optional[float] = None) -> List[GeneratedContent]:
+        """Produce series episodes with AI-generated videos.
+
+        Media still rendering at `deadline_at` (time.monotonic(); by default one
+        schedule interval from now, when the next cycle starts) is cancelled and
+        the episode is posted with a placeholder.
+        """
+        # Scripts, prompts and stored metadata all use the length the video providers actually render
+        seconds = self.media_api.supported_video_duration(settings.SERIES_EPISODE_SECONDS)
+        print(f"🎥 Series Factory: Producing AI-generated {seconds}-second episodes...")
+        if deadline_at is None:
+            deadline_at = time.monotonic() + settings.SCHEDULE_INTERVAL.total_seconds()
 
         if not series_plan.get("active_series"):
             return []
 
-        episodes = []
+        # Produce 2 episodes as required by challenge, continuing where the series left off
+        first_episode = series_plan.get("current_episode", 0) + 1
+        plans = [self._plan_episode(episode_num, series_plan, trend_data, user_prefs, seconds)
+                 for episode_num in range(first_episode, first_episode + 2)]
+        plans = [plan for plan in plans if plan]
+        if not plans:
+            return []
 
-        # Produce 2 episodes as required by challenge
-        for episode_num in range(1, 3):
-            episode = self._produce_episode(episode_num, series_plan, trend_data, user_prefs)
-            if episode:
-                episodes.append(episode)
-                print(f"   ✅ Produced AI Episode {episode_num}: {episode.caption[:50]}...")
+        try:
+            # Every video and thumbnail renders in the background at once
+            video_futures = [self.media_api.submit_episode_video(plan["episode_data"]) for plan in plans]
+            thumbnail_futures = [
+                self.media_api.submit_series_thumbnail(plan["episode_data"]["title"], plan["episode_data"]["theme"])
+                for plan in plans
+            ]
+        except Exception:
+            # Nothing from this batch will be posted, so the episodes may be produced again
+            for plan in plans:
+                self.fingerprints.release(plan["fingerprint"], "generated")
+            raise
+
+        episodes = []
+        for plan, video_future, thumbnail_future in zip(plans, video_futures, thumbnail_futures):
+            thumbnail = self._await_media(plan, "thumbnail", thumbnail_future, deadline_at)
+            episode = self._build_episode(plan, self._await_media(plan, "video", video_future, deadline_at),
+                                          thumbnail)
+            episodes.append(episode)
+            print(f"   ✅ Produced AI Episode {plan['episode_num']}: {episode.caption[:50]}...")
 
         return episodes
 
-    def _produce_episode(self, episode_num: int, series_plan: Dict,
-                         trend_data: Dict, user_prefs: Dict) -> GeneratedContent:
-        """Produce a single episode with AI-generated video"""
-        series_title = series_plan.get("series_title", "The Innovation Protocol")
+    def record_episodes(self, series: Series, episodes: List[GeneratedContent]) -> int:
+        """Add newly produced episodes to the series and advance it; returns how many were new"""
+        known = {episode.episode_number for episode in series.episodes}
+        added = 0
+        for content in episodes:
+            episode_data = content.episode_data
+            if episode_data["episode_number"] in known:
+                continue
+            series.episodes.append(SeriesEpisode(
+                episode_number=episode_data["episode_number"],
+                title=episode_data["title"],
+                script=content.description,
+                scenes=episode_data["scenes"],
+                duration=episode_data["duration"],
+                characters=episode_data["characters"],
+                plot_advancement=episode_data["plot_advancement"],
+                media_source=content.media_source,
+                keywords=content.keywords
+            ))
+            known.add(episode_data["episode_number"])
+            series.current_episode = max(series.current_episode, episode_data["episode_number"])
+            added += 1
+        return added
 
-        episode_data = self._generate_episode_content(episode_num, series_title, trend_data, user_prefs)
+    def _plan_episode(self, episode_num: int, series_plan: Dict,
+                      trend_data: Dict, user_prefs: Dict, seconds: int) -> Optional[Dict]:
+        """Script, caption and keywords for an episode, or None if it was already produced"""
+        series_title = series_plan.get("series_title", "The Innovation Protocol")
 
-        # Generate video using Gemini AI Video API
-        media_source = self.gemini_api.generate_episode_video(episode_data)
+        episode_data = self._generate_episode_content(episode_num, series_title, trend_data, user_prefs, seconds)
 
         # Create engaging caption
         caption = f"🎬 {episode_data['title']} | {series_title} by Abimanyu-AI Hackathon #AIgenerated #Episode{episode_num}"
@@ -53,52 +108,93 @@ class SeriesFactory:
         ]
         keywords = list(dict.fromkeys(keywords))[:8]
 
+        # Skip before rendering a video for an episode we already produced or are producing
+        media_prompt = f"{episode_data['title']}\n{episode_data['script']}"
+        fingerprint = content_fingerprint("video", caption, keywords, media_prompt)
+        if not self.fingerprints.reserve(fingerprint, "generated"):
+            print(f"   ♻️ Skipping duplicate episode: {caption[:50]}...")
+            return None
+
+        return {
+            "episode_num": episode_num,
+            "series_title": series_title,
+            "episode_data": episode_data,
+            "caption": caption,
+            "keywords": keywords,
+            "viral_keywords": viral_keywords,
+            "media_prompt": media_prompt,
+            "fingerprint": fingerprint
+        }
+
+    def _await_media(self, plan: Dict, kind: str, future: Future, deadline_at: float) -> Optional[str]:
+        """Wait for an episode's media job until the deadline, then cancel it.
+
+        Jobs already resolve to a fallback on failure; a missing source is replaced
+        with a placeholder when the episode is posted.
+        """
+        try:
+            return future.result(timeout=max(0.0, deadline_at - time.monotonic()))
+        except FutureTimeoutError:
+            future.cancel()
+            print(f"⏱️ {kind.capitalize()} for episode {plan['episode_num']} missed the cycle deadline, cancelled")
+            return None
+        except Exception as e:
+            print(f"❌ Error generating {kind} for episode {plan['episode_num']}: {e}")
+            return None
+
+    def _build_episode(self, plan: Dict, media_source: Optional[str], thumbnail: Optional[str]) -> GeneratedContent:
+        episode_data = plan["episode_data"]
         return GeneratedContent(
             content_type="video",
-            caption=caption,
+            caption=plan["caption"],
             description=episode_data["script"],
-            keywords=keywords,
+            keywords=plan["keywords"],
             media_source=media_source,
             viral_score=90,  # AI-generated content has high engagement potential
-            trend_alignment=viral_keywords,
+            trend_alignment=plan["viral_keywords"],
+            media_prompt=plan["media_prompt"],
             episode_data={
-                "episode_number": episode_num,
+                "episode_number": plan["episode_num"],
                 "title": episode_data["title"],
                 "scenes": episode_data["scenes"],
                 "characters": episode_data["characters"],
                 "plot_advancement": episode_data["plot_advancement"],
-                "duration": "60 seconds",
+                "duration": f"{episode_data['duration_seconds']} seconds",
                 "ai_generated": True,
-                "series_title": series_title
+                "series_title": plan["series_title"],
+                "thumbnail": thumbnail
             }
         )
 
     def _generate_episode_content(self, episode_num: int, series_title: str,
-                                  trend_data: Dict, user_prefs: Dict) -> Dict:
-        """Generate episode content using AI concepts"""
+                                  trend_data: Dict, user_prefs: Dict, seconds: int) -> Dict:
+        """Generate episode content using AI concepts, with scenes timed to fill `seconds`"""
         viral_keywords = trend_data.get("viral_keywords", ["AI", "Technology"])
         user_keywords = user_prefs.get("preferred_keywords", ["Innovation"])
+        # Scene lengths keep the proportions of the original 60-second scripts
+        first = self._scene_seconds(seconds, [15, 25, 20])
+        second = self._scene_seconds(seconds, [20, 25, 15])
 
         episode_templates = [
             {
                 "title": f"Episode {episode_num}: The {viral_keywords[0] if viral_keywords else 'Digital'} Revolution",
                 "script": f"""
-                SCENE 1: INTRODUCTION (15 seconds)
+                SCENE 1: INTRODUCTION ({first[0]} seconds)
                 [Visual: Dynamic opening with futuristic graphics]
                 NARRATOR: "Welcome to {series_title}! In this AI-generated episode, we explore the {viral_keywords[0] if viral_keywords else 'technology'} revolution that's transforming our world."
 
-                SCENE 2: CORE CONCEPT (25 seconds)
+                SCENE 2: CORE CONCEPT ({first[1]} seconds)
                 [Visual: Animated explanations and real-world examples]
                 NARRATOR: "From artificial intelligence to machine learning, these technologies are reshaping industries and creating new possibilities. What you're watching was entirely created by AI systems."
 
-                SCENE 3: PRACTICAL APPLICATIONS (20 seconds)
+                SCENE 3: PRACTICAL APPLICATIONS ({first[2]} seconds)
                 [Visual: Case studies and future projections]
                 NARRATOR: "Discover how these innovations are solving real-world problems and creating opportunities for the future. The age of AI is here!"
                 """,
                 "scenes": [
-                    {"scene": 1, "description": "Introduction to the technological revolution", "duration": "15s"},
-                    {"scene": 2, "description": "Core concepts and AI demonstrations", "duration": "25s"},
-                    {"scene": 3, "description": "Real-world applications and future impact", "duration": "20s"}
+                    {"scene": 1, "description": "Introduction to the technological revolution", "duration": f"{first[0]}s"},
+                    {"scene": 2, "description": "Core concepts and AI demonstrations", "duration": f"{first[1]}s"},
+                    {"scene": 3, "description": "Real-world applications and future impact", "duration": f"{first[2]}s"}
                 ],
                 "characters": ["AI Narrator", "Virtual Host"],
                 "plot_advancement": f"Introduction to {viral_keywords[0] if viral_keywords else 'AI'} revolution and its implications",
@@ -107,22 +203,22 @@ class SeriesFactory:
             {
                 "title": f"Episode {episode_num}: Future of {user_keywords[0] if user_keywords else 'Innovation'}",
                 "script": f"""
-                SCENE 1: THE CURRENT LANDSCAPE (20 seconds)
+                SCENE 1: THE CURRENT LANDSCAPE ({second[0]} seconds)
                 [Visual: Modern technology montage]
                 HOST: "In this episode, we examine the future of {user_keywords[0] if user_keywords else 'innovation'} and how AI is accelerating progress."
 
-                SCENE 2: AI BREAKTHROUGHS (25 seconds)
+                SCENE 2: AI BREAKTHROUGHS ({second[1]} seconds)
                 [Visual: AI system demonstrations and data visualizations]
                 HOST: "Watch as we demonstrate cutting-edge AI capabilities. This entire production - from script to video - was generated by artificial intelligence."
 
-                SCENE 3: WHAT'S NEXT (15 seconds)
+                SCENE 3: WHAT'S NEXT ({second[2]} seconds)
                 [Visual: Futuristic concepts and emerging trends]
                 HOST: "The boundaries of what's possible are constantly expanding. Join us as we explore the frontier of technological innovation."
                 """,
                 "scenes": [
-                    {"scene": 1, "description": "Current state of technology", "duration": "20s"},
-                    {"scene": 2, "description": "AI capabilities and demonstrations", "duration": "25s"},
-                    {"scene": 3, "description": "Future trends and opportunities", "duration": "15s"}
+                    {"scene": 1, "description": "Current state of technology", "duration": f"{second[0]}s"},
+                    {"scene": 2, "description": "AI capabilities and demonstrations", "duration": f"{second[1]}s"},
+                    {"scene": 3, "description": "Future trends and opportunities", "duration": f"{second[2]}s"}
                 ],
                 "characters": ["AI Host", "Virtual Expert"],
                 "plot_advancement": "Deep dive into AI capabilities and future technological trends",
@@ -130,7 +226,18 @@ class SeriesFactory:
             }
         ]
 
-        return episode_templates[(episode_num - 1) % len(episode_templates)]
+        episode = episode_templates[(episode_num - 1) % len(episode_templates)]
+        episode["duration_seconds"] = seconds
+        return episode
+
+    def _scene_seconds(self, total: int, weights: List[int]) -> List[int]:
+        """Split `total` seconds across scenes in proportion to `weights`, adding up to exactly `total`"""
+        shares = [total * weight / sum(weights) for weight in weights]
+        seconds = [int(share) for share in shares]
+        by_remainder = sorted(range(len(shares)), key=lambda i: shares[i] - seconds[i], reverse=True)
+        for i in by_remainder[:total - sum(seconds)]:
+            seconds[i] += 1
+        return seconds
 
     def ensure_series_consistency(self, episodes: List[GeneratedContent]) -> Dict:
         """Ensure consistency across AI-generated series episodes"""
@@ -13,7 +13,7 @@ class TrendAnalyzer:
 
         # Get trending posts based on user preferences
         keywords = user_preferences.preferred_keywords or ["tech", "innovation", "AI", "digital", "future"]
-        trending_posts = self.circlo_api.get_trending_posts(keywords)
+        trending_posts = self.circlo_api.get_trending_posts_fanout(keywords)
 
         # Analyze trends
         trend_data = self._analyze_trend_data(trending_posts)
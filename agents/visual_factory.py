@@ -1,6 +1,11 @@
-from typing import List, Dict
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import List, Dict, Optional
+from config.settings import settings
 from models.content_models import GeneratedContent, ContentIdea
-from services.gemini_media_api import GeminiMediaAPI
+from services.bounded_executor import run_with_deadlines
+from services.dedupe_store import content_fingerprints, content_fingerprint
+from services.media_router import media_router
 import random
 
 
@@ -8,7 +13,8 @@ class VisualFactory:
     """Visual Factory for meme discovery and image generation with REAL Gemini AI"""
 
     def __init__(self):
-        self.gemini_api = GeminiMediaAPI()
+        self.media_api = media_router
+        self.fingerprints = content_fingerprints
         self.meme_templates = [
             {
                 "name": "Reaction Meme",
@@ -25,34 +31,96 @@ class VisualFactory:
         ]
 
     def create_visual_content(self, content_ideas: List[ContentIdea],
-                              trend_data: Dict, user_prefs: Dict) -> List[GeneratedContent]:
+                              trend_data: Dict, user_prefs: Dict,
+                              concurrency: Optional[int] = None,
+                              timeout: Optional[float] = None) -> List[GeneratedContent]:
         """Create visual content including memes and images using REAL Gemini AI"""
         print("🏭 Visual Factory: Generating REAL AI-powered images and memes...")
 
-        generated_content = []
+        concurrency = concurrency or settings.VISUAL_CONCURRENCY
+        timeout = timeout or settings.VISUAL_ITEM_TIMEOUT_SECONDS
+
+        # Index is the idea's position, which drives meme/image choice and text variety
+        image_ideas = [(i, idea) for i, idea in enumerate(content_ideas) if idea.content_type == "image"]
 
-        for i, idea in enumerate(content_ideas):
-            if idea.content_type == "image":
-                # Decide between regular image and meme
-                if self._should_create_meme(trend_data, i):
-                    content = self._create_meme_content(idea, trend_data, user_prefs, i)
-                else:
-                    content = self._create_regular_image(idea, trend_data, user_prefs, i)
+        if concurrency > 1 and len(image_ideas) > 1:
+            results = self._create_concurrently(image_ideas, trend_data, user_prefs, concurrency, timeout)
+        else:
+            results = [self._create_visual_safely(item, trend_data, user_prefs, timeout) for item in image_ideas]
 
-                if content:
-                    generated_content.append(content)
-                    content_type = "AI meme" if "meme" in content.description.lower() else "AI image"
-                    print(f"   ✅ Created {content_type}: {content.caption[:50]}...")
+        generated_content = []
+        for content in results:
+            if content:
+                generated_content.append(content)
+                content_type = "AI meme" if "meme" in content.description.lower() else "AI image"
+                print(f"   ✅ Created {content_type}: {content.caption[:50]}...")
 
         return generated_content
 
+    def _create_visual(self, idea: ContentIdea, trend_data: Dict, user_prefs: Dict, index: int,
+                       timeout: Optional[float] = None) -> Optional[GeneratedContent]:
+        """Create a meme or a regular image for one idea, giving up on its media after `timeout` seconds"""
+        deadline_at = time.monotonic() + timeout if timeout else None
+        # Decide between regular image and meme
+        if self._should_create_meme(trend_data, index):
+            return self._create_meme_content(idea, trend_data, user_prefs, index, deadline_at)
+        return self._create_regular_image(idea, trend_data, user_prefs, index, deadline_at)
+
+    def _create_visual_safely(self, item: tuple, trend_data: Dict, user_prefs: Dict,
+                              timeout: float) -> Optional[GeneratedContent]:
+        try:
+            return self._create_visual(item[1], trend_data, user_prefs, item[0], timeout)
+        except Exception as e:
+            return self._failed_visual(item, e)
+
+    def _await_media(self, future: Future, deadline_at: Optional[float]) -> Optional[str]:
+        """Wait for a media job, cancelling it (and its provider operation) once the deadline passes"""
+        try:
+            return future.result(timeout=None if deadline_at is None else max(0.0, deadline_at - time.monotonic()))
+        except FutureTimeoutError:
+            future.cancel()
+            raise TimeoutError("media generation passed its deadline")
+
+    def _create_concurrently(self, image_ideas: List[tuple], trend_data: Dict, user_prefs: Dict,
+                             concurrency: int, timeout: float) -> List[Optional[GeneratedContent]]:
+        """Generate with at most `concurrency` images in flight, keeping idea order"""
+        print(f"   ⚡ Generating {len(image_ideas)} visuals with concurrency {concurrency}")
+
+        return run_with_deadlines(lambda item: self._create_visual(item[1], trend_data, user_prefs, item[0], timeout),
+                                  image_ideas, concurrency, timeout,
+                                  on_timeout=lambda item, future: self._timed_out_visual(item[0], future, timeout),
+                                  on_error=self._failed_visual,
+                                  thread_name_prefix="visual-factory")
+
+    def _timed_out_visual(self, index: int, future: Optional[Future], timeout: float) -> None:
+        """Skip a visual that missed its deadline, freeing its claim once the late result is dropped"""
+        if future is None:
+            print(f"   ⏱️ Visual for idea {index + 1} never started within the batch deadline, skipping")
+        else:
+            print(f"   ⏱️ Visual for idea {index + 1} exceeded {timeout}s, skipping")
+            future.add_done_callback(self._release_late_visual)
+        return None
+
+    def _release_late_visual(self, future: Future):
+        # A failed generation already released its own claim
+        if future.cancelled() or future.exception() is not None:
+            return
+        content = future.result()
+        if content:
+            self.fingerprints.release(content_fingerprint(content.content_type, content.caption,
+                                                          content.keywords, content.media_prompt), "generated")
+
+    def _failed_visual(self, item: tuple, error: Exception) -> None:
+        print(f"   ❌ Error creating visual for idea {item[0] + 1}: {error}")
+        return None
+
     def _should_create_meme(self, trend_data: Dict, index: int) -> bool:
         """Decide whether to create a meme"""
         meme_keywords = trend_data.get("meme_keywords", [])
         return len(meme_keywords) > 0 and index % 2 == 0
 
-    def _create_meme_content(self, idea: ContentIdea, trend_data: Dict,
-                             user_prefs: Dict, index: int) -> GeneratedContent:
+    def _create_meme_content(self, idea: ContentIdea, trend_data: Dict, user_prefs: Dict, index: int,
+                             deadline_at: Optional[float] = None) -> Optional[GeneratedContent]:
         """Create meme content using REAL Gemini AI"""
         meme_template = random.choice(self.meme_templates)
         viral_keywords = trend_data.get("viral_keywords", [])
@@ -60,19 +128,30 @@ class VisualFactory:
         # Generate meme text
         top_text, bottom_text = self._generate_meme_text(viral_keywords, index)
 
-        # Generate REAL meme image using Gemini
-        media_source = self.gemini_api.generate_meme_image(
-            template=meme_template["name"],
-            top_text=top_text,
-            bottom_text=bottom_text
-        )
-
         caption = f"😂 {top_text}... {bottom_text} by Abimanyu-AI Hackathon #Meme #Viral"
 
         # Combine keywords
         keywords = user_prefs.get("preferred_keywords", []) + viral_keywords + ["meme", "funny", "viral", "AbimanyuAI"]
         keywords = list(dict.fromkeys(keywords))[:6]
 
+        # Skip before spending generation quota on a meme we already made or are making
+        media_prompt = f"{meme_template['name']}: {top_text} / {bottom_text}"
+        fingerprint = content_fingerprint("image", caption, keywords, media_prompt)
+        if not self.fingerprints.reserve(fingerprint, "generated"):
+            print(f"   ♻️ Skipping duplicate meme: {caption[:50]}...")
+            return None
+
+        # Generate REAL meme image on the fastest healthy provider
+        try:
+            media_source = self._await_media(self.media_api.submit_meme_image(
+                template=meme_template["name"],
+                top_text=top_text,
+                bottom_text=bottom_text
+            ), deadline_at)
+        except Exception:
+            self.fingerprints.release(fingerprint, "generated")
+            raise
+
         return GeneratedContent(
             content_type="image",
             caption=caption,
@@ -80,28 +159,39 @@ class VisualFactory:
             keywords=keywords,
             media_source=media_source,
             viral_score=idea.viral_score + 15,
-            trend_alignment=viral_keywords
+            trend_alignment=viral_keywords,
+            media_prompt=media_prompt
         )
 
-    def _create_regular_image(self, idea: ContentIdea, trend_data: Dict,
-                              user_prefs: Dict, index: int) -> GeneratedContent:
+    def _create_regular_image(self, idea: ContentIdea, trend_data: Dict, user_prefs: Dict, index: int,
+                              deadline_at: Optional[float] = None) -> Optional[GeneratedContent]:
         """Create regular image content using REAL Gemini AI"""
         viral_keywords = trend_data.get("viral_keywords", [])
 
         # Generate image prompt based on trends and user preferences
         image_prompt = self._generate_image_prompt(viral_keywords, user_prefs, index)
 
-        # Generate REAL image using Gemini
-        media_source = self.gemini_api.generate_image(
-            prompt=image_prompt,
-            style=random.choice(["realistic", "artistic", "minimalist"])
-        )
-
         caption = self._generate_image_caption(viral_keywords, index)
 
         keywords = user_prefs.get("preferred_keywords", []) + viral_keywords + ["AbimanyuAI"]
         keywords = list(dict.fromkeys(keywords))[:6]
 
+        # Skip before spending generation quota on an image we already made or are making
+        fingerprint = content_fingerprint("image", caption, keywords, image_prompt)
+        if not self.fingerprints.reserve(fingerprint, "generated"):
+            print(f"   ♻️ Skipping duplicate image: {caption[:50]}...")
+            return None
+
+        # Generate REAL image on the fastest healthy provider
+        try:
+            media_source = self._await_media(self.media_api.submit_image(
+                prompt=image_prompt,
+                style=random.choice(["realistic", "artistic", "minimalist"])
+            ), deadline_at)
+        except Exception:
+            self.fingerprints.release(fingerprint, "generated")
+            raise
+
         return GeneratedContent(
             content_type="image",
             caption=caption,
@@ -109,7 +199,8 @@ class VisualFactory:
             keywords=keywords,
             media_source=media_source,
             viral_score=idea.viral_score,
-            trend_alignment=viral_keywords
+            trend_alignment=viral_keywords,
+            media_prompt=image_prompt
         )
 
     def _generate_meme_text(self, viral_keywords: List[str], index: int) -> tuple:
@@ -10,9 +10,36 @@ class Settings:
     GEMINI_API_KEY = "API_GEMINI"
 
     # API Endpoints
-    CIRCLO_BASE_URL = "https://api.getcirclo.com/api"
+    CIRCLO_BASE_URL = os.getenv("CIRCLO_BASE_URL", "https://api.getcirclo.com/api")
     GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
 
+    # HTTP Connection Pool Settings (Circlo)
+    CIRCLO_POOL_CONNECTIONS = 4  # number of per-host pools kept alive
+    CIRCLO_POOL_MAXSIZE = 16  # max connections kept per host
+    CIRCLO_POOL_BLOCK = False  # wait for a free connection instead of opening an extra one
+    CIRCLO_KEEP_ALIVE = True
+    CIRCLO_REQUEST_TIMEOUT = 30  # seconds
+    CIRCLO_KEEP_ALIVE_TIMEOUT = 30  # seconds an idle connection stays open
+
+    # User preference pagination
+    PREFERENCES_PAGE_SIZE = 50
+    PREFERENCES_PREFETCH_PAGES = 2  # pages requested ahead of the one being processed
+
+    # Gemini text generation
+    GEMINI_TEXT_MODEL = os.getenv("GEMINI_TEXT_MODEL", "gemini-2.5-flash")
+    GEMINI_IMAGE_MODEL = os.getenv("GEMINI_IMAGE_MODEL", "gemini-2.5-flash-image")
+    GEMINI_VIDEO_MODEL = os.getenv("GEMINI_VIDEO_MODEL", "veo-3.1-generate-preview")
+    GEMINI_VIDEO_DURATIONS = [4, 6, 8]  # clip lengths (seconds) Veo accepts; longer requests get the longest
+    GEMINI_POOL_MAXSIZE = 8  # connections kept alive to the Gemini host
+    GEMINI_CONNECT_TIMEOUT = 5  # seconds
+    GEMINI_DEADLINE_SECONDS = 60  # hard limit per call, including retries and reading the body
+    GEMINI_BATCH_CONCURRENCY = 4  # prompts in flight at once in generate_content_batch
+    GEMINI_PROMPT_TOKEN_BUDGET = 1500  # embedded trend/idea data is compacted to keep prompts under this
+
+    # Async Circlo client (aiohttp)
+    CIRCLO_ASYNC_CONNECTION_LIMIT = 100  # total simultaneous connections
+    CIRCLO_ASYNC_LIMIT_PER_HOST = 50
+
     # Available Niches in Circlo - CORRECTED based on API errors
     AVAILABLE_NICHES = [
         "General", "Blogger", "Traveler", "Foodie",
@@ -22,6 +49,31 @@ class Settings:
         "Lifestyle Influencer", "Business Coach"
     ]
 
+    # Local Storage
+    DATA_DIR = os.getenv("DATA_DIR", "data")
+
+    # SQLite storage
+    DATABASE_PATH = os.path.join(DATA_DIR, "content_factory.db")
+    DATABASE_BATCH_SIZE = 500  # rows per insert transaction
+    DATABASE_STATEMENT_CACHE_SIZE = 256  # prepared statements kept per connection
+
+    # Content dedupe: fingerprints of generated/posted content are remembered this long
+    DEDUPE_STORE_PATH = os.path.join(DATA_DIR, "content_fingerprints.jsonl")
+    DEDUPE_RETENTION = timedelta(days=7)
+    DEDUPE_CLAIM_TTL = timedelta(hours=1)  # a generation claim neither posted nor released is dropped after this
+
+    # Gemini text response cache (content-addressed, on disk)
+    GEMINI_TEXT_CACHE_DIR = os.path.join(DATA_DIR, "cache", "gemini_text")
+    GEMINI_TEXT_CACHE_MAX_BYTES = 50 * 1024 * 1024
+    GEMINI_TEXT_CACHE_MAX_ENTRIES = 10000
+    GEMINI_TEXT_CACHE_TTL = timedelta(days=1)
+
+    # Generated media cache: prompt/style/duration/model -> media URL
+    MEDIA_CACHE_DIR = os.path.join(DATA_DIR, "cache", "media")
+    MEDIA_CACHE_MAX_BYTES = 20 * 1024 * 1024
+    MEDIA_CACHE_MAX_ENTRIES = 5000
+    MEDIA_CACHE_TTL = timedelta(days=7)  # generated media URLs are not kept forever upstream
+
     # Content Settings
     CONTENT_TYPES = ["image", "video"]
     MAX_KEYWORDS = 6
@@ -31,9 +83,109 @@ class Settings:
     TREND_ANALYSIS_LIMIT = 20
     CONTENT_QUEUE_SIZE = 3
 
+    # Rate Limits per endpoint family: sustained requests/second and burst size
+    RATE_LIMITS = {
+        "circlo": {"rate": 10.0, "burst": 20},
+        "gemini": {"rate": 1.0, "burst": 5},
+        "gemini_media": {"rate": 0.5, "burst": 2},
+        "gemini_media.operations": {"rate": 5.0, "burst": 10},  # polling, not generation
+        "replicate": {"rate": 1.0, "burst": 4},
+        "replicate.predictions": {"rate": 5.0, "burst": 10},  # polling, not generation
+        "default": {"rate": 5.0, "burst": 10}
+    }
+
+    # Retry Settings (exponential backoff with full jitter)
+    RETRY_MAX_ATTEMPTS = 4
+    RETRY_BASE_DELAY = 1.0  # seconds
+    RETRY_MAX_DELAY = 30.0  # seconds
+    RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
+
+    # Trending posts response cache
+    TRENDING_CACHE_TTL = timedelta(minutes=5)
+    TRENDING_CACHE_MAX_ENTRIES = 256
+
+    # Trend discovery keyword fan-out
+    TREND_FANOUT_CHUNK_SIZE = 3  # keywords per /posts/by-keywords request
+    TREND_FANOUT_MAX_WORKERS = 4
+
+    # How long create-post outcomes (rejected niches, failing payload shapes) are remembered
+    NICHE_CACHE_TTL = timedelta(hours=1)
+
+    # Circuit Breakers (per endpoint)
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD = 5  # consecutive failures before opening
+    CIRCUIT_BREAKER_RECOVERY_TIMEOUT = timedelta(seconds=60)  # open time before a trial call
+    CIRCUIT_BREAKER_HALF_OPEN_MAX_CALLS = 1
+
+    # Long-running jobs (video generation): polled with backoff in the background
+    JOB_MANAGER_MAX_WORKERS = 8  # threads starting and polling jobs
+    JOB_POLL_INITIAL_INTERVAL = timedelta(seconds=5)
+    JOB_POLL_MAX_INTERVAL = timedelta(seconds=30)
+    JOB_POLL_BACKOFF = 1.5  # poll interval multiplier while a job is still running
+    JOB_DEADLINE = timedelta(minutes=10)  # a job still running after this resolves to its fallback
+
+    # Visual Factory: images and memes generated in parallel
+    VISUAL_CONCURRENCY = 4  # images in flight at once (1 = sequential)
+    VISUAL_ITEM_TIMEOUT_SECONDS = 90  # per image, measured from when generation starts
+
+    # Posting Settings
+    POST_CONCURRENCY = 4  # max posts in flight at once (1 = sequential)
+    POST_DEADLINE_SECONDS = 90  # per post, including create_post fallbacks
+
+    # Engagement collection: posted content is re-polled less often as it ages
+    # /posts/by-ids is only served by utils/fake_circlo_server.py, so this is off unless a deployment provides it
+    ENGAGEMENT_ENABLED = os.getenv("ENGAGEMENT_ENABLED", "false").lower() == "true"
+    ENGAGEMENT_BATCH_SIZE = 50  # post ids per /posts/by-ids request
+    ENGAGEMENT_MAX_WORKERS = 4  # concurrent batch requests
+    ENGAGEMENT_POLL_INTERVAL = timedelta(seconds=30)  # how often the collector looks for due posts
+    ENGAGEMENT_MIN_INTERVAL = timedelta(minutes=1)
+    ENGAGEMENT_MAX_INTERVAL = timedelta(hours=6)
+    ENGAGEMENT_BACKOFF_FACTOR = 0.25  # next check after this fraction of the post's age
+    ENGAGEMENT_MAX_AGE = timedelta(days=7)  # stop tracking posts older than this
+
+    # Post outbox: generated content is queued in SQLite and drained by a background poster
+    OUTBOX_ENABLED = True
+    OUTBOX_BATCH_SIZE = 8  # entries leased per drain
+    OUTBOX_POLL_INTERVAL = timedelta(seconds=2)  # idle wait between drains
+    OUTBOX_LEASE = timedelta(minutes=10)  # an unacknowledged lease is re-delivered after this
+    OUTBOX_MAX_ATTEMPTS = 5
+    OUTBOX_RETRY_BASE_DELAY = timedelta(seconds=30)  # doubled per attempt
+    OUTBOX_RETRY_MAX_DELAY = timedelta(minutes=30)
+    OUTBOX_RECONCILE_LIMIT = 100  # recent posts searched for an uncertain delivery before it is re-sent
+    OUTBOX_REPORT_WAIT = timedelta(minutes=2)  # a cycle waits this long for its posts; the rest are reported queued
+
+    # Replicate: optional second media provider (needs the `replicate` package and a token)
+    REPLICATE_API_TOKEN = os.getenv("REPLICATE_API_TOKEN", "")
+    REPLICATE_IMAGE_MODELS = {
+        "realistic": "black-forest-labs/flux-schnell",
+        "meme": "stability-ai/sdxl",
+        "professional": "black-forest-labs/flux-schnell"
+    }
+    REPLICATE_VIDEO_MODELS = {
+        "standard": "minimax/video-01"
+    }
+    REPLICATE_ASYNC_PREDICTIONS = True  # create predictions and complete them in the background instead of client.run
+    REPLICATE_PREDICTION_DEADLINE = SCHEDULE_INTERVAL  # still running when the next cycle starts: cancelled
+    REPLICATE_WEBHOOK_URL = os.getenv("REPLICATE_WEBHOOK_URL", "")  # public URL of the receiver below; empty = poll only
+    REPLICATE_WEBHOOK_HOST = os.getenv("REPLICATE_WEBHOOK_HOST", "127.0.0.1")  # loopback; expose via a reverse proxy
+    REPLICATE_WEBHOOK_PORT = int(os.getenv("REPLICATE_WEBHOOK_PORT", "8787"))
+    REPLICATE_WEBHOOK_SECRET = os.getenv("REPLICATE_WEBHOOK_SECRET", "")  # whsec_... signing secret; the receiver won't start without it
+    REPLICATE_WEBHOOK_RETENTION = timedelta(minutes=10)  # unclaimed deliveries (e.g. cancelled jobs) are dropped after this
+
+    # Media routing: each call goes to the fastest healthy provider
+    MEDIA_PROVIDERS = ["gemini", "replicate"]  # in order of preference until latency stats exist
+    MEDIA_ROUTER_WINDOW = 50  # recent calls per provider behind the latency percentiles and error rate
+    MEDIA_ROUTER_MIN_SAMPLES = 5  # calls before a provider's stats are trusted
+    MEDIA_ROUTER_MAX_ERROR_RATE = 0.5  # providers failing more often than this are tried last
+    MEDIA_ROUTER_MAX_WORKERS = 8  # threads running primary and hedged calls
+    MEDIA_HEDGE_ENABLED = True
+    MEDIA_HEDGE_PERCENTILE = 95  # a second provider is tried once the first is slower than this
+    MEDIA_HEDGE_MIN_DELAY = 2.0  # seconds; never hedge sooner than this
+    MEDIA_HEDGE_METHODS = ["generate_image", "generate_meme_image", "generate_series_thumbnail"]  # not video
+
     # Media Generation Settings
     IMAGE_STYLES = ["realistic", "artistic", "minimalist", "humorous", "professional"]
     VIDEO_DURATIONS = [30, 60, 90]  # seconds
+    SERIES_EPISODE_SECONDS = 60  # requested episode length; shortened to what every video provider can render
 
 
 settings = Settings()
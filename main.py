@@ -10,6 +10,12 @@ from agents.media_director import MediaDirector
 from agents.personalization_engine import PersonalizationEngine
 from agents.post_manager import PostManager
 from services.circlo_api import CircloAPI
+from services.database import ContentDatabase
+from services.outbox import PostOutbox
+from services.engagement_collector import EngagementCollector
+from services.prediction_webhook import webhook_receiver
+from services.replicate_media_api import ReplicateMediaAPI
+from config.settings import settings
 from models.content_models import UserPreferences, ContentIdea, TrendAnalysis
 
 
@@ -23,6 +29,12 @@ class AutonomousContentFactory:
         self.series_factory = SeriesFactory()
         self.personalization_engine = PersonalizationEngine()
         self.post_manager = PostManager()
+        self.database = ContentDatabase()
+        self.outbox = PostOutbox(self.database, self.post_manager)
+        self.engagement_collector = EngagementCollector(self.database, self.circlo_api)
+
+        # Continue the series left off by the previous run
+        self.showrunner_agent.active_series = self.database.get_latest_series()
 
         self.cycle_count = 0
         self.total_content_created = 0
@@ -31,6 +43,8 @@ class AutonomousContentFactory:
     def run_content_cycle(self):
         """Run one complete content creation cycle with personalization"""
         self.cycle_count += 1
+        # Background media still running when the next cycle is due gets cancelled
+        cycle_deadline_at = time.monotonic() + settings.SCHEDULE_INTERVAL.total_seconds()
         print(f"\n{'=' * 70}")
         print(f"🚀 AUTONOMOUS CONTENT FACTORY - CYCLE {self.cycle_count}")
         print(f"🏆 Abimanyu-AI Hackathon - Agentic Personalization System")
@@ -40,11 +54,13 @@ class AutonomousContentFactory:
         try:
             # Step 1: Get REAL-TIME user preferences from GetCirclo
             print("\n1. 📋 REAL-TIME PERSONALIZATION: Fetching user preferences from GetCirclo...")
-            user_preferences = self.circlo_api.get_user_preferences()
+            # The cycle personalizes for the first user, so stop streaming once it has arrived
+            preferences = self.circlo_api.iter_user_preferences(prefetch=1)
+            user_pref = next(preferences, None)
+            preferences.close()
 
-            if user_preferences:
-                print(f"   ✅ Found {len(user_preferences)} user preferences")
-                user_pref = user_preferences[0]
+            if user_pref:
+                print("   ✅ Received user preferences")
                 print(f"   👤 User ID: {user_pref.user_id}")
                 print(f"   🎯 Preferred Keywords: {', '.join(user_pref.preferred_keywords[:5])}")
                 print(f"   🏷️ Preferred Niches: {', '.join(user_pref.preferred_niches[:3])}")
@@ -52,7 +68,7 @@ class AutonomousContentFactory:
                 print(f"   🕒 Active Hours: {', '.join(user_pref.active_hours[:2])}")
             else:
                 print("   🧪 Using demo user preferences")
-                user_preferences = [UserPreferences(
+                user_pref = UserPreferences(
                     id="demo_user", user_id="demo_123",
                     preferred_keywords=["AI", "Machine Learning", "Technology", "Innovation", "Digital"],
                     preferred_niches=["Tech Reviewer", "AI Enthusiast"],
@@ -60,8 +76,7 @@ class AutonomousContentFactory:
                     visual_affinities=["modern", "futuristic", "minimalist"],
                     active_hours=["12:00 UTC", "18:00 UTC", "20:00 UTC"],
                     engagement_ratio=0.8
-                )]
-                user_pref = user_preferences[0]
+                )
 
             # Step 2: Personalization Engine - Analyze user profile
             print("\n2. 🎯 AGENTIC PERSONALIZATION: Analyzing user profile...")
@@ -118,13 +133,15 @@ class AutonomousContentFactory:
             print(f"   🖼️ AI-Generated Visual Content: {len(visual_content)} pieces")
 
             # Step 8: Series Factory - AI-Powered Episode Production
-            print("\n7. 🎥 SERIES FACTORY: Producing AI-powered 60-second episodes...")
+            print("\n7. 🎥 SERIES FACTORY: Producing AI-powered series episodes...")
             series_content = self.series_factory.produce_series_content(
                 production_plan.get('series_management', {}),
                 trend_analysis.__dict__,
-                user_pref.__dict__
+                user_pref.__dict__,
+                deadline_at=cycle_deadline_at
             )
             print(f"   📺 AI-Generated Series Episodes: {len(series_content)} episodes")
+            self._persist_series(series_content)
 
             # Combine all content
             all_content = visual_content + series_content
@@ -133,7 +150,18 @@ class AutonomousContentFactory:
 
             # Step 9: Post to GetCirclo
             print("\n8. 📮 OUTPUT DELIVERY: Posting personalized content to GetCirclo...")
-            post_results = self.post_manager.post_content_to_circlo(all_content)
+            if settings.OUTBOX_ENABLED:
+                # Waits for this cycle's outcomes; posts still queued afterwards are reported as
+                # queued, not failed. The poster stores every final outcome itself.
+                post_results = self.outbox.post(all_content, user_pref.user_id)
+                earlier = self.outbox.collect_results()
+                if earlier:
+                    print(f"   📬 Earlier cycles: {sum(r.success for r in earlier)} delivered, "
+                          f"{sum(not r.success for r in earlier)} given up")
+                self._persist_cycle(user_pref, trend_analysis, all_content, [])
+            else:
+                post_results = self.post_manager.post_content_to_circlo(all_content)
+                self._persist_cycle(user_pref, trend_analysis, all_content, post_results)
 
             # Step 10: Analytics and Personalization Metrics
             print("\n9. 📊 PERSONALIZATION ANALYTICS: Generating insights...")
@@ -148,6 +176,31 @@ class AutonomousContentFactory:
             import traceback
             traceback.print_exc()
 
+    def _persist_cycle(self, user_pref: UserPreferences, trend_analysis: TrendAnalysis,
+                       all_content: List, post_results: List):
+        """Store this cycle's trend snapshot, generated content and post results"""
+        try:
+            self.database.save_trend_analysis(trend_analysis, user_pref.user_id)
+            self.database.save_generated_content(all_content, user_pref.user_id)
+            # Duplicates that were skipped were never sent, so there is no outcome to store
+            attempted = [result for result in post_results if result.status != "skipped"]
+            self.database.save_post_results(attempted, user_pref.user_id)
+            print(f"   💾 Saved {len(all_content)} content pieces and {len(attempted)} post results")
+        except Exception as e:
+            print(f"   ❌ Error saving cycle to database: {e}")
+
+    def _persist_series(self, series_content: List):
+        """Record produced episodes on the active series and store its state"""
+        series = self.showrunner_agent.active_series
+        if not series or not series_content:
+            return
+        try:
+            added = self.series_factory.record_episodes(series, series_content)
+            self.database.save_series(series)
+            print(f"   💾 Saved series '{series.title}' ({added} new episodes, now at episode {series.current_episode})")
+        except Exception as e:
+            print(f"   ❌ Error saving series to database: {e}")
+
     def _convert_to_content_ideas(self, personalized_ideas: List[Dict], trend_analysis: TrendAnalysis) -> List[
         ContentIdea]:
         """Convert personalized ideas to ContentIdea objects"""
@@ -212,6 +265,8 @@ class AutonomousContentFactory:
         print(f"\n📈 PERFORMANCE METRICS:")
         print(f"   • 📝 Total Personalized Content: {total_posts} pieces")
         print(f"   • ✅ Successful Posts: {successful_posts}")
+        if performance.get('queued_posts'):
+            print(f"   • 📬 Still Queued: {performance['queued_posts']}")
         print(f"   • 📊 Success Rate: {performance.get('success_rate', 0):.1%}")
         print(f"   • 🎯 Personalization Accuracy: {personalization_metrics.get('personalization_score', 0)}%")
         print(f"   • 🎬 AI-Generated Episodes: {self.series_episodes_produced}")
@@ -232,6 +287,16 @@ class AutonomousContentFactory:
         print(f"\n🔄 Next personalized cycle in 5 minutes...")
         print(f"{'=' * 70}")
 
+    def _start_webhook_receiver(self):
+        """Receive Replicate completions by webhook when configured; otherwise jobs just poll"""
+        if not (settings.REPLICATE_WEBHOOK_URL and settings.REPLICATE_ASYNC_PREDICTIONS
+                and ReplicateMediaAPI.is_available()):
+            return
+        try:
+            webhook_receiver.start()
+        except (RuntimeError, OSError) as e:
+            print(f"⚠️ Replicate webhooks disabled, predictions will be polled: {e}")
+
     def start_continuous_operation(self):
         """Start continuous operation with real-time personalization"""
         print("🚀 INITIALIZING AGENTIC PERSONALIZATION SYSTEM")
@@ -245,6 +310,12 @@ class AutonomousContentFactory:
         print("   ✓ Continuous personalization learning")
         print("=" * 70)
 
+        if settings.OUTBOX_ENABLED:
+            self.outbox.start()
+        if settings.ENGAGEMENT_ENABLED:
+            self.engagement_collector.start()
+        self._start_webhook_receiver()
+
         # Run immediately
         self.run_content_cycle()
 
@@ -273,6 +344,9 @@ def main():
         # Start continuous agentic personalization
         factory.start_continuous_operation()
     except KeyboardInterrupt:
+        factory.outbox.stop(timeout=5)
+        factory.engagement_collector.stop(timeout=5)
+        webhook_receiver.stop()
         print("\n\n👋 Agentic Personalization System demonstration completed!")
         print("🏆 Real-time User Preference Integration Successfully Demonstrated")
         print("✅ All Personalization Features Active:")
@@ -46,6 +46,7 @@ class GeneratedContent:
     viral_score: int
     trend_alignment: List[str]
     episode_data: Optional[Dict] = None
+    media_prompt: Optional[str] = None
 
     def __post_init__(self):
         if self.episode_data is None:
@@ -57,4 +58,11 @@ class PostResult:
     post_id: str
     content_type: str
     posted_at: datetime
-    engagement_metrics: Dict
\ No newline at end of file
+    engagement_metrics: Dict
+    status: Optional[str] = None  # "posted", "failed", "skipped" (duplicate), "unknown" (timed out mid-flight)
+    # or "queued" (still in the outbox)
+    content_id: Optional[str] = None  # fingerprint of the GeneratedContent that was posted
+
+    def __post_init__(self):
+        if self.status is None:
+            self.status = "posted" if self.success else "failed"
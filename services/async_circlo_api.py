@@ -0,0 +1,460 @@
+import aiohttp
+import asyncio
+from typing import List, Dict, Optional, AsyncIterator
+from config.settings import settings
+from models.content_models import UserPreferences, PostResult
+from services.circlo_payloads import CircloPayloads, trending_cache
+from services.circuit_breaker import circuit_breakers, CircuitOpenError
+from services.niche_cache import niche_cache
+from services.rate_limiter import rate_limiter, RateLimitWaitTimeout
+from services.single_flight import AsyncSingleFlight
+
+
+class AsyncCircloAPI:
+    """asyncio-native Circlo client built on aiohttp.
+
+    Mirrors the CircloAPI surface (same payloads, niche fallback chain and
+    result models, via a shared CircloPayloads) but every network method is a
+    coroutine, so many calls can be in flight on one event loop.
+    """
+
+    def __init__(self):
+        self.payloads = CircloPayloads()
+        self.base_url = self.payloads.base_url
+        self.headers = self.payloads.headers
+        self.timeout = settings.CIRCLO_REQUEST_TIMEOUT
+        self.niche_cache = niche_cache
+        self.trending_cache = trending_cache
+        self._async_session: Optional[aiohttp.ClientSession] = None
+        self._prefetch_tasks = set()
+        self._async_trending_flight = AsyncSingleFlight()
+
+    async def __aenter__(self):
+        await self._get_async_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _get_async_session(self) -> aiohttp.ClientSession:
+        """Get the aiohttp session, creating it inside the running event loop"""
+        if self._async_session is None or self._async_session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=settings.CIRCLO_ASYNC_CONNECTION_LIMIT,
+                limit_per_host=settings.CIRCLO_ASYNC_LIMIT_PER_HOST,
+                keepalive_timeout=settings.CIRCLO_KEEP_ALIVE_TIMEOUT if settings.CIRCLO_KEEP_ALIVE else None,
+                force_close=not settings.CIRCLO_KEEP_ALIVE
+            )
+            self._async_session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._async_session
+
+    async def close(self):
+        """Close the underlying aiohttp session and its connections"""
+        for task in list(self._prefetch_tasks):
+            task.cancel()
+        if self._async_session is not None and not self._async_session.closed:
+            await self._async_session.close()
+        self._async_session = None
+
+    async def _request(self, endpoint: str, method: str, url: str,
+                       retry_statuses: Optional[List[int]] = None, deadline_at: Optional[float] = None,
+                       **kwargs) -> tuple:
+        """Rate-limited request with retry; returns (status, parsed JSON or None, raw text)"""
+        status, data, text, _ = await self._send(endpoint, method, url, retry_statuses, deadline_at, **kwargs)
+        return status, data, text
+
+    async def _send(self, endpoint: str, method: str, url: str,
+                    retry_statuses: Optional[List[int]] = None, deadline_at: Optional[float] = None,
+                    **kwargs) -> tuple:
+        """Like _request, but also returns the response headers"""
+        breaker = circuit_breakers.get(endpoint)
+        if not breaker.allow_request():
+            raise CircuitOpenError(endpoint, breaker.retry_in())
+
+        recorded = False
+        try:
+            try:
+                status, data, text, headers = await self._send_with_retry(endpoint, method, url, retry_statuses,
+                                                                          deadline_at, **kwargs)
+            except RateLimitWaitTimeout:
+                # Never sent, so it says nothing about the endpoint; the finally releases the slot
+                raise
+            except Exception:
+                recorded = True
+                breaker.record_failure()
+                raise
+
+            recorded = True
+            if breaker.is_failure_status(status, retry_statuses):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            return status, data, text, headers
+        finally:
+            # A cancelled call (CancelledError is a BaseException) must not keep a half-open slot
+            if not recorded:
+                breaker.release()
+
+    async def _send_with_retry(self, endpoint: str, method: str, url: str,
+                               retry_statuses: Optional[List[int]] = None, deadline_at: Optional[float] = None,
+                               **kwargs) -> tuple:
+        """Send under the endpoint's rate limit, retrying 429/5xx and connection errors;
+        no retry starts once its delay would run past `deadline_at` (time.monotonic())"""
+        session = await self._get_async_session()
+        attempt = 0
+        while True:
+            await rate_limiter.acquire_async(endpoint, deadline_at)
+            try:
+                async with session.request(method, url, **kwargs) as response:
+                    text = await response.text()
+                    try:
+                        data = await response.json(content_type=None)
+                    except ValueError:
+                        data = None
+                    status, headers = response.status, response.headers
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                # A POST creates a post, so it is only re-sent if the connection never opened
+                if (attempt >= settings.RETRY_MAX_ATTEMPTS - 1
+                        or (method == "POST" and not isinstance(e, aiohttp.ClientConnectorError))):
+                    raise
+                delay = rate_limiter.retry_delay(endpoint, attempt)
+                if rate_limiter.past_deadline(delay, deadline_at):
+                    raise
+                print(f"⏳ {endpoint} failed ({e.__class__.__name__}), retrying in {delay:.1f}s...")
+            else:
+                if not rate_limiter.should_retry(status, attempt, retry_statuses):
+                    return status, data, text, headers
+                delay = rate_limiter.retry_delay(endpoint, attempt, status, headers)
+                if rate_limiter.past_deadline(delay, deadline_at):
+                    return status, data, text, headers
+                print(f"⏳ {endpoint} returned {status}, retrying in {delay:.1f}s...")
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def get_user_preferences(self, page: int = 1, limit: int = 50) -> List[UserPreferences]:
+        """Get user preferences from Circlo API"""
+        try:
+            url = f"{self.base_url}/user-preferences"
+            params = {"page": page, "limit": limit}
+
+            print(f"🔗 Fetching from: {url}")
+
+            status, data, text = await self._request("circlo.user_preferences", "GET", url, params=params)
+
+            if status == 401:
+                print("❌ Authentication failed: Invalid or expired token")
+                return []
+            elif status != 200:
+                print(f"❌ API Error: {status} - {text}")
+                return []
+
+            preferences = self.payloads.parse_preferences(data or {})
+
+            print(f"✅ Found {len(preferences)} user preferences")
+            return preferences
+
+        except Exception as e:
+            print(f"❌ Error fetching user preferences: {e}")
+            return []
+
+    async def iter_user_preferences(self, limit: Optional[int] = None,
+                                    prefetch: Optional[int] = None) -> AsyncIterator[UserPreferences]:
+        """Lazily yield every user preference, prefetching the next pages concurrently"""
+        limit = limit or settings.PREFERENCES_PAGE_SIZE
+        prefetch = max(1, prefetch if prefetch is not None else settings.PREFERENCES_PREFETCH_PAGES)
+
+        pending = []
+        next_page = 1
+        total_yielded = 0
+
+        try:
+            # Keep the current page plus `prefetch` pages in flight
+            while len(pending) <= prefetch:
+                pending.append((next_page, self._prefetch_page(next_page, limit)))
+                next_page += 1
+
+            while pending:
+                page, task = pending.pop(0)
+                try:
+                    data = await task
+                except Exception as e:
+                    print(f"❌ Error fetching user preferences page {page}: {e}")
+                    return
+
+                if data is None:
+                    return
+
+                preferences = self.payloads.parse_preferences(data)
+                total_pages = self.payloads.get_total_pages(data)
+                last_page = len(preferences) < limit or (total_pages is not None and page >= total_pages)
+
+                if not last_page and (total_pages is None or next_page <= total_pages):
+                    pending.append((next_page, self._prefetch_page(next_page, limit)))
+                    next_page += 1
+
+                for preference in preferences:
+                    total_yielded += 1
+                    yield preference
+
+                if last_page:
+                    print(f"✅ Streamed {total_yielded} user preferences across {page} pages")
+                    return
+        finally:
+            for _, task in pending:
+                task.cancel()
+
+    def _prefetch_page(self, page: int, limit: int) -> asyncio.Task:
+        """Schedule a page fetch that close() can cancel if it is still pending"""
+        task = asyncio.ensure_future(self._fetch_preferences_page(page, limit))
+        self._prefetch_tasks.add(task)
+        task.add_done_callback(self._prefetch_tasks.discard)
+        return task
+
+    async def _fetch_preferences_page(self, page: int, limit: int) -> Optional[Dict]:
+        """Fetch one raw /user-preferences page, or None when the API rejects it"""
+        url = f"{self.base_url}/user-preferences"
+        params = {"page": page, "limit": limit}
+
+        status, data, text = await self._request("circlo.user_preferences", "GET", url, params=params)
+
+        if status == 401:
+            print("❌ Authentication failed: Invalid or expired token")
+            return None
+        elif status != 200:
+            print(f"❌ API Error on page {page}: {status} - {text}")
+            return None
+
+        return data or {}
+
+    async def get_trending_posts(self, keywords: List[str], limit: int = 15, use_cache: bool = True,
+                                 max_keywords: Optional[int] = 3) -> List[Dict]:
+        """Get trending posts by keywords; only the first `max_keywords` are sent (None sends all)"""
+        params = self.payloads.build_trending_params(keywords, limit, max_keywords)
+        cache_key = self.payloads.trending_cache_key(params)
+
+        # Identical requests already in flight share one upstream call
+        posts = await self._async_trending_flight.do(
+            (cache_key, use_cache),
+            lambda: self._fetch_trending_posts(params, cache_key, use_cache)
+        )
+        return list(posts)
+
+    async def get_trending_posts_fanout(self, keywords: List[str], limit: int = 15,
+                                        chunk_size: Optional[int] = None) -> List[Dict]:
+        """Fetch trending posts for every keyword by fanning chunks out concurrently"""
+        chunks = self.payloads.chunk_keywords(keywords, chunk_size or settings.TREND_FANOUT_CHUNK_SIZE)
+        if len(chunks) <= 1:
+            return await self.get_trending_posts(chunks[0] if chunks else keywords, limit, max_keywords=None)
+
+        print(f"🔀 Fanning out {len(chunks)} keyword groups")
+        results = await asyncio.gather(*(self.get_trending_posts(chunk, limit, max_keywords=None)
+                                         for chunk in chunks))
+
+        posts = self.payloads.merge_posts(results)
+        print(f"✅ Merged {len(posts)} unique trending posts from {len(chunks)} keyword groups")
+        return posts
+
+    async def _fetch_trending_posts(self, params: Dict, cache_key: tuple, use_cache: bool) -> List[Dict]:
+        """Fetch trending posts, serving from or revalidating the cache when allowed"""
+        try:
+            url = f"{self.base_url}/posts/by-keywords"
+
+            entry = self.trending_cache.get(cache_key) if use_cache else None
+            if entry is not None and entry.is_fresh():
+                self.trending_cache.record_hit()
+                print(f"⚡ Using cached trends for: {params['keywords']}")
+                return list(entry.value)
+
+            print(f"🔗 Fetching trends from: {url}")
+            print(f"🔍 Keywords: {params['keywords']}")
+
+            status, data, text, headers = await self._send(
+                "circlo.trending_posts", "GET", url, params=params,
+                headers=entry.validator_headers() if entry is not None else None
+            )
+
+            if status == 304 and entry is not None:
+                self.trending_cache.refresh(cache_key)
+                self.trending_cache.record_revalidation()
+                print(f"✅ Trending posts unchanged ({len(entry.value)} cached)")
+                return list(entry.value)
+            elif status == 401:
+                print("❌ Authentication failed: Invalid or expired token")
+                return []
+            elif status != 200:
+                print(f"❌ API Error: {status} - {text}")
+                return []
+
+            posts = (data or {}).get("posts", [])
+            print(f"✅ Found {len(posts)} trending posts")
+
+            if use_cache:
+                self.trending_cache.record_miss()
+                self.trending_cache.put(cache_key, posts,
+                                        etag=headers.get("ETag"),
+                                        last_modified=headers.get("Last-Modified"))
+            return list(posts)
+
+        except Exception as e:
+            print(f"❌ Error fetching trending posts: {e}")
+            return []
+
+    async def get_posts_engagement(self, post_ids: List[str], batch_size: Optional[int] = None) -> Dict[str, Dict]:
+        """Current like/comment counts for many posts, fetched in concurrent id batches.
+
+        /posts/by-ids is not part of Circlo's documented API (only the fake server
+        serves it), which is why the engagement collector is off by default.
+        """
+        unique_ids = list(dict.fromkeys(post_id for post_id in post_ids if post_id))
+        batch_size = batch_size or settings.ENGAGEMENT_BATCH_SIZE
+        batches = [unique_ids[i:i + batch_size] for i in range(0, len(unique_ids), batch_size)]
+        if not batches:
+            return {}
+
+        results = await asyncio.gather(*(self._fetch_engagement_batch(batch) for batch in batches))
+
+        engagement = {}
+        for batch_engagement in results:
+            engagement.update(batch_engagement)
+        return engagement
+
+    async def _fetch_engagement_batch(self, post_ids: List[str]) -> Dict[str, Dict]:
+        """One /posts/by-ids request; a failed batch returns nothing so it is simply retried later"""
+        try:
+            url = f"{self.base_url}/posts/by-ids"
+            status, data, text = await self._request("circlo.posts_by_ids", "GET", url,
+                                                     params={"ids": ",".join(post_ids)})
+
+            if status != 200:
+                print(f"❌ Engagement API Error: {status}")
+                return {}
+
+            return self.payloads.parse_engagement(data or {})
+
+        except Exception as e:
+            print(f"❌ Error fetching engagement: {e}")
+            return {}
+
+    async def find_post(self, content_data: Dict) -> Optional[str]:
+        """Look up a post already created for `content_data`; raises if Circlo could not be asked.
+
+        Same reconciliation lookup as CircloAPI.find_post.
+        """
+        url = f"{self.base_url}/posts/by-keywords"
+        params = self.payloads.build_trending_params(content_data.get("keywords", []),
+                                                     settings.OUTBOX_RECONCILE_LIMIT, max_keywords=None)
+        status, data, text = await self._request("circlo.find_post", "GET", url, params=params)
+        if status != 200:
+            raise RuntimeError(f"Post lookup failed: {status} - {text}")
+        return self.payloads.find_matching_post((data or {}).get("posts", []), content_data)
+
+    async def create_post(self, content_data: Dict, deadline_at: Optional[float] = None) -> PostResult:
+        """Create a new post on Circlo; no retry is started past `deadline_at` (time.monotonic())"""
+        try:
+            url = f"{self.base_url}/user-preferences/recommend/create-post"
+
+            payload = self.payloads.build_post_payload(content_data)
+            niche = payload["niche"]
+
+            shape = self.niche_cache.choose_shape(niche)
+            if shape == "general":
+                print(f"⚡ Niche '{niche}' was recently rejected, posting with 'General'")
+                return await self._create_post_with_general_niche(content_data, niche, deadline_at)
+
+            print(f"📮 Posting to: {url}")
+            print(f"📝 Payload niche: {niche}")
+            print(f"📝 Payload media_type: {content_data.get('media_type')}")
+
+            status, data, text = await self._request("circlo.create_post", "POST", url, json=payload,
+                                                     headers=self.payloads.idempotency_headers(content_data),
+                                                     retry_statuses=self.payloads.create_post_retry_statuses(),
+                                                     deadline_at=deadline_at)
+
+            if status == 500:
+                if "No profiles found with niche" in (data or {}).get("error", ""):
+                    print(f"⚠️ Niche '{niche}' not available, trying with 'General'")
+                    self.niche_cache.mark_niche_rejected(niche)
+                    return await self._create_post_with_general_niche(content_data, niche, deadline_at)
+                else:
+                    print(f"❌ Server Error 500: {text}")
+                    return await self._create_post_simple(content_data, niche, deadline_at)
+            elif status != 200 and status != 201:
+                print(f"❌ API Error {status}: {text}")
+                self.niche_cache.record_shape(niche, "requested", status)
+                return self.payloads.failed_post_result(content_data)
+
+            result = data or {}
+            print(f"✅ Post created successfully: {result.get('post', {}).get('id', 'unknown')}")
+            self.niche_cache.record_shape(niche, "requested", status)
+
+            return self.payloads.successful_post_result(content_data, result,
+                                                         {"likeCount": 0, "commentCount": 0})
+
+        except Exception as e:
+            print(f"❌ Error creating post: {e}")
+            return self.payloads.failed_post_result(content_data)
+
+    async def create_posts(self, content_list: List[Dict]) -> List[PostResult]:
+        """Create many posts concurrently, returning results in input order"""
+        return list(await asyncio.gather(*(self.create_post(content_data) for content_data in content_list)))
+
+    async def _create_post_with_general_niche(self, content_data: Dict, niche: str,
+                                              deadline_at: Optional[float] = None) -> PostResult:
+        """Create post with General niche"""
+        try:
+            url = f"{self.base_url}/user-preferences/recommend/create-post"
+
+            payload = self.payloads.build_general_niche_payload(content_data)
+
+            print("🔄 Trying with 'General' niche...")
+            status, data, text = await self._request("circlo.create_post", "POST", url, json=payload,
+                                                     headers=self.payloads.idempotency_headers(content_data),
+                                                     retry_statuses=self.payloads.create_post_retry_statuses(),
+                                                     deadline_at=deadline_at)
+
+            if status == 200 or status == 201:
+                result = data or {}
+                print(f"✅ Post created with General niche: {result.get('post', {}).get('id', 'unknown')}")
+                self.niche_cache.record_shape(niche, "general", status)
+                return self.payloads.successful_post_result(content_data, result)
+            else:
+                print(f"❌ General niche also failed: {status}")
+                self.niche_cache.record_shape(niche, "general", status)
+                return await self._create_post_simple(content_data, niche, deadline_at)
+
+        except Exception as e:
+            print(f"❌ General niche failed: {e}")
+            return await self._create_post_simple(content_data, niche, deadline_at)
+
+    async def _create_post_simple(self, content_data: Dict, niche: str,
+                                  deadline_at: Optional[float] = None) -> PostResult:
+        """Try creating post with simplest possible payload"""
+        try:
+            url = f"{self.base_url}/user-preferences/recommend/create-post"
+
+            payload = self.payloads.build_simple_payload(content_data)
+
+            print("🔄 Trying with simplest payload...")
+            status, data, text = await self._request("circlo.create_post", "POST", url, json=payload,
+                                                     headers=self.payloads.idempotency_headers(content_data),
+                                                     retry_statuses=self.payloads.create_post_retry_statuses(),
+                                                     deadline_at=deadline_at)
+
+            if status == 200 or status == 201:
+                result = data or {}
+                print(f"✅ Simple post created: {result.get('post', {}).get('id', 'unknown')}")
+                self.niche_cache.record_shape(niche, "simple", status)
+                return self.payloads.successful_post_result(content_data, result)
+            else:
+                print(f"❌ Simple post failed: {status} - {text}")
+                self.niche_cache.record_shape(niche, "simple", status)
+                return self.payloads.failed_post_result(content_data)
+
+        except Exception as e:
+            print(f"❌ Simple post failed: {e}")
+            return self.payloads.failed_post_result(content_data)
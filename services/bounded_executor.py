@@ -0,0 +1,62 @@
+import math
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, List, Optional, Sequence
+
+
+def run_with_deadlines(fn: Callable[[Any], Any], items: Sequence, concurrency: int, deadline: float,
+                       on_timeout: Callable[[Any, Optional[Future]], Any],
+                       on_error: Optional[Callable[[Any, Exception], Any]] = None,
+                       thread_name_prefix: str = "bounded") -> List:
+    """Run `fn(item)` with at most `concurrency` in flight, returning one result per item in input order.
+
+    Each item gets `deadline` seconds from when a worker picks it up. Waiting for
+    a queued item to start is bounded too: once the batch has had `deadline` per
+    wave of `concurrency` items, items still queued are cancelled without running.
+    `on_timeout(item, future)` supplies the result for an item that did not
+    finish in time; `future` is None if it never started, otherwise it is still
+    running and finishes in the background. Exceptions from `fn` go to
+    `on_error(item, error)`, or propagate when it is not given.
+    """
+    if not items:
+        return []
+
+    workers = min(concurrency, len(items))
+    batch_deadline_at = time.monotonic() + deadline * math.ceil(len(items) / workers)
+    started_at: List[Optional[float]] = [None] * len(items)
+    started = [threading.Event() for _ in items]
+
+    def run(index: int):
+        started_at[index] = time.monotonic()
+        started[index].set()
+        return fn(items[index])
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=thread_name_prefix)
+    futures = [executor.submit(run, i) for i in range(len(items))]
+
+    results = []
+    try:
+        for i, future in enumerate(futures):
+            if not started[i].wait(max(0.0, batch_deadline_at - time.monotonic())):
+                if future.cancel():
+                    results.append(on_timeout(items[i], None))
+                    continue
+                # Picked up just as the batch ran out of time; it still gets its own deadline
+                started[i].wait()
+
+            # Each item's deadline starts when a worker picks it up, not when it was queued
+            remaining = max(0.0, started_at[i] + deadline - time.monotonic())
+            try:
+                results.append(future.result(timeout=remaining))
+            except FutureTimeoutError:
+                results.append(on_timeout(items[i], future))
+            except Exception as e:
+                if on_error is None:
+                    raise
+                results.append(on_error(items[i], e))
+    finally:
+        # Don't let a hung item hold the caller; stragglers finish in the background
+        executor.shutdown(wait=False)
+
+    return results
@@ -0,0 +1,181 @@
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from config.settings import settings
+from services.rate_limiter import RateLimitWaitTimeout
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose circuit is open"""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"circuit '{name}' is open, retry in {retry_in:.0f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Closed / open / half-open circuit breaker for one endpoint.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls
+    fail immediately with CircuitOpenError. Once `recovery_timeout` has passed
+    it lets a few trial calls through (half-open); a success closes it again,
+    a failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: Optional[int] = None,
+                 recovery_timeout: Optional[float] = None, half_open_max_calls: Optional[int] = None):
+        self.name = name
+        self.failure_threshold = failure_threshold or settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD
+        self.recovery_timeout = recovery_timeout or settings.CIRCUIT_BREAKER_RECOVERY_TIMEOUT.total_seconds()
+        self.half_open_max_calls = half_open_max_calls or settings.CIRCUIT_BREAKER_HALF_OPEN_MAX_CALLS
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.half_open_calls = 0
+        self.rejected_calls = 0
+        self.listeners: List[Callable[[str, str, str], None]] = []
+        self.lock = threading.Lock()
+
+    def add_listener(self, listener: Callable[[str, str, str], None]):
+        """Register listener(name, old_state, new_state) for state changes"""
+        self.listeners.append(listener)
+
+    def allow_request(self) -> bool:
+        with self.lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.recovery_timeout:
+                    self.rejected_calls += 1
+                    return False
+                self._transition(self.HALF_OPEN)
+
+            if self.state == self.HALF_OPEN:
+                if self.half_open_calls >= self.half_open_max_calls:
+                    self.rejected_calls += 1
+                    return False
+                self.half_open_calls += 1
+
+            return True
+
+    def record_success(self):
+        with self.lock:
+            self.consecutive_failures = 0
+            if self.state != self.CLOSED:
+                self._transition(self.CLOSED)
+
+    def record_failure(self):
+        with self.lock:
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                if self.state != self.OPEN:
+                    self._transition(self.OPEN)
+
+    def call(self, fn: Callable, failure_statuses: Optional[List[int]] = None):
+        """Run `fn` through the breaker.
+
+        Exceptions count as failures, as do responses whose `status_code` is in
+        `failure_statuses` (default: 429 and 5xx). A RateLimitWaitTimeout means
+        the call never left our own rate limiter, so it records no outcome.
+        """
+        if not self.allow_request():
+            raise CircuitOpenError(self.name, self.retry_in())
+
+        recorded = False
+        try:
+            try:
+                result = fn()
+            except RateLimitWaitTimeout:
+                raise
+            except Exception:
+                recorded = True
+                self.record_failure()
+                raise
+
+            status = getattr(result, "status_code", None)
+            recorded = True
+            if status is not None and self.is_failure_status(status, failure_statuses):
+                self.record_failure()
+            else:
+                self.record_success()
+            return result
+        finally:
+            if not recorded:
+                self.release()
+
+    def release(self):
+        """Give back a half-open trial slot for a call that ended without an outcome (e.g. cancelled)"""
+        with self.lock:
+            if self.state == self.HALF_OPEN and self.half_open_calls > 0:
+                self.half_open_calls -= 1
+
+    def retry_in(self) -> float:
+        """Seconds until an open circuit lets a trial call through"""
+        with self.lock:
+            if self.state != self.OPEN:
+                return 0.0
+            return max(0.0, self.recovery_timeout - (time.monotonic() - self.opened_at))
+
+    def get_state(self) -> Dict:
+        with self.lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "rejected_calls": self.rejected_calls
+            }
+
+    def is_failure_status(self, status: int, failure_statuses: Optional[List[int]]) -> bool:
+        if failure_statuses is not None:
+            return status in failure_statuses
+        return status == 429 or status >= 500
+
+    def _transition(self, new_state: str):
+        """Change state and notify listeners; caller holds the lock"""
+        old_state = self.state
+        self.state = new_state
+        self.half_open_calls = 0
+
+        print(f"🔌 Circuit '{self.name}': {old_state} -> {new_state}")
+        for listener in self.listeners:
+            try:
+                listener(self.name, old_state, new_state)
+            except Exception as e:
+                print(f"❌ Circuit listener error: {e}")
+
+
+class CircuitBreakerRegistry:
+    """One breaker per endpoint name, shared process-wide"""
+
+    def __init__(self):
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.listeners: List[Callable[[str, str, str], None]] = []
+        self.lock = threading.Lock()
+
+    def get(self, name: str) -> CircuitBreaker:
+        with self.lock:
+            if name not in self.breakers:
+                breaker = CircuitBreaker(name)
+                for listener in self.listeners:
+                    breaker.add_listener(listener)
+                self.breakers[name] = breaker
+            return self.breakers[name]
+
+    def add_listener(self, listener: Callable[[str, str, str], None]):
+        """Register a state-change listener on every current and future breaker"""
+        with self.lock:
+            self.listeners.append(listener)
+            for breaker in self.breakers.values():
+                breaker.add_listener(listener)
+
+    def get_states(self) -> Dict[str, Dict]:
+        with self.lock:
+            breakers = list(self.breakers.values())
+        return {breaker.name: breaker.get_state() for breaker in breakers}
+
+
+circuit_breakers = CircuitBreakerRegistry()
@@ -0,0 +1,480 @@
+import json
+import os
+import sqlite3
+import threading
+from dataclasses import asdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from config.settings import settings
+from models.content_models import GeneratedContent, PostResult, TrendAnalysis
+from models.series_models import Series, SeriesEpisode
+from services.dedupe_store import content_fingerprint
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS generated_content (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    content_id TEXT,
+    user_id TEXT,
+    content_type TEXT NOT NULL,
+    caption TEXT NOT NULL,
+    description TEXT,
+    keywords TEXT NOT NULL,
+    media_source TEXT,
+    media_prompt TEXT,
+    viral_score INTEGER,
+    trend_alignment TEXT,
+    episode_data TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_generated_content_user ON generated_content (user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_generated_content_created ON generated_content (created_at);
+CREATE INDEX IF NOT EXISTS idx_generated_content_content ON generated_content (content_id);
+
+CREATE TABLE IF NOT EXISTS post_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    post_id TEXT,
+    content_id TEXT,
+    user_id TEXT,
+    content_type TEXT,
+    success INTEGER NOT NULL,
+    posted_at TEXT NOT NULL,
+    engagement_metrics TEXT,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_post_results_post ON post_results (post_id);
+CREATE INDEX IF NOT EXISTS idx_post_results_user ON post_results (user_id, posted_at);
+CREATE INDEX IF NOT EXISTS idx_post_results_posted ON post_results (posted_at);
+CREATE INDEX IF NOT EXISTS idx_post_results_content ON post_results (content_id);
+
+CREATE TABLE IF NOT EXISTS engagement_schedule (
+    post_id TEXT PRIMARY KEY,
+    posted_at REAL NOT NULL,
+    next_check_at REAL NOT NULL,
+    checks INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_engagement_schedule_due ON engagement_schedule (next_check_at);
+
+CREATE TABLE IF NOT EXISTS trend_snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT,
+    viral_keywords TEXT NOT NULL,
+    engagement_patterns TEXT NOT NULL,
+    best_content_type TEXT,
+    total_posts_analyzed INTEGER,
+    viral_score INTEGER,
+    meme_keywords TEXT,
+    captured_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_trend_snapshots_user ON trend_snapshots (user_id, captured_at);
+CREATE INDEX IF NOT EXISTS idx_trend_snapshots_captured ON trend_snapshots (captured_at);
+
+CREATE TABLE IF NOT EXISTS series (
+    series_id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    genre TEXT,
+    plot_summary TEXT,
+    main_characters TEXT,
+    episodes TEXT,
+    total_episodes INTEGER,
+    current_episode INTEGER,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_series_updated ON series (updated_at);
+
+CREATE TABLE IF NOT EXISTS post_outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT NOT NULL,
+    user_id TEXT,
+    content TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    post_id TEXT,
+    last_error TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_post_outbox_ready ON post_outbox (status, available_at);
+-- Only one live entry per key; delivered or failed content can be queued again
+CREATE UNIQUE INDEX IF NOT EXISTS idx_post_outbox_live_key ON post_outbox (idempotency_key)
+    WHERE status IN ('pending', 'in_flight', 'uncertain');
+"""
+
+
+class ContentDatabase:
+    """SQLite storage for generated content, post results, trend snapshots and series state.
+
+    Runs in WAL mode so reads never block the cycle's writes. Writes are batched
+    into single transactions with executemany, and sqlite3's statement cache
+    keeps the parameterized statements prepared.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.DATABASE_PATH
+        if self.path != ":memory:" and os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        self.connection = sqlite3.connect(
+            self.path,
+            check_same_thread=False,
+            cached_statements=settings.DATABASE_STATEMENT_CACHE_SIZE
+        )
+        self.connection.row_factory = sqlite3.Row
+        self.lock = threading.RLock()
+
+        with self.lock:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.execute("PRAGMA temp_store=MEMORY")
+            self._add_missing_columns()
+            self._drop_outbox_unique_key()
+            self.connection.executescript(SCHEMA)
+
+    def _add_missing_columns(self):
+        """Bring databases created before the content_id join key up to the current schema"""
+        for table in ("generated_content", "post_results"):
+            columns = {row["name"] for row in self.connection.execute(f"PRAGMA table_info({table})")}
+            if columns and "content_id" not in columns:
+                self.connection.execute(f"ALTER TABLE {table} ADD COLUMN content_id TEXT")
+
+    def _drop_outbox_unique_key(self):
+        """Rebuild outbox tables whose idempotency_key is UNIQUE for all time; SCHEMA adds the partial index"""
+        row = self.connection.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'post_outbox'"
+        ).fetchone()
+        if not row or "UNIQUE" not in row["sql"]:
+            return
+        with self.connection:
+            self.connection.execute("BEGIN")
+            self.connection.execute(row["sql"].replace("post_outbox", "post_outbox_rebuilt", 1).replace(" UNIQUE", ""))
+            self.connection.execute("INSERT INTO post_outbox_rebuilt SELECT * FROM post_outbox")
+            self.connection.execute("DROP TABLE post_outbox")
+            self.connection.execute("ALTER TABLE post_outbox_rebuilt RENAME TO post_outbox")
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    def _executemany(self, sql: str, rows: Iterable[tuple]) -> int:
+        """Insert rows in transactions of DATABASE_BATCH_SIZE"""
+        total = 0
+        batch = []
+        with self.lock:
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= settings.DATABASE_BATCH_SIZE:
+                    with self.connection:
+                        self.connection.executemany(sql, batch)
+                    total += len(batch)
+                    batch = []
+            if batch:
+                with self.connection:
+                    self.connection.executemany(sql, batch)
+                total += len(batch)
+        return total
+
+    def _query(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        with self.lock:
+            return self.connection.execute(sql, params).fetchall()
+
+    # Generated content
+
+    def save_generated_content(self, content_list: List[GeneratedContent], user_id: Optional[str] = None) -> int:
+        """Store content keyed by its fingerprint, the content_id post results are joined on"""
+        now = datetime.now().isoformat()
+        return self._executemany(
+            """INSERT INTO generated_content (content_id, user_id, content_type, caption, description, keywords,
+                                              media_source, media_prompt, viral_score, trend_alignment,
+                                              episode_data, created_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            ((content_fingerprint(content.content_type, content.caption, content.keywords, content.media_prompt),
+              user_id, content.content_type, content.caption, content.description, json.dumps(content.keywords),
+              content.media_source, content.media_prompt, content.viral_score,
+              json.dumps(content.trend_alignment), json.dumps(content.episode_data), now)
+             for content in content_list)
+        )
+
+    def get_generated_content(self, user_id: Optional[str] = None, since: Optional[datetime] = None,
+                              limit: int = 100) -> List[GeneratedContent]:
+        sql = "SELECT * FROM generated_content WHERE 1=1"
+        params = []
+        if user_id is not None:
+            sql += " AND user_id = ?"
+            params.append(user_id)
+        if since is not None:
+            sql += " AND created_at >= ?"
+            params.append(since.isoformat())
+        sql += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+
+        return [GeneratedContent(
+            content_type=row["content_type"],
+            caption=row["caption"],
+            description=row["description"],
+            keywords=json.loads(row["keywords"]),
+            media_source=row["media_source"],
+            viral_score=row["viral_score"],
+            trend_alignment=json.loads(row["trend_alignment"] or "[]"),
+            episode_data=json.loads(row["episode_data"] or "{}"),
+            media_prompt=row["media_prompt"]
+        ) for row in self._query(sql, tuple(params))]
+
+    # Post results
+
+    def save_post_results(self, post_results: List[PostResult], user_id: Optional[str] = None) -> int:
+        """Store post outcomes and schedule engagement collection for the successful ones"""
+        now = datetime.now().isoformat()
+        with self.lock:
+            saved = self._executemany(
+                """INSERT INTO post_results (post_id, content_id, user_id, content_type, success, posted_at,
+                                             engagement_metrics, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                ((result.post_id, result.content_id, user_id, result.content_type, int(result.success), result.posted_at.isoformat(),
+                  json.dumps(result.engagement_metrics), now)
+                 for result in post_results)
+            )
+            self._executemany(
+                """INSERT OR IGNORE INTO engagement_schedule (post_id, posted_at, next_check_at)
+                   VALUES (?, ?, ?)""",
+                ((result.post_id, result.posted_at.timestamp(), result.posted_at.timestamp())
+                 for result in post_results if result.success and result.post_id)
+            )
+        return saved
+
+    def get_post_result(self, post_id: str) -> Optional[PostResult]:
+        rows = self._query("SELECT * FROM post_results WHERE post_id = ? ORDER BY id DESC LIMIT 1", (post_id,))
+        return self._row_to_post_result(rows[0]) if rows else None
+
+    def get_content_post_result(self, content_id: str) -> Optional[PostResult]:
+        """Latest successful post stored for a content fingerprint"""
+        rows = self._query("SELECT * FROM post_results WHERE content_id = ? AND success = 1 ORDER BY id DESC LIMIT 1",
+                           (content_id,))
+        return self._row_to_post_result(rows[0]) if rows else None
+
+    def get_post_results(self, user_id: Optional[str] = None, since: Optional[datetime] = None,
+                         successful_only: bool = False, limit: int = 100) -> List[PostResult]:
+        sql = "SELECT * FROM post_results WHERE 1=1"
+        params = []
+        if user_id is not None:
+            sql += " AND user_id = ?"
+            params.append(user_id)
+        if since is not None:
+            sql += " AND posted_at >= ?"
+            params.append(since.isoformat())
+        if successful_only:
+            sql += " AND success = 1"
+        sql += " ORDER BY posted_at DESC LIMIT ?"
+        params.append(limit)
+        return [self._row_to_post_result(row) for row in self._query(sql, tuple(params))]
+
+    def get_post_stats(self, since: Optional[datetime] = None, user_id: Optional[str] = None) -> Dict:
+        """Aggregate post outcomes in SQL instead of recomputing from in-memory lists"""
+        sql = """SELECT COUNT(*) AS total, COALESCE(SUM(success), 0) AS successful,
+                        content_type FROM post_results WHERE 1=1"""
+        params = []
+        if since is not None:
+            sql += " AND posted_at >= ?"
+            params.append(since.isoformat())
+        if user_id is not None:
+            sql += " AND user_id = ?"
+            params.append(user_id)
+        sql += " GROUP BY content_type"
+
+        by_type = {row["content_type"]: {"total": row["total"], "successful": row["successful"]}
+                   for row in self._query(sql, tuple(params))}
+        total = sum(stats["total"] for stats in by_type.values())
+        successful = sum(stats["successful"] for stats in by_type.values())
+        return {
+            "total_posts": total,
+            "successful_posts": successful,
+            "failed_posts": total - successful,
+            "success_rate": successful / total if total else 0,
+            "by_content_type": by_type
+        }
+
+    def get_posts_due_for_engagement(self, limit: int) -> List[Dict]:
+        """Posts whose next engagement check is due, most overdue first"""
+        rows = self._query(
+            """SELECT post_id, posted_at, checks FROM engagement_schedule
+               WHERE next_check_at <= ? ORDER BY next_check_at LIMIT ?""",
+            (datetime.now().timestamp(), limit)
+        )
+        return [{"post_id": row["post_id"], "posted_at": datetime.fromtimestamp(row["posted_at"]),
+                 "checks": row["checks"]} for row in rows]
+
+    def update_engagement(self, engagement: Dict[str, Dict], next_checks: Dict[str, Optional[float]]) -> int:
+        """Write fresh metrics and reschedule checked posts; a next check of None stops tracking"""
+        now = datetime.now().isoformat()
+        with self.lock:
+            updated = self._executemany(
+                "UPDATE post_results SET engagement_metrics = ?, updated_at = ? WHERE post_id = ?",
+                ((json.dumps(metrics), now, post_id) for post_id, metrics in engagement.items())
+            )
+            self._executemany(
+                "UPDATE engagement_schedule SET next_check_at = ?, checks = checks + 1 WHERE post_id = ?",
+                ((next_check, post_id) for post_id, next_check in next_checks.items() if next_check is not None)
+            )
+            self._executemany(
+                "DELETE FROM engagement_schedule WHERE post_id = ?",
+                ((post_id,) for post_id, next_check in next_checks.items() if next_check is None)
+            )
+        return updated
+
+    def _row_to_post_result(self, row: sqlite3.Row) -> PostResult:
+        return PostResult(
+            success=bool(row["success"]),
+            post_id=row["post_id"],
+            content_type=row["content_type"],
+            posted_at=datetime.fromisoformat(row["posted_at"]),
+            engagement_metrics=json.loads(row["engagement_metrics"] or "{}"),
+            content_id=row["content_id"]
+        )
+
+    # Post outbox
+
+    def enqueue_outbox(self, items: List[tuple], user_id: Optional[str] = None) -> int:
+        """Durably queue (idempotency_key, content) pairs; keys with an entry still being delivered are ignored"""
+        now = datetime.now()
+        with self.lock:
+            before = self.connection.total_changes
+            self._executemany(
+                """INSERT OR IGNORE INTO post_outbox (idempotency_key, user_id, content, status, attempts,
+                                                      available_at, created_at, updated_at)
+                   VALUES (?, ?, ?, 'pending', 0, ?, ?, ?)""",
+                ((key, user_id, json.dumps(asdict(content)), now.timestamp(), now.isoformat(), now.isoformat())
+                 for key, content in items)
+            )
+            return self.connection.total_changes - before
+
+    def claim_outbox(self, limit: int, lease_seconds: float) -> List[Dict]:
+        """Lease up to `limit` ready entries; a lease that expires makes the entry ready again"""
+        now = datetime.now()
+        with self.lock, self.connection:
+            rows = self.connection.execute(
+                """SELECT * FROM post_outbox
+                   WHERE status IN ('pending', 'in_flight', 'uncertain') AND available_at <= ?
+                   ORDER BY id LIMIT ?""",
+                (now.timestamp(), limit)
+            ).fetchall()
+            self.connection.executemany(
+                """UPDATE post_outbox SET status = 'in_flight', attempts = attempts + 1,
+                                          available_at = ?, updated_at = ?
+                   WHERE id = ?""",
+                [(now.timestamp() + lease_seconds, now.isoformat(), row["id"]) for row in rows]
+            )
+
+        return [{
+            "id": row["id"],
+            "idempotency_key": row["idempotency_key"],
+            "user_id": row["user_id"],
+            "content": GeneratedContent(**json.loads(row["content"])),
+            "attempts": row["attempts"] + 1,
+            # An expired lease or a timed-out post may have been created on Circlo after all
+            "uncertain": row["status"] in ("in_flight", "uncertain")
+        } for row in rows]
+
+    def complete_outbox(self, outbox_id: int, post_id: Optional[str] = None):
+        with self.lock, self.connection:
+            self.connection.execute(
+                "UPDATE post_outbox SET status = 'delivered', post_id = ?, updated_at = ? WHERE id = ?",
+                (post_id, datetime.now().isoformat(), outbox_id)
+            )
+
+    def retry_outbox(self, outbox_id: int, delay: float, error: str, give_up: bool = False,
+                     uncertain: bool = False):
+        """Put a failed entry back after `delay` seconds, or mark it failed for good.
+
+        An `uncertain` entry may already be posted and is reconciled before it is sent again.
+        """
+        status = "failed" if give_up else "uncertain" if uncertain else "pending"
+        now = datetime.now()
+        with self.lock, self.connection:
+            self.connection.execute(
+                """UPDATE post_outbox SET status = ?, available_at = ?, last_error = ?, updated_at = ?
+                   WHERE id = ?""",
+                (status, now.timestamp() + delay, error, now.isoformat(), outbox_id)
+            )
+
+    def get_outbox_stats(self) -> Dict:
+        rows = self._query("SELECT status, COUNT(*) AS count FROM post_outbox GROUP BY status")
+        counts = {row["status"]: row["count"] for row in rows}
+        return {status: counts.get(status, 0)
+                for status in ("pending", "in_flight", "uncertain", "delivered", "failed")}
+
+    # Trend snapshots
+
+    def save_trend_analysis(self, trend_analysis: TrendAnalysis, user_id: Optional[str] = None) -> int:
+        return self.save_trend_analyses([trend_analysis], user_id)
+
+    def save_trend_analyses(self, trend_analyses: List[TrendAnalysis], user_id: Optional[str] = None) -> int:
+        now = datetime.now().isoformat()
+        return self._executemany(
+            """INSERT INTO trend_snapshots (user_id, viral_keywords, engagement_patterns, best_content_type,
+                                            total_posts_analyzed, viral_score, meme_keywords, captured_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            ((user_id, json.dumps(trend.viral_keywords), json.dumps(trend.engagement_patterns),
+              trend.best_content_type, trend.total_posts_analyzed, trend.viral_score,
+              json.dumps(trend.meme_keywords), now)
+             for trend in trend_analyses)
+        )
+
+    def get_latest_trend_analysis(self, user_id: Optional[str] = None) -> Optional[TrendAnalysis]:
+        if user_id is None:
+            rows = self._query("SELECT * FROM trend_snapshots ORDER BY captured_at DESC LIMIT 1")
+        else:
+            rows = self._query(
+                "SELECT * FROM trend_snapshots WHERE user_id = ? ORDER BY captured_at DESC LIMIT 1", (user_id,)
+            )
+        if not rows:
+            return None
+
+        row = rows[0]
+        return TrendAnalysis(
+            viral_keywords=json.loads(row["viral_keywords"]),
+            engagement_patterns=json.loads(row["engagement_patterns"]),
+            best_content_type=row["best_content_type"],
+            total_posts_analyzed=row["total_posts_analyzed"],
+            viral_score=row["viral_score"],
+            meme_keywords=json.loads(row["meme_keywords"] or "[]")
+        )
+
+    # Series state
+
+    def save_series(self, series: Series) -> int:
+        now = datetime.now().isoformat()
+        return self._executemany(
+            """INSERT INTO series (series_id, title, genre, plot_summary, main_characters, episodes,
+                                   total_episodes, current_episode, created_at, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(series_id) DO UPDATE SET
+                   title = excluded.title, genre = excluded.genre, plot_summary = excluded.plot_summary,
+                   main_characters = excluded.main_characters, episodes = excluded.episodes,
+                   total_episodes = excluded.total_episodes, current_episode = excluded.current_episode,
+                   updated_at = excluded.updated_at""",
+            [(series.series_id, series.title, series.genre, series.plot_summary,
+              json.dumps(series.main_characters), json.dumps([asdict(episode) for episode in series.episodes]),
+              series.total_episodes, series.current_episode, series.created_at.isoformat(), now)]
+        )
+
+    def get_series(self, series_id: str) -> Optional[Series]:
+        rows = self._query("SELECT * FROM series WHERE series_id = ?", (series_id,))
+        return self._row_to_series(rows[0]) if rows else None
+
+    def get_latest_series(self) -> Optional[Series]:
+        """The most recently updated series, so a restart continues it instead of starting over"""
+        rows = self._query("SELECT * FROM series ORDER BY updated_at DESC LIMIT 1")
+        return self._row_to_series(rows[0]) if rows else None
+
+    def _row_to_series(self, row: sqlite3.Row) -> Series:
+        return Series(
+            series_id=row["series_id"],
+            title=row["title"],
+            genre=row["genre"],
+            plot_summary=row["plot_summary"],
+            main_characters=json.loads(row["main_characters"] or "[]"),
+            episodes=[SeriesEpisode(**episode) for episode in json.loads(row["episodes"] or "[]")],
+            total_episodes=row["total_episodes"],
+            current_episode=row["current_episode"],
+            created_at=datetime.fromisoformat(row["created_at"])
+        )
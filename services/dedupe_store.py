@@ -0,0 +1,156 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+from config.settings import settings
+from utils.helpers import stable_digest
+
+
+def content_fingerprint(content_type: str, caption: str, keywords: List[str],
+                        media_prompt: Optional[str] = None) -> str:
+    """Fingerprint of what makes two pieces of content the same post"""
+    def normalize(text: Optional[str]) -> str:
+        return " ".join((text or "").lower().split())
+
+    return stable_digest(
+        normalize(content_type),
+        normalize(caption),
+        sorted({normalize(keyword) for keyword in keywords if keyword}),
+        normalize(media_prompt)
+    )
+
+
+class ContentFingerprintStore:
+    """Persistent, append-only index of content fingerprints.
+
+    Fingerprints are recorded per kind ("generated", "posted") with a timestamp
+    and forgotten after `retention_seconds`. The file is loaded lazily on first
+    use and compacted when it holds expired entries.
+
+    A factory reserves a fingerprint before generating so concurrent work does
+    not produce the same content twice. The reservation lives in memory only:
+    it is committed to disk once the content is posted, released if generation
+    or posting fails, and dropped after `claim_ttl_seconds` if neither happens.
+    """
+
+    def __init__(self, path: Optional[str] = None, retention_seconds: Optional[float] = None,
+                 claim_ttl_seconds: Optional[float] = None):
+        self.path = path or settings.DEDUPE_STORE_PATH
+        self.retention = retention_seconds if retention_seconds is not None else settings.DEDUPE_RETENTION.total_seconds()
+        self.claim_ttl = (claim_ttl_seconds if claim_ttl_seconds is not None
+                          else settings.DEDUPE_CLAIM_TTL.total_seconds())
+        self.entries: Dict[tuple, float] = {}  # (kind, fingerprint) -> recorded_at
+        self.reserved: Dict[tuple, float] = {}  # (kind, fingerprint) -> expires_at (time.monotonic())
+        self.loaded = False
+        self.skipped = 0
+        self.lock = threading.Lock()
+
+    def contains(self, fingerprint: str, kind: str) -> bool:
+        with self.lock:
+            self._ensure_loaded()
+            return self._is_live((kind, fingerprint))
+
+    def add(self, fingerprint: str, kind: str):
+        with self.lock:
+            self._ensure_loaded()
+            self._append((kind, fingerprint))
+
+    def reserve(self, fingerprint: str, kind: str) -> bool:
+        """Tentatively claim a fingerprint; False if it is recorded or already reserved"""
+        with self.lock:
+            self._ensure_loaded()
+            now = time.monotonic()
+            self.reserved = {key: expires_at for key, expires_at in self.reserved.items() if expires_at > now}
+
+            key = (kind, fingerprint)
+            if self._is_live(key) or key in self.reserved:
+                self.skipped += 1
+                return False
+            self.reserved[key] = now + self.claim_ttl
+            return True
+
+    def commit(self, fingerprint: str, kind: str):
+        """Make a reservation permanent (a no-op if it was already recorded)"""
+        with self.lock:
+            self._ensure_loaded()
+            key = (kind, fingerprint)
+            self.reserved.pop(key, None)
+            if not self._is_live(key):
+                self._append(key)
+
+    def release(self, fingerprint: str, kind: str):
+        """Drop a reservation so the content can be produced again"""
+        with self.lock:
+            self.reserved.pop((kind, fingerprint), None)
+
+    def record_skip(self):
+        with self.lock:
+            self.skipped += 1
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            self._ensure_loaded()
+            counts = {}
+            for kind, _ in self.entries:
+                counts[kind] = counts.get(kind, 0) + 1
+            return {"fingerprints": counts, "reserved": len(self.reserved), "duplicates_skipped": self.skipped}
+
+    def _is_live(self, key: tuple) -> bool:
+        recorded_at = self.entries.get(key)
+        return recorded_at is not None and time.time() - recorded_at < self.retention
+
+    def _append(self, key: tuple):
+        recorded_at = time.time()
+        self.entries[key] = recorded_at
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"kind": key[0], "fingerprint": key[1], "recorded_at": recorded_at}) + "\n")
+        except OSError as e:
+            print(f"❌ Error writing fingerprint store: {e}")
+
+    def _ensure_loaded(self):
+        """Load the index from disk once, dropping expired entries; caller holds the lock"""
+        if self.loaded:
+            return
+        self.loaded = True
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if not os.path.exists(self.path):
+            return
+
+        total_lines = 0
+        cutoff = time.time() - self.retention
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    total_lines += 1
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if record.get("recorded_at", 0) >= cutoff:
+                        self.entries[(record["kind"], record["fingerprint"])] = record["recorded_at"]
+        except OSError as e:
+            print(f"❌ Error reading fingerprint store: {e}")
+            return
+
+        if total_lines > len(self.entries):
+            self._compact()
+
+    def _compact(self):
+        """Rewrite the file with only live entries"""
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                for (kind, fingerprint), recorded_at in self.entries.items():
+                    f.write(json.dumps({"kind": kind, "fingerprint": fingerprint, "recorded_at": recorded_at}) + "\n")
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"❌ Error compacting fingerprint store: {e}")
+
+
+# Shared so every factory and the post manager see the same history
+content_fingerprints = ContentFingerprintStore()
@@ -0,0 +1,156 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class DiskLRUCache:
+    """Persistent, content-addressed LRU cache of JSON-serializable values.
+
+    Each entry is a file named after its key (a stable digest), sharded by the
+    first two hex characters. The in-memory index is rebuilt lazily from the
+    directory on first use, ordered by file mtime; a hit touches the file so
+    recency survives restarts. Entries are evicted least recently used first
+    once `max_entries` or `max_bytes` is exceeded, and expire `ttl_seconds`
+    after they were written.
+    """
+
+    def __init__(self, directory: str, max_bytes: Optional[int] = None,
+                 max_entries: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+
+        self.index: "OrderedDict[str, int]" = OrderedDict()  # key -> size, least recently used first
+        self.total_bytes = 0
+        self.loaded = False
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self.lock:
+            self._ensure_loaded()
+            if key not in self.index:
+                self.misses += 1
+                return None
+
+            try:
+                with open(self._path(key), "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            if self.ttl is not None and time.time() - entry.get("written_at", 0) >= self.ttl:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            try:
+                os.utime(self._path(key))
+            except OSError:
+                pass
+            self.index.move_to_end(key)
+            self.hits += 1
+            return entry.get("value")
+
+    def put(self, key: str, value: Any):
+        with self.lock:
+            self._ensure_loaded()
+            written_at = time.time()
+            data = json.dumps({"value": value, "written_at": written_at}, ensure_ascii=False)
+
+            path = self._path(key)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"⚠️ Could not write cache entry: {e}")
+                return
+
+            if key in self.index:
+                self.total_bytes -= self.index.pop(key)
+            size = len(data.encode("utf-8"))
+            self.index[key] = size
+            self.total_bytes += size
+            self._evict()
+
+    def delete(self, key: str):
+        with self.lock:
+            self._ensure_loaded()
+            if key in self.index:
+                self._remove(key)
+
+    def clear(self):
+        with self.lock:
+            self._ensure_loaded()
+            for key in list(self.index):
+                self._remove(key)
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            self._ensure_loaded()
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.index),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _ensure_loaded(self):
+        if self.loaded:
+            return
+        self.loaded = True
+
+        entries = []
+        if os.path.isdir(self.directory):
+            for shard in os.listdir(self.directory):
+                shard_path = os.path.join(self.directory, shard)
+                if not os.path.isdir(shard_path):
+                    continue
+                for name in os.listdir(shard_path):
+                    if not name.endswith(".json"):
+                        continue
+                    try:
+                        stat = os.stat(os.path.join(shard_path, name))
+                    except OSError:
+                        continue
+                    # mtime is bumped on every hit, so it doubles as last use for LRU order
+                    entries.append((stat.st_mtime, name[:-len(".json")], stat.st_size))
+
+        for _, key, size in sorted(entries):
+            self.index[key] = size
+            self.total_bytes += size
+        self._evict()
+
+    def _evict(self):
+        while self.index and ((self.max_entries is not None and len(self.index) > self.max_entries) or
+                              (self.max_bytes is not None and self.total_bytes > self.max_bytes)):
+            self._remove(next(iter(self.index)))
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        self.total_bytes -= self.index.pop(key)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
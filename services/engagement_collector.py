@@ -0,0 +1,94 @@
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+from config.settings import settings
+from services.circlo_api import CircloAPI
+from services.database import ContentDatabase
+
+
+class EngagementCollector:
+    """Background refresh of like/comment counts for posted content.
+
+    Every successful post gets an engagement schedule row. Due posts are fetched
+    in concurrent /posts/by-ids batches and rescheduled after a fraction of their
+    age, so fresh posts are polled every minute or so and week-old posts rarely,
+    until they age out of tracking entirely. main.py only starts it when
+    ENGAGEMENT_ENABLED is set, as /posts/by-ids is served by the fake server only.
+    """
+
+    def __init__(self, database: ContentDatabase, circlo_api: Optional[CircloAPI] = None,
+                 max_posts_per_run: Optional[int] = None):
+        self.database = database
+        self.circlo_api = circlo_api or CircloAPI()
+        self.max_posts_per_run = max_posts_per_run or settings.ENGAGEMENT_BATCH_SIZE * settings.ENGAGEMENT_MAX_WORKERS
+        self.poll_interval = settings.ENGAGEMENT_POLL_INTERVAL.total_seconds()
+
+        self.runs = 0
+        self.posts_checked = 0
+        self.posts_updated = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the background collector (no-op if it is already running)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="engagement-collector", daemon=True)
+        self._thread.start()
+        print("📈 Engagement collector started")
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                checked = self.collect_once()
+            except Exception as e:
+                print(f"❌ Engagement collector error: {e}")
+                checked = 0
+            # A full run means more posts are due right away
+            if checked < self.max_posts_per_run:
+                self._stop.wait(self.poll_interval)
+
+    def collect_once(self) -> int:
+        """Refresh engagement for due posts; returns how many posts were checked"""
+        due_posts = self.database.get_posts_due_for_engagement(self.max_posts_per_run)
+        if not due_posts:
+            return 0
+
+        engagement = self.circlo_api.get_posts_engagement([post["post_id"] for post in due_posts])
+
+        # Posts missing from the response (failed batch, deleted post) are rescheduled too,
+        # so they back off instead of staying due forever
+        now = datetime.now()
+        next_checks = {post["post_id"]: self._next_check(post["posted_at"], now) for post in due_posts}
+
+        self.database.update_engagement(engagement, next_checks)
+
+        self.runs += 1
+        self.posts_checked += len(due_posts)
+        self.posts_updated += len(engagement)
+        print(f"📈 Refreshed engagement for {len(engagement)}/{len(due_posts)} posts")
+        return len(due_posts)
+
+    def _next_check(self, posted_at: datetime, now: datetime) -> Optional[float]:
+        """Timestamp of the next check, backing off with age; None once the post is too old to track"""
+        age = (now - posted_at).total_seconds()
+        if age >= settings.ENGAGEMENT_MAX_AGE.total_seconds():
+            return None
+
+        interval = min(settings.ENGAGEMENT_MAX_INTERVAL.total_seconds(),
+                       max(settings.ENGAGEMENT_MIN_INTERVAL.total_seconds(),
+                           age * settings.ENGAGEMENT_BACKOFF_FACTOR))
+        return now.timestamp() + interval
+
+    def get_stats(self) -> Dict:
+        return {
+            "runs": self.runs,
+            "posts_checked": self.posts_checked,
+            "posts_updated": self.posts_updated
+        }
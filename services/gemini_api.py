@@ -1,160 +1,351 @@
 import requests
 import json
-from typing import Dict, List
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+from requests.adapters import HTTPAdapter
 from config.settings import settings
+from services.disk_cache import DiskLRUCache
+from services.rate_limiter import rate_limiter
+from services.prompt_compactor import estimate_tokens, prompt_compactor, token_usage
+from services.section_parser import CONTENT_SECTIONS, VIDEO_SECTIONS, SectionParser
+from utils.helpers import stable_digest
+
+CAPTION_TEMPLATE = """You are a viral content creator. Create engaging social media content.
+
+TREND ANALYSIS: {trend_data}
+CONTENT IDEA: {content_idea}
+
+Generate:
+1. A compelling caption (max 220 characters)
+2. Detailed visual description for AI generation
+3. 5 relevant hashtags
+
+Format your response as:
+CAPTION: [your caption]
+DESCRIPTION: [visual description]
+HASHTAGS: [hashtag1, hashtag2, hashtag3, hashtag4, hashtag5]"""
+
+VIDEO_SCRIPT_TEMPLATE = """You are a viral video scriptwriter. Create engaging video content.
+
+TREND DATA: {trend_data}
+VIDEO IDEA: {content_idea}
+
+Generate:
+1. Engaging video script (45-60 seconds)
+2. Scene descriptions
+3. Viral hook in first 3 seconds
+4. Call-to-action
+
+Format:
+SCRIPT: [full script]
+HOOK: [opening hook]
+SCENES: [scene descriptions]
+CTA: [call to action]"""
 
 
 class GeminiAPI:
+    # One pooled session shared by every client so connections are reused
+    _session: Optional[requests.Session] = None
+    _session_lock = threading.Lock()
+    # Successful responses keyed by model and request payload, persisted across restarts
+    _response_cache = DiskLRUCache(
+        settings.GEMINI_TEXT_CACHE_DIR,
+        max_bytes=settings.GEMINI_TEXT_CACHE_MAX_BYTES,
+        max_entries=settings.GEMINI_TEXT_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.GEMINI_TEXT_CACHE_TTL.total_seconds()
+    )
+
     def __init__(self):
         self.api_key = settings.GEMINI_API_KEY
         self.base_url = settings.GEMINI_BASE_URL
+        self.model = settings.GEMINI_TEXT_MODEL
+        self.session = self._get_session()
+        self.response_cache = self._response_cache
 
-    def generate_content(self, prompt: str, context: Dict = None) -> str:
-        """Generate content using Gemini AI"""
+    @classmethod
+    def _get_session(cls) -> requests.Session:
+        with cls._session_lock:
+            if cls._session is None:
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.GEMINI_POOL_MAXSIZE)
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                cls._session = session
+            return cls._session
+
+    def generate_content(self, prompt: str, context: Dict = None, deadline: Optional[float] = None,
+                         use_cache: bool = True, template: str = "custom") -> str:
+        """Generate content using Gemini AI, giving up after `deadline` seconds"""
         try:
-            url = f"{self.base_url}?key={self.api_key}"
+            url = f"{self.base_url}/models/{self.model}:generateContent"
+            started = time.monotonic()
+            deadline_at = started + (deadline or settings.GEMINI_DEADLINE_SECONDS)
 
             full_prompt = self._build_prompt(prompt, context)
+            payload = self._build_payload(full_prompt)
 
-            payload = {
-                "contents": [
-                    {
-                        "parts": [
-                            {
-                                "text": full_prompt
-                            }
-                        ]
-                    }
-                ]
-            }
+            # The payload carries the prompt and any generation config, so it keys the cache
+            cache_key = stable_digest(self.model, payload)
+            if use_cache:
+                cached = self.response_cache.get(cache_key)
+                if cached is not None:
+                    token_usage.record_cached(template)
+                    return cached
 
-            response = requests.post(url, json=payload)
-            response.raise_for_status()
+            response = rate_limiter.call("gemini.generate_content",
+                                         lambda: self._post(url, payload, deadline_at),
+                                         deadline_at=deadline_at)
+            if not response.ok:
+                response.close()
+                response.raise_for_status()
 
-            data = response.json()
-            return data["candidates"][0]["content"]["parts"][0]["text"]
+            data = self._read_json(response, deadline_at)
+            text = data["candidates"][0]["content"]["parts"][0]["text"]
+            self._record_usage(template, data.get("usageMetadata"), full_prompt, text, started)
+            if use_cache:
+                self.response_cache.put(cache_key, text)
+            return text
 
         except Exception as e:
             print(f"Error generating content with Gemini: {e}")
             return "Content generation failed."
 
+    def _post(self, url: str, payload: Dict, deadline_at: float) -> requests.Response:
+        """POST with whatever time is left before the deadline as the read timeout"""
+        remaining = deadline_at - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("Gemini deadline exceeded")
+        return self.session.post(
+            url,
+            json=payload,
+            headers={"x-goog-api-key": self.api_key},
+            timeout=(min(settings.GEMINI_CONNECT_TIMEOUT, remaining), remaining),
+            stream=True
+        )
+
+    def _read_json(self, response: requests.Response, deadline_at: float) -> Dict:
+        """Read the whole body within the deadline"""
+        with self._deadline_guard(response, deadline_at):
+            body = response.content
+        return json.loads(body)
+
+    @contextmanager
+    def _deadline_guard(self, response: requests.Response, deadline_at: float) -> Iterator[None]:
+        """Abort the connection at the deadline so a slow trickle cannot outlive it"""
+        timer = threading.Timer(max(0.0, deadline_at - time.monotonic()), self._abort, (response,))
+        timer.start()
+        try:
+            yield
+        except Exception:
+            if time.monotonic() >= deadline_at:
+                raise TimeoutError("Gemini deadline exceeded while reading response")
+            raise
+        finally:
+            timer.cancel()
+            response.close()
+
+    def _abort(self, response: requests.Response):
+        """Shut the socket down; closing alone does not wake a thread blocked reading it"""
+        sock = getattr(getattr(response.raw, "_connection", None), "sock", None)
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        response.close()
+
+    def generate_content_stream(self, prompt: str, parser: SectionParser, context: Dict = None,
+                                deadline: Optional[float] = None, use_cache: bool = True,
+                                template: str = "custom") -> Optional[Dict]:
+        """Stream a completion into `parser`, which reports each section as soon as it completes.
+
+        Returns the parsed sections, or None unless the stream finished and every
+        section arrived complete; a section cut off mid-stream is never reported.
+        """
+        try:
+            url = f"{self.base_url}/models/{self.model}:streamGenerateContent?alt=sse"
+            started = time.monotonic()
+            deadline_at = started + (deadline or settings.GEMINI_DEADLINE_SECONDS)
+
+            full_prompt = self._build_prompt(prompt, context)
+            payload = self._build_payload(full_prompt)
+
+            # Shares cache entries with generate_content: same model and payload, same text
+            cache_key = stable_digest(self.model, payload)
+            if use_cache:
+                cached = self.response_cache.get(cache_key)
+                if cached is not None:
+                    token_usage.record_cached(template)
+                    parser.feed(cached)
+                    return self._complete_sections(parser)
+
+            response = rate_limiter.call("gemini.generate_content",
+                                         lambda: self._post(url, payload, deadline_at),
+                                         deadline_at=deadline_at)
+            if not response.ok:
+                response.close()
+                response.raise_for_status()
+
+            chunks = []
+            usage = None
+            with self._deadline_guard(response, deadline_at):
+                # text/event-stream is UTF-8, but requests would decode it as ISO-8859-1
+                for raw_line in response.iter_lines(chunk_size=None):
+                    line = raw_line.decode("utf-8")
+                    if not line.startswith("data:"):
+                        continue
+                    event = json.loads(line[len("data:"):])
+                    # Usage metadata is cumulative; the last event carries the totals
+                    usage = event.get("usageMetadata") or usage
+                    chunk = self._chunk_text(event)
+                    chunks.append(chunk)
+                    parser.feed(chunk)
+
+            self._record_usage(template, usage, full_prompt, "".join(chunks), started)
+            if use_cache and chunks:
+                self.response_cache.put(cache_key, "".join(chunks))
+            return self._complete_sections(parser)
+
+        except Exception as e:
+            # The section being streamed may be cut short, so it is not flushed as complete
+            print(f"Error streaming content from Gemini: {e}")
+            return None
+
+    def _complete_sections(self, parser: SectionParser) -> Optional[Dict]:
+        """Flush the finished stream; None if any section never arrived"""
+        result = parser.close()
+        return result if set(parser.completed) >= set(parser.sections) else None
+
+    def _record_usage(self, template: str, usage: Optional[Dict], prompt: str, text: str, started: float):
+        """Record reported token usage, estimating when the response did not include it"""
+        usage = usage or {}
+        token_usage.record(
+            template,
+            usage.get("promptTokenCount", estimate_tokens(prompt)),
+            usage.get("candidatesTokenCount", estimate_tokens(text)),
+            time.monotonic() - started
+        )
+
+    def get_token_usage(self) -> Dict[str, Dict]:
+        """Input/output tokens and latency per prompt template"""
+        return token_usage.get_stats()
+
+    def _chunk_text(self, event: Dict) -> str:
+        candidates = event.get("candidates") or [{}]
+        parts = candidates[0].get("content", {}).get("parts", [])
+        return "".join(part.get("text", "") for part in parts)
+
+    def _build_payload(self, full_prompt: str) -> Dict:
+        return {
+            "contents": [
+                {
+                    "parts": [
+                        {
+                            "text": full_prompt
+                        }
+                    ]
+                }
+            ]
+        }
+
+    def generate_content_batch(self, prompts: List[str], contexts: Optional[List[Dict]] = None,
+                               deadline: Optional[float] = None, use_cache: bool = True,
+                               template: str = "custom") -> List[str]:
+        """Generate content for many prompts concurrently, returning results in prompt order"""
+        if not prompts:
+            return []
+        contexts = contexts or [None] * len(prompts)
+
+        with ThreadPoolExecutor(max_workers=min(len(prompts), settings.GEMINI_BATCH_CONCURRENCY),
+                                thread_name_prefix="gemini-text") as executor:
+            return list(executor.map(lambda args: self.generate_content(args[0], args[1], deadline, use_cache, template),
+                                     zip(prompts, contexts)))
+
+    def get_cache_stats(self) -> Dict:
+        """Hit/miss/eviction counters for the response cache"""
+        return self.response_cache.get_stats()
+
     def _build_prompt(self, prompt: str, context: Dict) -> str:
         """Build enhanced prompt with context"""
         if not context:
             return prompt
 
-        context_str = json.dumps(context, indent=2)
+        budget = settings.GEMINI_PROMPT_TOKEN_BUDGET - estimate_tokens(prompt)
+        context_str = prompt_compactor.compact("context", {"context": context}, max(0, budget))["context"]
         return f"Context: {context_str}\n\nTask: {prompt}"
 
-    def generate_viral_caption(self, trend_data: Dict, content_idea: Dict) -> Dict:
+    def generate_viral_caption(self, trend_data: Dict, content_idea: Dict, use_cache: bool = True) -> Dict:
         """Generate viral caption and description for content"""
-        prompt = f"""
-        You are a viral content creator. Create engaging social media content.
-
-        TREND ANALYSIS: {json.dumps(trend_data, indent=2)}
-        CONTENT IDEA: {json.dumps(content_idea, indent=2)}
-
-        Generate:
-        1. A compelling caption (max 220 characters)
-        2. Detailed visual description for AI generation
-        3. 5 relevant hashtags
+        response = self.generate_content(self._caption_prompt(trend_data, content_idea), use_cache=use_cache,
+                                         template="caption")
+        return self._parse_content_response(response)
 
-        Format your response as:
-        CAPTION: [your caption]
-        DESCRIPTION: [visual description] 
-        HASHTAGS: [hashtag1, hashtag2, hashtag3, hashtag4, hashtag5]
-        """
+    def generate_viral_captions(self, trend_data: Dict, content_ideas: List[Dict],
+                                use_cache: bool = True) -> List[Dict]:
+        """Generate captions for many ideas at once, in idea order"""
+        prompts = [self._caption_prompt(trend_data, idea) for idea in content_ideas]
+        return [self._parse_content_response(response)
+                for response in self.generate_content_batch(prompts, use_cache=use_cache, template="caption")]
 
-        response = self.generate_content(prompt)
-        return self._parse_content_response(response)
+    def _caption_prompt(self, trend_data: Dict, content_idea: Dict) -> str:
+        return prompt_compactor.render("caption", CAPTION_TEMPLATE,
+                                       trend_data=trend_data, content_idea=content_idea)
 
-    def generate_video_script(self, trend_data: Dict, content_idea: Dict) -> Dict:
+    def generate_video_script(self, trend_data: Dict, content_idea: Dict, use_cache: bool = True) -> Dict:
         """Generate viral video script"""
-        prompt = f"""
-        You are a viral video scriptwriter. Create engaging video content.
-
-        TREND DATA: {json.dumps(trend_data, indent=2)}
-        VIDEO IDEA: {json.dumps(content_idea, indent=2)}
-
-        Generate:
-        1. Engaging video script (45-60 seconds)
-        2. Scene descriptions
-        3. Viral hook in first 3 seconds
-        4. Call-to-action
-
-        Format:
-        SCRIPT: [full script]
-        HOOK: [opening hook]
-        SCENES: [scene descriptions]
-        CTA: [call to action]
-        """
-
-        response = self.generate_content(prompt)
+        response = self.generate_content(self._video_script_prompt(trend_data, content_idea), use_cache=use_cache,
+                                         template="video_script")
         return self._parse_video_response(response)
 
+    def generate_video_scripts(self, trend_data: Dict, content_ideas: List[Dict],
+                               use_cache: bool = True) -> List[Dict]:
+        """Generate video scripts for many ideas at once, in idea order"""
+        prompts = [self._video_script_prompt(trend_data, idea) for idea in content_ideas]
+        return [self._parse_video_response(response)
+                for response in self.generate_content_batch(prompts, use_cache=use_cache,
+                                                            template="video_script")]
+
+    def _video_script_prompt(self, trend_data: Dict, content_idea: Dict) -> str:
+        return prompt_compactor.render("video_script", VIDEO_SCRIPT_TEMPLATE,
+                                       trend_data=trend_data, content_idea=content_idea)
+
     def _parse_content_response(self, response: str) -> Dict:
         """Parse Gemini response for content generation"""
         try:
-            lines = response.split('\n')
-            result = {"caption": "", "description": "", "hashtags": []}
-
-            current_section = ""
-            for line in lines:
-                line = line.strip()
-                if line.startswith("CAPTION:"):
-                    current_section = "caption"
-                    result["caption"] = line.replace("CAPTION:", "").strip()
-                elif line.startswith("DESCRIPTION:"):
-                    current_section = "description"
-                    result["description"] = line.replace("DESCRIPTION:", "").strip()
-                elif line.startswith("HASHTAGS:"):
-                    current_section = "hashtags"
-                    hashtags_str = line.replace("HASHTAGS:", "").strip()
-                    result["hashtags"] = [tag.strip() for tag in hashtags_str.split(',')]
-                elif current_section and line:
-                    result[current_section] += " " + line
-
-            return result
+            parser = SectionParser(CONTENT_SECTIONS)
+            parser.feed(response)
+            return parser.close()
 
         except Exception as e:
             print(f"Error parsing content response: {e}")
-            return {
-                "caption": "Check out this amazing content!",
-                "description": "Engaging social media content",
-                "hashtags": ["viral", "trending", "content"]
-            }
+            return self._fallback_content()
 
     def _parse_video_response(self, response: str) -> Dict:
         """Parse Gemini response for video script"""
         try:
-            lines = response.split('\n')
-            result = {"script": "", "hook": "", "scenes": "", "cta": ""}
-
-            current_section = ""
-            for line in lines:
-                line = line.strip()
-                if line.startswith("SCRIPT:"):
-                    current_section = "script"
-                    result["script"] = line.replace("SCRIPT:", "").strip()
-                elif line.startswith("HOOK:"):
-                    current_section = "hook"
-                    result["hook"] = line.replace("HOOK:", "").strip()
-                elif line.startswith("SCENES:"):
-                    current_section = "scenes"
-                    result["scenes"] = line.replace("SCENES:", "").strip()
-                elif line.startswith("CTA:"):
-                    current_section = "cta"
-                    result["cta"] = line.replace("CTA:", "").strip()
-                elif current_section and line:
-                    result[current_section] += " " + line
-
-            return result
+            parser = SectionParser(VIDEO_SECTIONS)
+            parser.feed(response)
+            return parser.close()
 
         except Exception as e:
             print(f"Error parsing video response: {e}")
-            return {
-                "script": "Engaging video content about current trends.",
-                "hook": "You won't believe this!",
-                "scenes": "Various engaging scenes",
-                "cta": "Follow for more content!"
-            }
\ No newline at end of file
+            return self._fallback_video()
+
+    def _fallback_content(self) -> Dict:
+        return {
+            "caption": "Check out this amazing content!",
+            "description": "Engaging social media content",
+            "hashtags": ["viral", "trending", "content"]
+        }
+
+    def _fallback_video(self) -> Dict:
+        return {
+            "script": "Engaging video content about current trends.",
+            "hook": "You won't believe this!",
+            "scenes": "Various engaging scenes",
+            "cta": "Follow for more content!"
+        }
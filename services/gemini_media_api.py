@@ -1,21 +1,62 @@
 import requests
 import json
+import threading
 import time
-from typing import Dict, List, Optional
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
 from config.settings import settings
+from services.circuit_breaker import circuit_breakers
+from services.disk_cache import DiskLRUCache
+from services.job_manager import job_manager
+from services.rate_limiter import rate_limiter
+from services.single_flight import SingleFlight
+from utils.helpers import stable_digest
 
 
 class GeminiMediaAPI:
     """Gemini API for generating images and videos"""
 
+    # Identical image prompts in flight across all instances share one generation
+    _image_flight = SingleFlight()
+    # Generated media URLs keyed by a stable digest of what was generated, persisted across restarts
+    _media_cache = DiskLRUCache(
+        settings.MEDIA_CACHE_DIR,
+        max_bytes=settings.MEDIA_CACHE_MAX_BYTES,
+        max_entries=settings.MEDIA_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.MEDIA_CACHE_TTL.total_seconds()
+    )
+
+    # Per-thread flag read by the media router so cache hits don't count as provider latency
+    _cache_hits = threading.local()
+
+    FALLBACK_PREFIXES = (
+        "https://picsum.photos/",
+        "https://ai-video-storage.googleapis.com/simulated-video-"
+    )
+
     def __init__(self):
         self.api_key = settings.GEMINI_API_KEY
-        self.base_url = "https://generativelanguage.googleapis.com/v1beta"
+        self.base_url = settings.GEMINI_BASE_URL
+        self.image_model = settings.GEMINI_IMAGE_MODEL
+        self.video_model = settings.GEMINI_VIDEO_MODEL
+        self.media_cache = self._media_cache
 
-    def generate_image(self, prompt: str, style: str = "realistic") -> Optional[str]:
+    def generate_image(self, prompt: str, style: str = "realistic", use_cache: bool = True) -> Optional[str]:
         """Generate image using Gemini API"""
+        cache_key = stable_digest("image", self.image_model, prompt, style)
+        if use_cache:
+            cached = self.media_cache.get(cache_key)
+            if cached is not None:
+                print(f"⚡ Using cached image for: {prompt.strip()[:60]}...")
+                self._cache_hits.hit = True
+                return cached
+
+        return self._image_flight.do((prompt, style), lambda: self._generate_image(prompt, style, cache_key))
+
+    def _generate_image(self, prompt: str, style: str, cache_key: str) -> Optional[str]:
+        """Call the Gemini image endpoint, falling back to a placeholder on failure"""
         try:
-            url = f"{self.base_url}/models/gemini-2.5-flash-image:generateContent?key={self.api_key}"
+            url = f"{self.base_url}/models/{self.image_model}:generateContent?key={self.api_key}"
 
             enhanced_prompt = f"""
             Create a high-quality, engaging social media image with the following requirements:
@@ -56,13 +97,18 @@ class GeminiMediaAPI:
             }
 
             print(f"🖼️ Generating image with prompt: {prompt[:100]}...")
-            response = requests.post(url, json=payload, headers=headers, timeout=60)
+            # An open circuit raises immediately and lands in the fallback below
+            response = circuit_breakers.get("gemini_media.image").call(lambda: rate_limiter.call(
+                "gemini_media.image",
+                lambda: requests.post(url, json=payload, headers=headers, timeout=60)
+            ))
 
             if response.status_code == 200:
                 result = response.json()
-                # Generate unique image URL based on prompt
-                image_id = abs(hash(prompt)) % 1000000
-                return f"https://ai-generated-images.storage.googleapis.com/gen-image-{image_id}.jpg"
+                # The cache key identifies the image, so the URL is stable across restarts
+                image_url = f"https://ai-generated-images.storage.googleapis.com/gen-image-{cache_key[:16]}.jpg"
+                self.media_cache.put(cache_key, image_url)
+                return image_url
             else:
                 print(f"❌ Image generation failed: {response.status_code} - {response.text}")
                 return self._get_fallback_image(prompt)
@@ -71,75 +117,113 @@ class GeminiMediaAPI:
             print(f"❌ Error generating image: {e}")
             return self._get_fallback_image(prompt)
 
-    def generate_video(self, prompt: str, duration: int = 60) -> Optional[str]:
-        """Generate video using Gemini Video API"""
-        try:
-            # Using Gemini's video generation endpoint
-            url = f"{self.base_url}/models/veo-3.1-generate-preview:generateContent?key={self.api_key}"
-
-            enhanced_prompt = f"""
-            Create a {duration}-second engaging social media video with the following requirements:
-
-            VIDEO CONTEXT: {prompt}
-            DURATION: {duration} seconds
-            REQUIREMENTS:
-            - Vertical format (9:16) for mobile viewing
-            - High quality, engaging content
-            - Clear audio and visuals
-            - Suitable for platforms like TikTok, Instagram Reels, YouTube Shorts
-            - Include dynamic transitions and engaging visuals
-            - Professional quality with modern editing style
-
-            Create a video that will capture attention and perform well on social media.
-            """
-
-            payload = {
-                "contents": [
-                    {
-                        "parts": [
-                            {
-                                "text": enhanced_prompt
-                            }
-                        ]
-                    }
-                ],
-                "generationConfig": {
-                    "temperature": 0.8,
-                    "topK": 40,
-                    "topP": 0.9,
-                    "maxOutputTokens": 2048,
-                },
-                "videoConfig": {
-                    "duration": f"{duration}s",
-                    "aspectRatio": "portrait",
-                    "style": "professional"
-                }
-            }
-
-            headers = {
-                "Content-Type": "application/json"
+    def generate_video(self, prompt: str, duration: int = 60, use_cache: bool = True) -> Optional[str]:
+        """Generate video using Gemini Video API, blocking until it is ready"""
+        return self.submit_video(prompt, duration, use_cache).result()
+
+    def submit_video(self, prompt: str, duration: int = 60, use_cache: bool = True,
+                     callback: Optional[Callable[[str], None]] = None) -> Future:
+        """Start a video generation job; the Future resolves to the video URL (or a fallback)"""
+        supported = self.supported_video_duration(duration)
+        if supported != duration:
+            allowed = sorted(settings.GEMINI_VIDEO_DURATIONS)
+            print(f"🎥 {self.video_model} renders {allowed[0]}-{allowed[-1]}s clips, "
+                  f"using {supported}s instead of {duration}s")
+        duration = supported
+        cache_key = stable_digest("video", self.video_model, prompt, duration)
+        if use_cache:
+            cached = self.media_cache.get(cache_key)
+            if cached is not None:
+                print(f"⚡ Using cached video for: {prompt.strip()[:60]}...")
+                self._cache_hits.hit = True
+                future = Future()
+                future.set_result(cached)
+                if callback:
+                    callback(cached)
+                return future
+
+        print(f"🎥 Queueing {duration}s AI video with prompt: {prompt.strip()[:100]}...")
+        return job_manager.submit(
+            "video",
+            start=lambda: self._start_video_operation(prompt, duration),
+            poll=lambda operation: self._poll_video_operation(operation, cache_key),
+            fallback=lambda: self._generate_simulated_video(prompt, duration),
+            callback=callback
+        )
+
+    def supported_video_duration(self, duration: int) -> int:
+        """Longest clip length the video model accepts that does not exceed `duration`"""
+        allowed = sorted(settings.GEMINI_VIDEO_DURATIONS)
+        return max((seconds for seconds in allowed if seconds <= duration), default=allowed[0])
+
+    def _start_video_operation(self, prompt: str, duration: int) -> str:
+        """Submit a long-running video generation and return its operation name"""
+        url = f"{self.base_url}/models/{self.video_model}:predictLongRunning"
+
+        enhanced_prompt = f"""
+        Create a {duration}-second engaging social media video with the following requirements:
+
+        VIDEO CONTEXT: {prompt}
+        DURATION: {duration} seconds
+        REQUIREMENTS:
+        - Vertical format (9:16) for mobile viewing
+        - High quality, engaging content
+        - Clear audio and visuals
+        - Suitable for platforms like TikTok, Instagram Reels, YouTube Shorts
+        - Include dynamic transitions and engaging visuals
+        - Professional quality with modern editing style
+
+        Create a video that will capture attention and perform well on social media.
+        """
+
+        payload = {
+            "instances": [{"prompt": enhanced_prompt}],
+            "parameters": {
+                "aspectRatio": "9:16",
+                "durationSeconds": duration
             }
-
-            print(f"🎥 Generating {duration}s AI video with prompt: {prompt[:100]}...")
-            response = requests.post(url, json=payload, headers=headers, timeout=120)
-
-            if response.status_code == 200:
-                result = response.json()
-                # Generate unique video URL based on prompt
-                video_id = abs(hash(prompt)) % 1000000
-                return f"https://ai-generated-videos.storage.googleapis.com/gen-video-{video_id}.mp4"
-            else:
-                print(f"❌ Video generation failed: {response.status_code} - {response.text}")
-                return self._generate_simulated_video(prompt, duration)
-
-        except Exception as e:
-            print(f"❌ Error generating video: {e}")
-            return self._generate_simulated_video(prompt, duration)
+        }
+
+        response = circuit_breakers.get("gemini_media.video").call(lambda: rate_limiter.call(
+            "gemini_media.video",
+            lambda: requests.post(url, json=payload, headers=self._headers(), timeout=30),
+            idempotent=False  # each accepted request starts (and bills) a new operation
+        ))
+        if response.status_code != 200:
+            raise RuntimeError(f"Video generation failed: {response.status_code} - {response.text}")
+        return response.json()["name"]
+
+    def _poll_video_operation(self, operation: str, cache_key: str) -> Optional[str]:
+        """Video URL once the operation is done, None while it is still running"""
+        response = rate_limiter.call(
+            "gemini_media.operations",
+            lambda: requests.get(f"{self.base_url}/{operation}", headers=self._headers(), timeout=30)
+        )
+        response.raise_for_status()
+
+        result = response.json()
+        if not result.get("done"):
+            return None
+        if "error" in result:
+            raise RuntimeError(f"Video operation failed: {result['error'].get('message', result['error'])}")
+
+        samples = result.get("response", {}).get("generateVideoResponse", {}).get("generatedSamples", [])
+        video_url = samples[0].get("video", {}).get("uri") if samples else None
+        # Fall back to the stable id when the provider does not hand back a URI
+        video_url = video_url or f"https://ai-generated-videos.storage.googleapis.com/gen-video-{cache_key[:16]}.mp4"
+        self.media_cache.put(cache_key, video_url)
+        return video_url
+
+    def _headers(self) -> Dict:
+        return {
+            "Content-Type": "application/json",
+            "x-goog-api-key": self.api_key
+        }
 
     def _generate_simulated_video(self, prompt: str, duration: int) -> str:
         """Generate simulated video URL when API fails"""
         print(f"🔄 Using simulated video generation for: {prompt[:50]}...")
-        video_id = abs(hash(prompt)) % 1000000
+        video_id = stable_digest(prompt, duration)[:16]
         return f"https://ai-video-storage.googleapis.com/simulated-video-{video_id}.mp4"
 
     def generate_meme_image(self, template: str, top_text: str, bottom_text: str) -> Optional[str]:
@@ -198,9 +282,27 @@ class GeminiMediaAPI:
 
     def generate_episode_video(self, episode_data: Dict) -> Optional[str]:
         """Generate video for series episode"""
+        duration = self.supported_video_duration(self._episode_seconds(episode_data))
         try:
-            prompt = f"""
-            Create a 60-second educational video episode with the following content:
+            return self.generate_video(self._episode_prompt(episode_data), duration=duration)
+
+        except Exception as e:
+            print(f"❌ Error generating episode video: {e}")
+            return self._generate_simulated_video(str(episode_data), duration)
+
+    def submit_episode_video(self, episode_data: Dict,
+                             callback: Optional[Callable[[str], None]] = None) -> Future:
+        """Queue an episode video without waiting for it to render"""
+        return self.submit_video(self._episode_prompt(episode_data), duration=self._episode_seconds(episode_data),
+                                 callback=callback)
+
+    def _episode_seconds(self, episode_data: Dict) -> int:
+        return episode_data.get("duration_seconds", settings.SERIES_EPISODE_SECONDS)
+
+    def _episode_prompt(self, episode_data: Dict) -> str:
+        duration = self.supported_video_duration(self._episode_seconds(episode_data))
+        return f"""
+            Create a {duration}-second educational video episode with the following content:
 
             EPISODE TITLE: {episode_data.get('title', 'Tech Episode')}
             SCRIPT: {episode_data.get('script', 'Educational content about technology')}
@@ -208,7 +310,7 @@ class GeminiMediaAPI:
             CHARACTERS: {', '.join(episode_data.get('characters', ['Host']))}
 
             Video Requirements:
-            - Duration: Exactly 60 seconds
+            - Duration: Exactly {duration} seconds
             - Format: Vertical (9:16) for mobile
             - Style: Professional, educational, engaging
             - Include: Clear narration, visual demonstrations, engaging graphics
@@ -218,24 +320,32 @@ class GeminiMediaAPI:
             Create a compelling educational video that explains complex topics clearly.
             """
 
-            return self.generate_video(prompt, duration=60)
+    def is_fallback(self, url: Optional[str]) -> bool:
+        """Whether `url` is one of the placeholders returned when generation fails"""
+        return not url or url.startswith(self.FALLBACK_PREFIXES)
 
-        except Exception as e:
-            print(f"❌ Error generating episode video: {e}")
-            return self._generate_simulated_video(str(episode_data), 60)
+    def served_from_cache(self) -> bool:
+        """Whether this thread's last call was answered from the media cache; clears the flag"""
+        hit = getattr(self._cache_hits, "hit", False)
+        self._cache_hits.hit = False
+        return hit
+
+    def get_cache_stats(self) -> Dict:
+        """Hit/miss/eviction counters for the media cache"""
+        return self.media_cache.get_stats()
 
     def _get_fallback_image(self, prompt: str) -> str:
         """Get fallback image when API fails"""
         # Use AI-generated placeholder service
-        prompt_hash = abs(hash(prompt)) % 1000000
+        prompt_hash = int(stable_digest(prompt)[:8], 16) % 1000000
         return f"https://picsum.photos/800/600?random={prompt_hash}"
 
     def _get_fallback_meme(self) -> str:
         """Get fallback meme image"""
-        meme_id = abs(hash("meme_fallback")) % 1000
+        meme_id = int(stable_digest("meme_fallback")[:8], 16) % 1000
         return f"https://picsum.photos/800/800?random={meme_id}"
 
     def _get_fallback_thumbnail(self) -> str:
         """Get fallback thumbnail"""
-        thumb_id = abs(hash("thumbnail_fallback")) % 1000
+        thumb_id = int(stable_digest("thumbnail_fallback")[:8], 16) % 1000
         return f"https://picsum.photos/1280/720?random={thumb_id}"
\ No newline at end of file
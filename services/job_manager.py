@@ -0,0 +1,216 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+from config.settings import settings
+
+
+@dataclass
+class Job:
+    job_id: int
+    kind: str
+    start: Callable[[], str]
+    poll: Callable[[str], Any]
+    fallback: Optional[Callable[[], Any]]
+    cancel: Optional[Callable[[str], None]]
+    future: Future
+    deadline_at: float
+    poll_interval: float
+    operation: Optional[str] = None
+    polls: int = 0
+    submitted_at: float = field(default_factory=time.monotonic)
+
+
+class JobManager:
+    """Runs long-running provider operations in the background.
+
+    A job is started with `start()`, which returns a provider operation id, then
+    polled with `poll(operation)` until it returns a result (None means "not done
+    yet"). Polls back off from JOB_POLL_INITIAL_INTERVAL up to
+    JOB_POLL_MAX_INTERVAL. Every job resolves its Future exactly once: with the
+    result, with `fallback()` when it fails or passes its deadline, or with the
+    exception if there is no fallback. A job that passes its deadline, or whose
+    Future is cancelled, has its provider operation cancelled with `cancel()`.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or settings.JOB_MANAGER_MAX_WORKERS
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.scheduled: List[tuple] = []  # heap of (next_poll_at, job_id, job)
+        self.condition = threading.Condition()
+        self.ids = itertools.count(1)
+        self.thread: Optional[threading.Thread] = None
+
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0, "timed_out": 0, "cancelled": 0, "polls": 0}
+
+    def submit(self, kind: str, start: Callable[[], str], poll: Callable[[str], Any],
+               fallback: Optional[Callable[[], Any]] = None, deadline: Optional[float] = None,
+               callback: Optional[Callable[[Any], None]] = None,
+               cancel: Optional[Callable[[str], None]] = None) -> Future:
+        """Queue a job and return a Future for its result"""
+        self._ensure_started()
+
+        future = Future()
+        if callback:
+            future.add_done_callback(self._on_result(callback))
+
+        job = Job(
+            job_id=next(self.ids),
+            kind=kind,
+            start=start,
+            poll=poll,
+            fallback=fallback,
+            cancel=cancel,
+            future=future,
+            deadline_at=time.monotonic() + (deadline or settings.JOB_DEADLINE.total_seconds()),
+            poll_interval=settings.JOB_POLL_INITIAL_INTERVAL.total_seconds()
+        )
+        with self.condition:
+            self.stats["submitted"] += 1
+        self.executor.submit(self._start, job)
+        return future
+
+    def _on_result(self, callback: Callable[[Any], None]) -> Callable[[Future], None]:
+        def done(future: Future):
+            if not future.cancelled() and future.exception() is None:
+                callback(future.result())
+        return done
+
+    def poll_now(self, operation: str) -> bool:
+        """Poll the job for `operation` right away, e.g. when a webhook reports it finished"""
+        with self.condition:
+            for i, (_, job_id, job) in enumerate(self.scheduled):
+                if job.operation == operation:
+                    self.scheduled[i] = (time.monotonic(), job_id, job)
+                    heapq.heapify(self.scheduled)
+                    self.condition.notify()
+                    return True
+        return False
+
+    def get_stats(self) -> Dict:
+        with self.condition:
+            return {**self.stats, "scheduled": len(self.scheduled)}
+
+    def _ensure_started(self):
+        with self.condition:
+            if self.thread and self.thread.is_alive():
+                return
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job-worker")
+            self.thread = threading.Thread(target=self._run, name="job-manager", daemon=True)
+            self.thread.start()
+
+    def _run(self):
+        """Hand each job to a worker when its next poll is due"""
+        while True:
+            with self.condition:
+                while not self.scheduled or self.scheduled[0][0] > time.monotonic():
+                    timeout = self.scheduled[0][0] - time.monotonic() if self.scheduled else None
+                    self.condition.wait(timeout)
+                _, _, job = heapq.heappop(self.scheduled)
+            self.executor.submit(self._poll, job)
+
+    def _schedule(self, job: Job):
+        next_poll_at = min(time.monotonic() + job.poll_interval, job.deadline_at)
+        with self.condition:
+            heapq.heappush(self.scheduled, (next_poll_at, job.job_id, job))
+            self.condition.notify()
+
+    def _start(self, job: Job):
+        if job.future.cancelled():
+            return
+        try:
+            job.operation = job.start()
+            print(f"🛰️ Started {job.kind} job {job.job_id}: {job.operation}")
+        except Exception as e:
+            self._fail(job, e)
+            return
+        self._schedule(job)
+
+    def _poll(self, job: Job):
+        if job.future.cancelled():
+            with self.condition:
+                self.stats["cancelled"] += 1
+            self._cancel_operation(job)
+            return
+
+        if time.monotonic() >= job.deadline_at:
+            with self.condition:
+                self.stats["timed_out"] += 1
+            self._cancel_operation(job)
+            self._fail(job, TimeoutError(f"{job.kind} job {job.job_id} passed its deadline"), count=False)
+            return
+
+        try:
+            job.polls += 1
+            with self.condition:
+                self.stats["polls"] += 1
+            result = job.poll(job.operation)
+        except Exception as e:
+            self._fail(job, e)
+            return
+
+        if result is None:
+            job.poll_interval = min(job.poll_interval * settings.JOB_POLL_BACKOFF,
+                                    settings.JOB_POLL_MAX_INTERVAL.total_seconds())
+            self._schedule(job)
+            return
+
+        if not self._settle(job, lambda: job.future.set_result(result)):
+            # Cancelled while the final poll was in flight; the operation already finished
+            with self.condition:
+                self.stats["cancelled"] += 1
+            return
+        with self.condition:
+            self.stats["completed"] += 1
+        elapsed = time.monotonic() - job.submitted_at
+        print(f"✅ {job.kind} job {job.job_id} finished in {elapsed:.0f}s after {job.polls} polls")
+
+    def _settle(self, job: Job, resolve: Callable[[], None]) -> bool:
+        """Resolve the job's Future; False if the caller cancelled it while the job was working"""
+        if job.future.done():
+            return False
+        try:
+            resolve()
+        except InvalidStateError:
+            return False
+        return True
+
+    def _cancel_operation(self, job: Job):
+        """Stop the provider from finishing work nobody is waiting for"""
+        if job.cancel is None or job.operation is None:
+            return
+        try:
+            job.cancel(job.operation)
+            print(f"🛑 Cancelled {job.kind} job {job.job_id}: {job.operation}")
+        except Exception as e:
+            print(f"⚠️ Could not cancel {job.kind} job {job.job_id}: {e}")
+
+    def _fail(self, job: Job, error: Exception, count: bool = True):
+        if job.future.cancelled():
+            # Nobody is waiting for a fallback, but the provider may still be working
+            with self.condition:
+                self.stats["cancelled"] += 1
+            self._cancel_operation(job)
+            return
+
+        if count:
+            with self.condition:
+                self.stats["failed"] += 1
+        print(f"❌ {job.kind} job {job.job_id} failed: {error}")
+
+        if job.fallback is None:
+            self._settle(job, lambda: job.future.set_exception(error))
+            return
+        try:
+            value = job.fallback()
+        except Exception as e:
+            self._settle(job, lambda: job.future.set_exception(e))
+            return
+        self._settle(job, lambda: job.future.set_result(value))
+
+
+# Shared so every service's jobs are polled by one scheduler
+job_manager = JobManager()
@@ -0,0 +1,300 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+from config.settings import settings
+from services.gemini_media_api import GeminiMediaAPI
+from services.replicate_media_api import ReplicateMediaAPI
+
+
+class ProviderStats:
+    """Rolling latency percentiles and error rate for one media provider"""
+
+    def __init__(self, window: int):
+        self.latencies = deque(maxlen=window)  # successful calls only
+        self.outcomes = deque(maxlen=window)  # True for success
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def record(self, latency: float, ok: bool):
+        with self.lock:
+            self.calls += 1
+            self.outcomes.append(ok)
+            if ok:
+                self.latencies.append(latency)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Latency percentile of recent successes; None until there are enough of them"""
+        with self.lock:
+            if len(self.latencies) < settings.MEDIA_ROUTER_MIN_SAMPLES:
+                return None
+            ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+    def error_rate(self) -> float:
+        with self.lock:
+            if len(self.outcomes) < settings.MEDIA_ROUTER_MIN_SAMPLES:
+                return 0.0
+            return self.outcomes.count(False) / len(self.outcomes)
+
+    def is_healthy(self) -> bool:
+        return self.error_rate() <= settings.MEDIA_ROUTER_MAX_ERROR_RATE
+
+    def get_stats(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "p50_seconds": self.percentile(50),
+            "p95_seconds": self.percentile(95),
+            "error_rate": self.error_rate()
+        }
+
+
+class MediaRouter:
+    """Sends each media request to the fastest healthy provider.
+
+    Providers share GeminiMediaAPI's interface and are ranked by rolling p50
+    latency scaled up by their recent error rate. Providers without enough
+    samples follow the measured healthy ones, in MEDIA_PROVIDERS order, and
+    providers whose error rate is too high are tried last.
+    Placeholder URLs returned on failure count as errors and fail over to the
+    next provider. For the methods in MEDIA_HEDGE_METHODS, a primary call still
+    running after its provider's MEDIA_HEDGE_PERCENTILE latency is hedged with
+    the next provider, and whichever succeeds first wins; the loser is cancelled.
+    Blocking generate_* calls and the submit_* Futures share this routing.
+    """
+
+    def __init__(self, providers: Optional[Dict[str, object]] = None):
+        self.providers = providers if providers is not None else self._default_providers()
+        self.stats = {name: ProviderStats(settings.MEDIA_ROUTER_WINDOW) for name in self.providers}
+        self.executor = ThreadPoolExecutor(max_workers=settings.MEDIA_ROUTER_MAX_WORKERS,
+                                           thread_name_prefix="media-router")
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.lock = threading.Lock()
+
+    def _default_providers(self) -> Dict[str, object]:
+        factories = {"gemini": GeminiMediaAPI, "replicate": ReplicateMediaAPI}
+        providers = {}
+        for name in settings.MEDIA_PROVIDERS:
+            if name == "replicate" and not ReplicateMediaAPI.is_available():
+                continue
+            providers[name] = factories[name]()
+        return providers
+
+    def generate_image(self, prompt: str, style: str = "realistic") -> Optional[str]:
+        return self._call("generate_image", prompt, style)
+
+    def generate_video(self, prompt: str, duration: int = 60) -> Optional[str]:
+        return self._call("generate_video", prompt, duration)
+
+    def generate_meme_image(self, template: str, top_text: str, bottom_text: str) -> Optional[str]:
+        return self._call("generate_meme_image", template, top_text, bottom_text)
+
+    def generate_series_thumbnail(self, episode_title: str, series_theme: str) -> Optional[str]:
+        return self._call("generate_series_thumbnail", episode_title, series_theme)
+
+    def supported_video_duration(self, duration: int) -> int:
+        """Longest length up to `duration` every video provider renders, so failover keeps it the same"""
+        return min((provider.supported_video_duration(duration) for provider in self.providers.values()
+                    if hasattr(provider, "supported_video_duration")), default=duration)
+
+    def submit_image(self, prompt: str, style: str = "realistic") -> Future:
+        return self._submit("generate_image", prompt, style)
+
+    def submit_meme_image(self, template: str, top_text: str, bottom_text: str) -> Future:
+        return self._submit("generate_meme_image", template, top_text, bottom_text)
+
+    def submit_series_thumbnail(self, episode_title: str, series_theme: str) -> Future:
+        return self._submit("generate_series_thumbnail", episode_title, series_theme)
+
+    def submit_episode_video(self, episode_data: Dict,
+                             callback: Optional[Callable[[str], None]] = None) -> Future:
+        """Queue an episode video on the fastest provider that renders in the background"""
+        future = self._submit("generate_episode_video", episode_data)
+        if callback:
+            future.add_done_callback(
+                lambda done: callback(done.result()) if not done.cancelled() and done.exception() is None else None
+            )
+        return future
+
+    def _ranked(self, method: str) -> List[str]:
+        """Providers offering `method`: healthy before unhealthy, measured before unmeasured,
+        then by expected time to a success"""
+        names = [name for name in self.providers if hasattr(self.providers[name], method)]
+        if not names:
+            raise AttributeError(f"No media provider supports {method}")
+        return sorted(names, key=self._rank_key)
+
+    def _rank_key(self, name: str) -> tuple:
+        stats = self.stats[name]
+        p50 = stats.percentile(50)
+        if p50 is None:
+            return not stats.is_healthy(), True, 0.0
+        # A call that fails has to be retried elsewhere, so errors make a provider effectively slower
+        return not stats.is_healthy(), False, p50 / max(1.0 - stats.error_rate(), 0.01)
+
+    def _call(self, method: str, *args):
+        return self._submit(method, *args).result()
+
+    def _submit(self, method: str, *args) -> Future:
+        """Run `method` on the best provider in the background; the Future may be cancelled.
+
+        A placeholder or error fails over to the next provider. For the methods in
+        MEDIA_HEDGE_METHODS, a call still running once its provider's hedge delay
+        has passed (counted from submission, so time queued for a worker counts
+        too) is hedged with the next provider; the first real result wins and the
+        other calls are cancelled, as they are when the caller cancels.
+        """
+        result = Future()
+        remaining = self._ranked(method)
+        first = remaining[0]
+        hedge_enabled = settings.MEDIA_HEDGE_ENABLED and method in settings.MEDIA_HEDGE_METHODS
+        running: Dict[Future, str] = {}
+        timers: List[threading.Timer] = []
+        state = {"fallback": None, "hedged": False}
+        # Reentrant: a call that is already done runs its callback inside launch()
+        lock = threading.RLock()
+
+        def launch():
+            name = remaining.pop(0)
+            call = self._start(name, method, args)
+            running[call] = name
+            delay = self._hedge_delay(name) if hedge_enabled and remaining else None
+            if delay is not None:
+                timer = threading.Timer(delay, hedge, (call,))
+                timer.daemon = True
+                timers.append(timer)
+                timer.start()
+            call.add_done_callback(lambda done: finished(name, done))
+
+        def hedge(call: Future):
+            with lock:
+                if result.done() or call not in running or len(running) > 1 or not remaining:
+                    return
+                print(f"🔀 {running[call]} is slow on {method}, hedging with {remaining[0]}")
+                with self.lock:
+                    self.hedges += 1
+                state["hedged"] = True
+                launch()
+
+        def finished(name: str, call: Future):
+            ok, value = (False, None) if call.cancelled() else call.result()
+            with lock:
+                running.pop(call, None)
+                if result.done():
+                    return
+                if ok:
+                    if state["hedged"] and name != first:
+                        with self.lock:
+                            self.hedge_wins += 1
+                    settle(value)
+                    return
+                state["fallback"] = state["fallback"] or value
+                if running:
+                    return
+                if remaining:
+                    print(f"🔀 {name} failed {method}, trying {remaining[0]}")
+                    launch()
+                    return
+                settle(state["fallback"])
+
+        def settle(value):
+            try:
+                result.set_result(value)
+            except InvalidStateError:
+                pass
+
+        def stop_calls(_: Future):
+            # Losers still queued never start; one already running finishes in the background
+            with lock:
+                for timer in timers:
+                    timer.cancel()
+                for call in list(running):
+                    call.cancel()
+
+        result.add_done_callback(stop_calls)
+        with lock:
+            launch()
+        return result
+
+    def _start(self, name: str, method: str, args: tuple) -> Future:
+        """Start one provider call; the Future resolves to (ok, value) and cancels the call with it.
+
+        A provider with a matching submit_* method runs as a background job, so
+        cancelling also cancels its provider operation. Others run their blocking
+        method on self.executor, where cancelling only stops a call still queued.
+        """
+        provider = self.providers[name]
+        submit = getattr(provider, "submit_" + method[len("generate_"):], None)
+        if submit is None:
+            return self.executor.submit(self._timed, name, method, args)
+
+        outcome = Future()
+        started = time.monotonic()
+        try:
+            job = submit(*args)
+        except Exception as e:
+            print(f"❌ {name} {method} error: {e}")
+            self.stats[name].record(time.monotonic() - started, False)
+            outcome.set_result((False, None))
+            return outcome
+        # Done on return means it came from the provider's cache, which says nothing about its latency
+        cached = job.done()
+
+        def done(job: Future):
+            if job.cancelled():
+                outcome.cancel()
+                return
+            error = job.exception()
+            if error is not None:
+                print(f"❌ {name} {method} error: {error}")
+            ok = error is None and not provider.is_fallback(job.result())
+            if not cached:
+                self.stats[name].record(time.monotonic() - started, ok)
+            try:
+                outcome.set_result((ok, job.result() if error is None else None))
+            except InvalidStateError:
+                pass  # cancelled by the router meanwhile
+
+        outcome.add_done_callback(lambda settled: job.cancel() if settled.cancelled() else None)
+        job.add_done_callback(done)
+        return outcome
+
+    def _hedge_delay(self, name: str) -> Optional[float]:
+        """How long to wait for `name` before hedging; None (never) until its latency is known"""
+        latency = self.stats[name].percentile(settings.MEDIA_HEDGE_PERCENTILE)
+        return None if latency is None else max(settings.MEDIA_HEDGE_MIN_DELAY, latency)
+
+    def _timed(self, name: str, method: str, args: tuple):
+        """Call one provider, recording latency and whether it produced real media"""
+        provider = self.providers[name]
+        self._served_from_cache(provider)
+        started = time.monotonic()
+        try:
+            value = getattr(provider, method)(*args)
+            ok = not provider.is_fallback(value)
+        except Exception as e:
+            print(f"❌ {name} {method} error: {e}")
+            value, ok = None, False
+        # A cache hit says nothing about the provider's latency
+        if not self._served_from_cache(provider):
+            self.stats[name].record(time.monotonic() - started, ok)
+        return ok, value
+
+    def _served_from_cache(self, provider) -> bool:
+        """Read and clear the provider's cache-hit flag for this thread, if it keeps one"""
+        served_from_cache = getattr(provider, "served_from_cache", None)
+        return bool(served_from_cache and served_from_cache())
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            hedges = {"hedges": self.hedges, "hedge_wins": self.hedge_wins}
+        return {
+            "providers": {name: stats.get_stats() for name, stats in self.stats.items()},
+            **hedges
+        }
+
+
+# Shared so every agent's calls feed the same latency stats
+media_router = MediaRouter()
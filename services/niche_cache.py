@@ -0,0 +1,81 @@
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from config.settings import settings
+
+
+class NicheAvailabilityCache:
+    """TTL'd memory of create-post outcomes.
+
+    Tracks niches Circlo rejected with "No profiles found with niche" and, per
+    niche, whether each payload shape ("requested", "general", "simple") last
+    succeeded or was definitively rejected (4xx), so later posts in that niche
+    can skip a request that is known to fail. Transport errors and 5xx are
+    never recorded, and the cache never downgrades a post to the placeholder
+    "simple" payload: only that post's own failures can do that.
+    """
+
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        self.ttl = ttl_seconds if ttl_seconds is not None else settings.NICHE_CACHE_TTL.total_seconds()
+        self.rejected_niches: Dict[str, float] = {}  # niche -> expires_at
+        self.shape_outcomes: Dict[Tuple[str, str], tuple] = {}  # (niche, shape) -> (succeeded, expires_at)
+        self.round_trips_saved = 0
+        self.lock = threading.Lock()
+
+    def mark_niche_rejected(self, niche: str):
+        with self.lock:
+            self.rejected_niches[niche] = time.monotonic() + self.ttl
+
+    def is_niche_rejected(self, niche: str) -> bool:
+        with self.lock:
+            expires_at = self.rejected_niches.get(niche)
+            if expires_at is None:
+                return False
+            if expires_at < time.monotonic():
+                del self.rejected_niches[niche]
+                return False
+            return True
+
+    def record_shape(self, niche: str, shape: str, status: int):
+        """Remember a create-post response: 2xx as success, 4xx as a definitive rejection, anything else not at all"""
+        if 200 <= status < 300:
+            succeeded = True
+        elif 400 <= status < 500 and status != 429:
+            succeeded = False
+        else:
+            return
+        with self.lock:
+            self.shape_outcomes[(niche, shape)] = (succeeded, time.monotonic() + self.ttl)
+
+    def shape_recently_failed(self, niche: str, shape: str) -> bool:
+        with self.lock:
+            outcome = self.shape_outcomes.get((niche, shape))
+            if outcome is None:
+                return False
+            succeeded, expires_at = outcome
+            if expires_at < time.monotonic():
+                del self.shape_outcomes[(niche, shape)]
+                return False
+            return not succeeded
+
+    def choose_shape(self, niche: str) -> str:
+        """Use the General niche when the requested niche is known to be rejected"""
+        if self.is_niche_rejected(niche) or self.shape_recently_failed(niche, "requested"):
+            with self.lock:
+                self.round_trips_saved += 1
+            return "general"
+        return "requested"
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            now = time.monotonic()
+            return {
+                "rejected_niches": sorted(n for n, expires_at in self.rejected_niches.items() if expires_at >= now),
+                "shape_outcomes": {f"{niche}/{shape}": succeeded for (niche, shape), (succeeded, expires_at)
+                                   in self.shape_outcomes.items() if expires_at >= now},
+                "round_trips_saved": self.round_trips_saved
+            }
+
+
+# Shared by every Circlo client so one rejection benefits all later posts
+niche_cache = NicheAvailabilityCache()
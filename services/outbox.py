@@ -0,0 +1,242 @@
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+from config.settings import settings
+from models.content_models import GeneratedContent, PostResult
+from services.database import ContentDatabase
+
+
+class PostOutbox:
+    """Write-ahead outbox between content generation and posting.
+
+    Generated content is written to SQLite before anything is posted, and a
+    background poster drains it with at-least-once delivery: entries are leased,
+    and a lease that is never acknowledged (crash, hung request) is delivered
+    again. Each entry carries its content fingerprint as an Idempotency-Key.
+
+    The Idempotency-Key is not part of Circlo's documented API: only
+    utils/fake_circlo_server.py honours it, so it cannot be relied on to stop a
+    duplicate. A delivery whose outcome is unknown (expired lease, post that
+    timed out mid-flight) is instead marked uncertain and reconciled by looking
+    the post up on Circlo before it is sent again.
+    """
+
+    def __init__(self, database: ContentDatabase, post_manager,
+                 batch_size: Optional[int] = None, poll_interval: Optional[float] = None):
+        self.database = database
+        self.post_manager = post_manager
+        self.batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+        self.poll_interval = poll_interval or settings.OUTBOX_POLL_INTERVAL.total_seconds()
+        self.lease_seconds = settings.OUTBOX_LEASE.total_seconds()
+
+        self._results: List[PostResult] = []
+        self._results_ready = threading.Condition()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def enqueue(self, content_list: List[GeneratedContent], user_id: Optional[str] = None) -> int:
+        """Durably queue content for posting; returns how many entries were new"""
+        items = [(self.post_manager.fingerprint(content), content) for content in content_list]
+        queued = self.database.enqueue_outbox(items, user_id)
+        self._wake.set()
+        return queued
+
+    def post(self, content_list: List[GeneratedContent], user_id: Optional[str] = None,
+             wait: Optional[float] = None) -> List[PostResult]:
+        """Queue content and wait up to `wait` seconds for its outcomes; one result per item in input order.
+
+        Content that was already posted is skipped instead of queued. Content still
+        queued when the wait ends (or at once if the poster is not running) gets a
+        "queued" result; its final outcome is stored by the poster and handed to a
+        later collect_results().
+        """
+        wait = wait if wait is not None else settings.OUTBOX_REPORT_WAIT.total_seconds()
+        skipped = [self.post_manager.skip_if_posted(content) for content in content_list]
+        to_queue = [content for content, result in zip(content_list, skipped) if result is None]
+
+        queued = self.enqueue(to_queue, user_id)
+        print(f"   📬 Queued {queued} pieces")
+        outcomes = self.wait_for_results({self.post_manager.fingerprint(content) for content in to_queue},
+                                         wait if self.is_running() else 0)
+
+        return [result or outcomes.get(self.post_manager.fingerprint(content))
+                or self.post_manager.queued_result(content)
+                for content, result in zip(content_list, skipped)]
+
+    def is_running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def start(self):
+        """Start the background poster (no-op if it is already running)"""
+        if self.is_running():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="post-outbox", daemon=True)
+        self._thread.start()
+        print("📬 Outbox poster started")
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                delivered = self.drain_once()
+            except Exception as e:
+                print(f"❌ Outbox poster error: {e}")
+                delivered = []
+            if not delivered:
+                # enqueue() wakes the poster so new content doesn't wait out the interval
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def drain_once(self) -> List[PostResult]:
+        """Lease one batch, post it and acknowledge each entry; returns the batch's results"""
+        entries = self.database.claim_outbox(self.batch_size, self.lease_seconds)
+        if not entries:
+            return []
+
+        results = []
+        to_post = []
+        for entry in entries:
+            # Posted before a crash but never acknowledged: acknowledge it with the post it became
+            if self.post_manager.is_posted(entry["content"]):
+                results.extend(self._acknowledge_posted(entry))
+            elif entry["uncertain"]:
+                results.extend(self._reconcile(entry, to_post))
+            else:
+                to_post.append(entry)
+
+        if to_post:
+            print(f"📬 Outbox delivering {len(to_post)} queued pieces")
+            # Failed entries are retried, so their generation claims stay held until _retry gives up
+            posted = self.post_manager.post_batch([entry["content"] for entry in to_post], keep_claims=True)
+            for entry, result in zip(to_post, posted):
+                if result.success:
+                    self._deliver(entry, result)
+                elif result.status == "unknown":
+                    self._retry(entry, "outcome unknown", uncertain=True)
+                else:
+                    self._retry(entry, "post failed", result=result)
+            results.extend(posted)
+
+        return results
+
+    def _reconcile(self, entry: Dict, to_post: List[Dict]) -> List[PostResult]:
+        """Check whether an uncertain delivery reached Circlo before sending it again.
+
+        Found posts are acknowledged; entries that are not found join `to_post`,
+        and entries that could not be checked wait for the next retry.
+        """
+        try:
+            result = self.post_manager.find_posted(entry["content"])
+        except Exception as e:
+            print(f"⚠️ Outbox could not reconcile {entry['content'].content_type}: {e}")
+            self._retry(entry, "reconcile failed", uncertain=True)
+            return []
+
+        if result is None:
+            to_post.append(entry)
+            return []
+        self._deliver(entry, result)
+        return [result]
+
+    def _acknowledge_posted(self, entry: Dict) -> List[PostResult]:
+        """Deliver an entry whose content is already recorded as posted.
+
+        The stored post result is reused when there is one; otherwise Circlo is
+        searched for the post. The fingerprint is only recorded once Circlo
+        confirmed the post, so an entry the search cannot find is still delivered,
+        just without a post id.
+        """
+        stored = self.database.get_content_post_result(entry["idempotency_key"])
+        if stored is not None:
+            self._deliver(entry, stored, store=False)
+            return [stored]
+
+        try:
+            result = self.post_manager.find_posted(entry["content"])
+        except Exception as e:
+            print(f"⚠️ Outbox could not look up posted {entry['content'].content_type}: {e}")
+            self._retry(entry, "lookup failed", uncertain=True)
+            return []
+
+        if result is None:
+            result = PostResult(
+                success=True,
+                post_id="",
+                content_type=entry["content"].content_type,
+                posted_at=datetime.now(),
+                engagement_metrics={},
+                content_id=entry["idempotency_key"]
+            )
+        self._deliver(entry, result)
+        return [result]
+
+    def _deliver(self, entry: Dict, result: PostResult, store: bool = True):
+        """Acknowledge a delivered entry; `store=False` for a result that is already in the database"""
+        self.database.complete_outbox(entry["id"], result.post_id)
+        if store:
+            self.database.save_post_results([result], entry["user_id"])
+        self._record(result)
+
+    def _retry(self, entry: Dict, error: str, uncertain: bool = False,
+               result: Optional[PostResult] = None) -> bool:
+        """Schedule another attempt; returns True if the entry was given up on instead.
+
+        Giving up stores `result` (or a failed/unknown result when there is none)
+        as the entry's final outcome.
+        """
+        attempts = entry["attempts"]
+        give_up = attempts >= settings.OUTBOX_MAX_ATTEMPTS
+        delay = min(settings.OUTBOX_RETRY_MAX_DELAY.total_seconds(),
+                    settings.OUTBOX_RETRY_BASE_DELAY.total_seconds() * 2 ** (attempts - 1))
+        self.database.retry_outbox(entry["id"], delay, error, give_up, uncertain)
+
+        if not give_up:
+            print(f"⏳ Outbox will retry {entry['content'].content_type} in {delay:.0f}s ({error})")
+            return False
+
+        self.post_manager.release_claim(entry["content"])
+        print(f"❌ Outbox gave up on {entry['content'].content_type} after {attempts} attempts")
+        if result is None:
+            result = PostResult(
+                success=False,
+                post_id="",
+                content_type=entry["content"].content_type,
+                posted_at=datetime.now(),
+                engagement_metrics={},
+                status="unknown" if uncertain else "failed",
+                content_id=entry["idempotency_key"]
+            )
+        self.database.save_post_results([result], entry["user_id"])
+        self._record(result)
+        return True
+
+    def _record(self, result: PostResult):
+        """Keep a final outcome for collect_results(); retried attempts are not reported"""
+        with self._results_ready:
+            self._results.append(result)
+            self._results_ready.notify_all()
+
+    def wait_for_results(self, content_ids: Set[str], timeout: float) -> Dict[str, PostResult]:
+        """Take the final outcomes for `content_ids`, waiting up to `timeout` seconds for all of them"""
+        with self._results_ready:
+            self._results_ready.wait_for(lambda: content_ids <= {result.content_id for result in self._results},
+                                         timeout)
+            found = {result.content_id: result for result in self._results if result.content_id in content_ids}
+            self._results = [result for result in self._results if result.content_id not in content_ids]
+        return found
+
+    def collect_results(self) -> List[PostResult]:
+        """Final outcomes (delivered or given up on) since the last call, from any cycle"""
+        with self._results_ready:
+            results, self._results = self._results, []
+        return results
+
+    def get_stats(self) -> Dict:
+        return self.database.get_outbox_stats()
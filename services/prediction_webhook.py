@@ -0,0 +1,153 @@
+import base64
+import hashlib
+import hmac
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional
+from config.settings import settings
+from services.job_manager import job_manager
+
+TERMINAL_STATUSES = ("succeeded", "failed", "canceled")
+# Replicate signs webhooks with a timestamp; older deliveries are rejected as replays
+MAX_SIGNATURE_AGE_SECONDS = 300
+
+
+class PredictionWebhookReceiver:
+    """Local HTTP endpoint for Replicate's prediction webhooks.
+
+    Replicate POSTs the prediction when it completes. The payload is kept until
+    the prediction's job picks it up, and the job is polled right away instead
+    of waiting out its backoff. Payloads no job claims within
+    REPLICATE_WEBHOOK_RETENTION (e.g. for cancelled jobs) are dropped.
+    Payloads are trusted as prediction results, so the receiver only starts
+    with REPLICATE_WEBHOOK_SECRET set and rejects any request without a valid
+    signature. main.py starts it explicitly.
+    """
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None,
+                 secret: Optional[str] = None, on_completed: Optional[Callable[[str], None]] = None,
+                 retention_seconds: Optional[float] = None):
+        self.host = host or settings.REPLICATE_WEBHOOK_HOST
+        self.port = port if port is not None else settings.REPLICATE_WEBHOOK_PORT
+        self.secret = secret if secret is not None else settings.REPLICATE_WEBHOOK_SECRET
+        self.on_completed = on_completed
+        self.retention = (retention_seconds if retention_seconds is not None
+                          else settings.REPLICATE_WEBHOOK_RETENTION.total_seconds())
+
+        self.completed: Dict[str, tuple] = {}  # prediction id -> (prediction, expires_at)
+        self.lock = threading.Lock()
+        self.httpd: Optional[ThreadingHTTPServer] = None
+        self.thread: Optional[threading.Thread] = None
+
+        self.received = 0
+        self.rejected = 0
+        self.expired = 0
+
+    def start(self):
+        """Start listening (no-op if already running); refuses to run without a signing secret"""
+        if not self.secret:
+            raise RuntimeError("Refusing to start the Replicate webhook receiver without REPLICATE_WEBHOOK_SECRET")
+        with self.lock:
+            if self.httpd:
+                return
+            self.httpd = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+            self.httpd.daemon_threads = True
+            self.thread = threading.Thread(target=self.httpd.serve_forever, name="replicate-webhook", daemon=True)
+            self.thread.start()
+        print(f"🪝 Replicate webhook receiver listening on {self.host}:{self.httpd.server_address[1]}")
+
+    def stop(self):
+        with self.lock:
+            httpd, self.httpd = self.httpd, None
+        if httpd:
+            httpd.shutdown()
+            httpd.server_close()
+
+    def is_running(self) -> bool:
+        with self.lock:
+            return self.httpd is not None
+
+    def pop(self, prediction_id: str) -> Optional[Dict]:
+        """The completed prediction delivered for `prediction_id`, if any"""
+        with self.lock:
+            self._evict_expired()
+            entry = self.completed.pop(prediction_id, None)
+        return entry[0] if entry else None
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            self._evict_expired()
+            return {"received": self.received, "rejected": self.rejected,
+                    "unclaimed": len(self.completed), "expired": self.expired}
+
+    def _evict_expired(self):
+        """Drop deliveries no job claimed in time; caller holds the lock"""
+        now = time.monotonic()
+        for prediction_id in [pid for pid, (_, expires_at) in self.completed.items() if expires_at < now]:
+            del self.completed[prediction_id]
+            self.expired += 1
+
+    def handle(self, headers, body: bytes) -> int:
+        """Store a delivered prediction; returns the HTTP status to answer with"""
+        if not self.secret or not self._verify(headers, body):
+            with self.lock:
+                self.rejected += 1
+            return 401
+
+        try:
+            prediction = json.loads(body)
+        except ValueError:
+            return 400
+        if not isinstance(prediction, dict) or not prediction.get("id"):
+            return 400
+        if prediction.get("status") not in TERMINAL_STATUSES:
+            return 200
+
+        with self.lock:
+            self.received += 1
+            self._evict_expired()
+            self.completed[prediction["id"]] = (prediction, time.monotonic() + self.retention)
+        if self.on_completed:
+            self.on_completed(prediction["id"])
+        return 200
+
+    def _verify(self, headers, body: bytes) -> bool:
+        """Check Replicate's webhook-signature header (HMAC-SHA256 over id.timestamp.body)"""
+        webhook_id = headers.get("webhook-id")
+        timestamp = headers.get("webhook-timestamp")
+        signatures = headers.get("webhook-signature")
+        if not webhook_id or not timestamp or not signatures:
+            return False
+        try:
+            if abs(time.time() - int(timestamp)) > MAX_SIGNATURE_AGE_SECONDS:
+                return False
+            key = base64.b64decode(self.secret.split("_", 1)[-1])
+        except ValueError:
+            return False
+
+        signed = f"{webhook_id}.{timestamp}.".encode() + body
+        expected = base64.b64encode(hmac.new(key, signed, hashlib.sha256).digest()).decode()
+        return any(hmac.compare_digest(expected, signature.split(",", 1)[-1])
+                   for signature in signatures.split())
+
+    def _make_handler(self):
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                status = receiver.handle(self.headers, self.rfile.read(length))
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+# Shared so every ReplicateMediaAPI instance completes through one port
+webhook_receiver = PredictionWebhookReceiver(on_completed=job_manager.poll_now)
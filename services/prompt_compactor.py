@@ -0,0 +1,137 @@
+import json
+import math
+import threading
+from typing import Dict, List, Optional
+from config.settings import settings
+
+# Fields each prompt template actually uses, most important first; None keeps every field
+TEMPLATE_FIELDS: Dict[str, Dict[str, Optional[List[str]]]] = {
+    "caption": {
+        "trend_data": ["viral_keywords", "meme_keywords", "best_content_type", "engagement_patterns"],
+        "content_idea": ["title", "theme", "description", "type", "content_type", "style"]
+    },
+    "video_script": {
+        "trend_data": ["viral_keywords", "best_content_type", "engagement_patterns"],
+        "content_idea": ["title", "theme", "description", "type", "content_type", "style", "duration"]
+    },
+    "context": {
+        "context": None
+    }
+}
+
+MIN_STRING_LENGTH = 40
+MAX_SHRINK_ROUNDS = 6
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) used before the API reports real usage"""
+    return math.ceil(len(text) / 4)
+
+
+def compact_json(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+class PromptCompactor:
+    """Fits the data embedded in prompts into a token budget.
+
+    Each template only gets the fields it uses (TEMPLATE_FIELDS), serialized as
+    compact JSON. If the rendered prompt is still over budget, lists, long
+    strings and mappings are halved round by round, and after that the
+    least important fields are dropped.
+    """
+
+    def render(self, template_name: str, template: str, budget: Optional[int] = None, **sections) -> str:
+        """Format `template` with each section compacted so the whole prompt fits `budget` tokens"""
+        budget = budget or settings.GEMINI_PROMPT_TOKEN_BUDGET
+        skeleton_tokens = estimate_tokens(template.format(**{name: "" for name in sections}))
+        serialized = self.compact(template_name, sections, max(0, budget - skeleton_tokens))
+        return template.format(**serialized)
+
+    def compact(self, template_name: str, sections: Dict[str, object], budget: int) -> Dict[str, str]:
+        """Serialize each section with only its whitelisted fields, shrinking until the total fits `budget`"""
+        fields = TEMPLATE_FIELDS.get(template_name, {})
+        selected = {name: self._select(value, fields.get(name)) for name, value in sections.items()}
+
+        for _ in range(MAX_SHRINK_ROUNDS):
+            if self._tokens(selected) <= budget:
+                return self._serialize(selected)
+            selected = {name: self._shrink(value) for name, value in selected.items()}
+
+        # Still too big: drop the least important field of the largest trimmable section until it fits
+        while self._tokens(selected) > budget:
+            trimmable = [name for name, value in selected.items() if isinstance(value, dict) and value]
+            if not trimmable:
+                break
+            name = max(trimmable, key=lambda section: estimate_tokens(compact_json(selected[section])))
+            value = selected[name]
+            value.pop(list(value)[-1])
+        return self._serialize(selected)
+
+    def _select(self, value, fields: Optional[List[str]]):
+        if not isinstance(value, dict):
+            return value
+        if fields is None:
+            return dict(value)
+        return {field: value[field] for field in fields if value.get(field) not in (None, "", [], {})}
+
+    def _shrink(self, value):
+        if isinstance(value, list):
+            return [self._shrink(item) for item in value[:max(1, len(value) // 2)]]
+        if isinstance(value, dict):
+            keys = list(value)
+            # Mappings of counts (e.g. engagement patterns) keep their largest entries
+            if keys and all(isinstance(value[key], (int, float)) for key in keys):
+                keys = sorted(keys, key=lambda key: value[key], reverse=True)
+                return {key: value[key] for key in keys[:max(1, len(keys) // 2)]}
+            return {key: self._shrink(item) for key, item in value.items()}
+        if isinstance(value, str) and len(value) > MIN_STRING_LENGTH:
+            return value[:max(MIN_STRING_LENGTH, len(value) // 2)] + "…"
+        return value
+
+    def _tokens(self, sections: Dict[str, object]) -> int:
+        return sum(estimate_tokens(compact_json(value)) for value in sections.values())
+
+    def _serialize(self, sections: Dict[str, object]) -> Dict[str, str]:
+        return {name: compact_json(value) for name, value in sections.items()}
+
+
+class TokenUsageTracker:
+    """Input/output tokens and latency per prompt template"""
+
+    def __init__(self):
+        self.templates: Dict[str, Dict] = {}
+        self.lock = threading.Lock()
+
+    def record(self, template: str, input_tokens: int, output_tokens: int, latency: float):
+        with self.lock:
+            stats = self._stats(template)
+            stats["calls"] += 1
+            stats["input_tokens"] += input_tokens
+            stats["output_tokens"] += output_tokens
+            stats["latency_seconds"] += latency
+
+    def record_cached(self, template: str):
+        with self.lock:
+            self._stats(template)["cached_calls"] += 1
+
+    def get_stats(self) -> Dict[str, Dict]:
+        with self.lock:
+            return {
+                template: {
+                    **stats,
+                    "avg_input_tokens": stats["input_tokens"] / stats["calls"] if stats["calls"] else 0,
+                    "avg_output_tokens": stats["output_tokens"] / stats["calls"] if stats["calls"] else 0,
+                    "avg_latency_seconds": stats["latency_seconds"] / stats["calls"] if stats["calls"] else 0
+                }
+                for template, stats in self.templates.items()
+            }
+
+    def _stats(self, template: str) -> Dict:
+        return self.templates.setdefault(template, {
+            "calls": 0, "cached_calls": 0, "input_tokens": 0, "output_tokens": 0, "latency_seconds": 0.0
+        })
+
+
+prompt_compactor = PromptCompactor()
+token_usage = TokenUsageTracker()
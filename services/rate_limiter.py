@@ -0,0 +1,199 @@
+import asyncio
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, List, Optional
+import requests
+from urllib3.exceptions import NewConnectionError
+from config.settings import settings
+
+
+class RateLimitWaitTimeout(TimeoutError):
+    """Raised when waiting for a local rate-limit token would pass the caller's deadline.
+
+    The request was never sent, so it says nothing about the endpoint's health.
+    """
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at `rate` tokens per second"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        """Take a token if one is available; otherwise return seconds to wait"""
+        with self.lock:
+            now = time.monotonic()
+            if now < self.paused_until:
+                return self.paused_until - now
+
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self, deadline_at: Optional[float] = None):
+        """Block until a token is available; raise RateLimitWaitTimeout if that would pass `deadline_at`"""
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                return
+            if deadline_at is not None and time.monotonic() + wait >= deadline_at:
+                raise RateLimitWaitTimeout("Rate limit wait would pass the deadline")
+            time.sleep(wait)
+
+    async def acquire_async(self, deadline_at: Optional[float] = None):
+        """Wait on the event loop until a token is available, with the same deadline as acquire"""
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                return
+            if deadline_at is not None and time.monotonic() + wait >= deadline_at:
+                raise RateLimitWaitTimeout("Rate limit wait would pass the deadline")
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Hold back every caller for `seconds`, e.g. when the provider sends Retry-After"""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+
+class RateLimiter:
+    """Per-endpoint token buckets plus retry with backoff for outbound API calls"""
+
+    def __init__(self):
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.lock = threading.Lock()
+
+    def get_bucket(self, endpoint: str) -> TokenBucket:
+        """Get the bucket for an endpoint such as 'circlo.create_post'"""
+        with self.lock:
+            if endpoint not in self.buckets:
+                limits = self._get_limits(endpoint)
+                self.buckets[endpoint] = TokenBucket(limits["rate"], limits["burst"])
+            return self.buckets[endpoint]
+
+    def _get_limits(self, endpoint: str) -> Dict:
+        """Look up limits by exact endpoint, then by provider family, then default"""
+        family = endpoint.split(".", 1)[0]
+        return settings.RATE_LIMITS.get(
+            endpoint, settings.RATE_LIMITS.get(family, settings.RATE_LIMITS["default"])
+        )
+
+    def acquire(self, endpoint: str, deadline_at: Optional[float] = None):
+        self.get_bucket(endpoint).acquire(deadline_at)
+
+    async def acquire_async(self, endpoint: str, deadline_at: Optional[float] = None):
+        await self.get_bucket(endpoint).acquire_async(deadline_at)
+
+    def should_retry(self, status: int, attempt: int, retry_statuses: Optional[List[int]] = None) -> bool:
+        """Whether a response status is worth another attempt"""
+        statuses = settings.RETRY_STATUS_CODES if retry_statuses is None else retry_statuses
+        return status in statuses and attempt < settings.RETRY_MAX_ATTEMPTS - 1
+
+    def retry_delay(self, endpoint: str, attempt: int, status: Optional[int] = None,
+                    headers: Optional[Dict] = None) -> float:
+        """Delay before the next attempt, honouring Retry-After when present"""
+        retry_after = self._parse_retry_after((headers or {}).get("Retry-After"))
+        if retry_after is not None:
+            if status == 429:
+                # The provider told us when capacity returns; stop everyone until then
+                self.get_bucket(endpoint).pause(retry_after)
+            return min(retry_after, settings.RETRY_MAX_DELAY)
+
+        backoff = min(settings.RETRY_MAX_DELAY, settings.RETRY_BASE_DELAY * (2 ** attempt))
+        return random.uniform(0, backoff)
+
+    def _parse_retry_after(self, value: Optional[str]) -> Optional[float]:
+        """Parse Retry-After given either as seconds or as an HTTP date"""
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+            return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+    def call(self, endpoint: str, send: Callable, retry_statuses: Optional[List[int]] = None,
+             idempotent: bool = True, deadline_at: Optional[float] = None):
+        """Run `send` under the endpoint's rate limit, retrying throttled and failed calls.
+
+        `send` either returns a response with `status_code`/`headers` or raises.
+        Connection errors, timeouts and exceptions carrying a retryable `status`
+        are retried; the last response (or exception) is handed back to the caller.
+        A non-idempotent call (e.g. a POST that creates something) is only retried
+        after errors that prove the request never reached the server. No retry
+        starts once its delay would run past `deadline_at` (a time.monotonic() value),
+        and a response that is retried is closed so a streamed body does not pin
+        its pooled connection.
+        """
+        attempt = 0
+        while True:
+            self.acquire(endpoint, deadline_at)
+            try:
+                response = send()
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if (attempt >= settings.RETRY_MAX_ATTEMPTS - 1
+                        or not (idempotent or self.is_unsent_error(e))):
+                    raise
+                delay = self.retry_delay(endpoint, attempt)
+                if self.past_deadline(delay, deadline_at):
+                    raise
+                print(f"⏳ {endpoint} failed ({e.__class__.__name__}), retrying in {delay:.1f}s...")
+            except Exception as e:
+                status = getattr(e, "status", None)
+                if not isinstance(status, int) or not self.should_retry(status, attempt, retry_statuses):
+                    raise
+                delay = self.retry_delay(endpoint, attempt, status)
+                if self.past_deadline(delay, deadline_at):
+                    raise
+                print(f"⏳ {endpoint} returned {status}, retrying in {delay:.1f}s...")
+            else:
+                status = getattr(response, "status_code", None)
+                if status is None or not self.should_retry(status, attempt, retry_statuses):
+                    return response
+                delay = self.retry_delay(endpoint, attempt, status, response.headers)
+                if self.past_deadline(delay, deadline_at):
+                    return response
+                print(f"⏳ {endpoint} returned {status}, retrying in {delay:.1f}s...")
+                self._discard(response)
+
+            time.sleep(delay)
+            attempt += 1
+
+    def is_unsent_error(self, error: Exception) -> bool:
+        """Whether a request failed before any of it reached the server, so resending cannot duplicate it"""
+        if isinstance(error, requests.ConnectTimeout):
+            return True
+        reason = getattr(error.args[0], "reason", None) if error.args else None
+        return isinstance(error, requests.ConnectionError) and isinstance(reason, NewConnectionError)
+
+    def _discard(self, response):
+        """Release a response that is being retried instead of returned"""
+        close = getattr(response, "close", None)
+        if callable(close):
+            close()
+
+    def past_deadline(self, delay: float, deadline_at: Optional[float]) -> bool:
+        """Whether waiting `delay` seconds would run past `deadline_at` (time.monotonic())"""
+        return deadline_at is not None and time.monotonic() + delay >= deadline_at
+
+
+# Shared across every service so limits apply process-wide
+rate_limiter = RateLimiter()
@@ -1,42 +1,58 @@
-import replicate
 import requests
 import time
-from typing import Dict, List, Optional
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
 from config.settings import settings
+from services.circuit_breaker import circuit_breakers
+from services.job_manager import job_manager
+from services.prediction_webhook import TERMINAL_STATUSES, webhook_receiver
+from services.rate_limiter import rate_limiter
+from utils.helpers import stable_digest
+
+try:
+    import replicate
+except ImportError:  # optional provider
+    replicate = None
 
 
 class ReplicateMediaAPI:
     """Replicate API for generating real images and videos"""
 
+    VIDEO_FPS = 24
+    MAX_VIDEO_FRAMES = 250  # frames requested per video at most, so clips top out at about 10s
+
+    FALLBACK_PREFIXES = (
+        "https://images.unsplash.com/",
+        "https://commondatastorage.googleapis.com/gtv-videos-bucket/"
+    )
+
     def __init__(self):
         self.api_token = settings.REPLICATE_API_TOKEN
-        self.client = replicate.Client(api_token=self.api_token)
+        self.client = replicate.Client(api_token=self.api_token) if self.is_available() else None
+
+    @staticmethod
+    def is_available() -> bool:
+        """Whether the replicate package is installed and a token is configured"""
+        return replicate is not None and bool(settings.REPLICATE_API_TOKEN)
+
+    def is_fallback(self, url: Optional[str]) -> bool:
+        """Whether `url` is one of the placeholders returned when generation fails"""
+        return not url or url.startswith(self.FALLBACK_PREFIXES)
 
     def generate_image(self, prompt: str, style: str = "realistic") -> Optional[str]:
         """Generate real image using Replicate API"""
+        if settings.REPLICATE_ASYNC_PREDICTIONS:
+            return self.submit_image(prompt, style).result()
+
         try:
             print(f"🖼️ Generating real image with Replicate: {prompt[:100]}...")
 
-            model_id = settings.REPLICATE_IMAGE_MODELS.get(style, settings.REPLICATE_IMAGE_MODELS["realistic"])
-
-            # Enhanced prompt for better results
-            enhanced_prompt = self._enhance_image_prompt(prompt, style)
+            model_id, model_input = self._image_input(prompt, style)
 
             # Generate image using Replicate
-            output = self.client.run(
-                model_id,
-                input={
-                    "prompt": enhanced_prompt,
-                    "width": 1024,
-                    "height": 1024,
-                    "num_outputs": 1,
-                    "guidance_scale": 7.5,
-                    "num_inference_steps": 25
-                }
-            )
+            image_url = self._output_url(self._run("replicate.image", model_id, model_input))
 
-            if output and len(output) > 0:
-                image_url = output[0] if isinstance(output, list) else output
+            if image_url:
                 print(f"✅ Image generated successfully: {image_url}")
                 return image_url
             else:
@@ -49,29 +65,19 @@ class ReplicateMediaAPI:
 
     def generate_video(self, prompt: str, duration: int = 60) -> Optional[str]:
         """Generate real video using Replicate API"""
+        duration = self.supported_video_duration(duration)
+        if settings.REPLICATE_ASYNC_PREDICTIONS:
+            return self.submit_video(prompt, duration).result()
+
         try:
             print(f"🎥 Generating {duration}s video with Replicate: {prompt[:100]}...")
 
-            model_id = settings.REPLICATE_VIDEO_MODELS["standard"]
-
-            # Enhanced prompt for video
-            enhanced_prompt = self._enhance_video_prompt(prompt, duration)
+            model_id, model_input = self._video_input(prompt, duration)
 
             # Generate video using Replicate
-            output = self.client.run(
-                model_id,
-                input={
-                    "prompt": enhanced_prompt,
-                    "num_frames": min(24 * duration, 250),  # Limit frames
-                    "width": 1024,
-                    "height": 576,
-                    "fps": 24,
-                    "guidance_scale": 7.5
-                }
-            )
+            video_url = self._output_url(self._run("replicate.video", model_id, model_input))
 
-            if output:
-                video_url = output
+            if video_url:
                 print(f"✅ Video generated successfully: {video_url}")
                 return video_url
             else:
@@ -82,10 +88,162 @@ class ReplicateMediaAPI:
             print(f"❌ Error generating video with Replicate: {e}")
             return self._get_fallback_video()
 
+    def submit_image(self, prompt: str, style: str = "realistic", callback: Optional[Callable[[str], None]] = None,
+                     deadline: Optional[float] = None) -> Future:
+        """Create an image prediction without waiting; the Future resolves to the image URL (or a fallback).
+
+        Cancelling the Future cancels the prediction.
+        """
+        return self._submit_image(prompt, style, lambda: self._get_fallback_image(prompt), callback, deadline)
+
+    def submit_meme_image(self, template: str, top_text: str, bottom_text: str,
+                          callback: Optional[Callable[[str], None]] = None) -> Future:
+        """Queue a meme image prediction; the Future resolves to its URL (or a fallback meme)"""
+        return self._submit_image(self._meme_prompt(template, top_text, bottom_text), "meme",
+                                  self._get_fallback_meme, callback)
+
+    def submit_series_thumbnail(self, episode_title: str, series_theme: str,
+                                callback: Optional[Callable[[str], None]] = None) -> Future:
+        """Queue a thumbnail prediction; the Future resolves to its URL (or a fallback thumbnail)"""
+        return self._submit_image(self._thumbnail_prompt(episode_title, series_theme), "professional",
+                                  self._get_fallback_thumbnail, callback)
+
+    def _submit_image(self, prompt: str, style: str, fallback: Callable[[], str],
+                      callback: Optional[Callable[[str], None]] = None, deadline: Optional[float] = None) -> Future:
+        print(f"🖼️ Queueing image prediction with Replicate: {prompt.strip()[:100]}...")
+        model_id, model_input = self._image_input(prompt, style)
+        return self._submit_prediction("replicate.image", model_id, model_input, fallback, callback, deadline)
+
+    def submit_video(self, prompt: str, duration: int = 60, callback: Optional[Callable[[str], None]] = None,
+                     deadline: Optional[float] = None) -> Future:
+        """Create a video prediction without waiting; the Future resolves to the video URL (or a fallback)"""
+        duration = self.supported_video_duration(duration)
+        print(f"🎥 Queueing {duration}s video prediction with Replicate: {prompt[:100]}...")
+        model_id, model_input = self._video_input(prompt, duration)
+        return self._submit_prediction("replicate.video", model_id, model_input,
+                                       self._get_fallback_video, callback, deadline)
+
+    def generate_episode_video(self, episode_data: Dict) -> Optional[str]:
+        """Generate video for series episode, blocking until it is ready"""
+        return self.generate_video(self._episode_prompt(episode_data), duration=self._episode_seconds(episode_data))
+
+    def submit_episode_video(self, episode_data: Dict,
+                             callback: Optional[Callable[[str], None]] = None) -> Future:
+        """Queue an episode video prediction without waiting for it to render"""
+        return self.submit_video(self._episode_prompt(episode_data), duration=self._episode_seconds(episode_data),
+                                 callback=callback)
+
+    def supported_video_duration(self, duration: int) -> int:
+        """Longest clip the video model renders within MAX_VIDEO_FRAMES, up to `duration`"""
+        return max(1, min(duration, self.MAX_VIDEO_FRAMES // self.VIDEO_FPS))
+
+    def _episode_seconds(self, episode_data: Dict) -> int:
+        return episode_data.get("duration_seconds", settings.SERIES_EPISODE_SECONDS)
+
+    def _image_input(self, prompt: str, style: str) -> Tuple[str, Dict]:
+        model_id = settings.REPLICATE_IMAGE_MODELS.get(style, settings.REPLICATE_IMAGE_MODELS["realistic"])
+        return model_id, {
+            "prompt": self._enhance_image_prompt(prompt, style),
+            "width": 1024,
+            "height": 1024,
+            "num_outputs": 1,
+            "guidance_scale": 7.5,
+            "num_inference_steps": 25
+        }
+
+    def _video_input(self, prompt: str, duration: int) -> Tuple[str, Dict]:
+        return settings.REPLICATE_VIDEO_MODELS["standard"], {
+            "prompt": self._enhance_video_prompt(prompt, duration),
+            "num_frames": min(self.VIDEO_FPS * duration, self.MAX_VIDEO_FRAMES),
+            "width": 1024,
+            "height": 576,
+            "fps": self.VIDEO_FPS,
+            "guidance_scale": 7.5
+        }
+
+    def _output_url(self, output) -> Optional[str]:
+        """Image models return a list of URLs, video models a single one"""
+        if isinstance(output, list):
+            output = output[0] if output else None
+        return str(output) if output else None
+
+    def _run(self, endpoint: str, model_id: str, model_input: Dict):
+        """Run a model under the endpoint's rate limit and circuit breaker"""
+        client = self._require_client()
+        return circuit_breakers.get(endpoint).call(
+            lambda: rate_limiter.call(endpoint, lambda: client.run(model_id, input=model_input))
+        )
+
+    def _submit_prediction(self, endpoint: str, model_id: str, model_input: Dict, fallback: Callable[[], str],
+                           callback: Optional[Callable[[str], None]], deadline: Optional[float]) -> Future:
+        """Track a prediction as a background job; it is cancelled if still running at the deadline"""
+        return job_manager.submit(
+            endpoint,
+            start=lambda: self._create_prediction(endpoint, model_id, model_input),
+            poll=self._poll_prediction,
+            fallback=fallback,
+            deadline=deadline or settings.REPLICATE_PREDICTION_DEADLINE.total_seconds(),
+            callback=callback,
+            cancel=self._cancel_prediction
+        )
+
+    def _create_prediction(self, endpoint: str, model_id: str, model_input: Dict) -> str:
+        """Create a prediction under the endpoint's rate limit and circuit breaker; returns its id"""
+        client = self._require_client()
+        options = {"input": model_input}
+        # Only ask for a webhook when the receiver is up to take it
+        if settings.REPLICATE_WEBHOOK_URL and webhook_receiver.is_running():
+            options.update(webhook=settings.REPLICATE_WEBHOOK_URL, webhook_events_filter=["completed"])
+
+        # "owner/name:version" pins a version; a bare "owner/name" runs the model's latest
+        if ":" in model_id:
+            create = lambda: client.predictions.create(version=model_id.split(":", 1)[1], **options)
+        else:
+            create = lambda: client.models.predictions.create(model=model_id, **options)
+        # Each accepted request starts (and bills) a new prediction, so it is never blindly re-sent
+        prediction = circuit_breakers.get(endpoint).call(lambda: rate_limiter.call(endpoint, create, idempotent=False))
+        return prediction.id
+
+    def _poll_prediction(self, prediction_id: str) -> Optional[str]:
+        """Output URL once the prediction succeeded, None while it is still running"""
+        # A webhook delivery saves the status request
+        prediction = webhook_receiver.pop(prediction_id)
+        if prediction is None:
+            fetched = rate_limiter.call(
+                "replicate.predictions", lambda: self._require_client().predictions.get(prediction_id)
+            )
+            prediction = {"status": fetched.status, "output": fetched.output, "error": fetched.error}
+
+        status = prediction.get("status")
+        if status not in TERMINAL_STATUSES:
+            return None
+        if status != "succeeded":
+            raise RuntimeError(f"Prediction {prediction_id} {status}: {prediction.get('error')}")
+
+        url = self._output_url(prediction.get("output"))
+        if not url:
+            raise RuntimeError(f"Prediction {prediction_id} returned no output")
+        return url
+
+    def _cancel_prediction(self, prediction_id: str):
+        rate_limiter.call("replicate.predictions", lambda: self._require_client().predictions.cancel(prediction_id))
+
+    def _require_client(self):
+        if self.client is None:
+            raise RuntimeError("Replicate is not configured (install `replicate` and set REPLICATE_API_TOKEN)")
+        return self.client
+
     def generate_meme_image(self, template: str, top_text: str, bottom_text: str) -> Optional[str]:
         """Generate meme image using Replicate"""
         try:
-            prompt = f"""
+            return self.generate_image(self._meme_prompt(template, top_text, bottom_text), style="meme")
+
+        except Exception as e:
+            print(f"❌ Error generating meme with Replicate: {e}")
+            return self._get_fallback_meme()
+
+    def _meme_prompt(self, template: str, top_text: str, bottom_text: str) -> str:
+        return f"""
             Create a viral meme image in the style of: {template}
 
             TOP TEXT: "{top_text}"
@@ -95,16 +253,17 @@ class ReplicateMediaAPI:
             Requirements: High contrast, readable text, humorous style, social media optimized
             """
 
-            return self.generate_image(prompt, style="meme")
-
-        except Exception as e:
-            print(f"❌ Error generating meme with Replicate: {e}")
-            return self._get_fallback_meme()
-
     def generate_series_thumbnail(self, episode_title: str, series_theme: str) -> Optional[str]:
         """Generate professional thumbnail for series episodes"""
         try:
-            prompt = f"""
+            return self.generate_image(self._thumbnail_prompt(episode_title, series_theme), style="professional")
+
+        except Exception as e:
+            print(f"❌ Error generating thumbnail with Replicate: {e}")
+            return self._get_fallback_thumbnail()
+
+    def _thumbnail_prompt(self, episode_title: str, series_theme: str) -> str:
+        return f"""
             Create a professional YouTube thumbnail for: "{episode_title}"
 
             Series Theme: {series_theme}
@@ -112,11 +271,16 @@ class ReplicateMediaAPI:
             Requirements: 1280x720 resolution, clickable design, modern aesthetics, brand-consistent
             """
 
-            return self.generate_image(prompt, style="professional")
+    def _episode_prompt(self, episode_data: Dict) -> str:
+        duration = self.supported_video_duration(self._episode_seconds(episode_data))
+        return f"""
+            Create a {duration}-second video episode:
 
-        except Exception as e:
-            print(f"❌ Error generating thumbnail with Replicate: {e}")
-            return self._get_fallback_thumbnail()
+            EPISODE TITLE: {episode_data.get('title', 'Tech Episode')}
+            SCRIPT: {episode_data.get('script', 'Educational content about technology')}
+            THEME: {episode_data.get('theme', 'Technology Innovation')}
+            CHARACTERS: {', '.join(episode_data.get('characters', ['Host']))}
+            """
 
     def _enhance_image_prompt(self, prompt: str, style: str) -> str:
         """Enhance image prompt for better Replicate results"""
@@ -165,7 +329,7 @@ class ReplicateMediaAPI:
     def _get_fallback_image(self, prompt: str) -> str:
         """Get fallback image when Replicate fails"""
         # Use hash of prompt to create unique placeholder
-        image_id = hash(prompt) % 1000000
+        image_id = int(stable_digest(prompt)[:8], 16) % 1000000
         return f"https://images.unsplash.com/photo-1485827404703-89b55fcc595e?w=800&id={image_id}"
 
     def _get_fallback_video(self) -> str:
@@ -0,0 +1,99 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    expires_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def is_fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+    def validator_headers(self) -> Dict[str, str]:
+        """Conditional-GET headers for revalidating this entry"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """Thread-safe LRU cache of API responses with TTL and HTTP validators.
+
+    Stale entries are kept (until evicted) so they can be revalidated with
+    ETag / Last-Modified instead of being downloaded again.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        """Return the entry (fresh or stale) and mark it recently used"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Hashable, value: Any, etag: Optional[str] = None,
+            last_modified: Optional[str] = None) -> CacheEntry:
+        entry = CacheEntry(value, time.monotonic() + self.ttl, etag, last_modified)
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    def refresh(self, key: Hashable) -> Optional[CacheEntry]:
+        """Extend a stale entry's lifetime after the server answered 304 Not Modified"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                entry.expires_at = time.monotonic() + self.ttl
+                self.entries.move_to_end(key)
+            return entry
+
+    def record_hit(self):
+        with self.lock:
+            self.hits += 1
+
+    def record_revalidation(self):
+        with self.lock:
+            self.revalidations += 1
+
+    def record_miss(self):
+        with self.lock:
+            self.misses += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            lookups = self.hits + self.revalidations + self.misses
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "revalidations": self.revalidations,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.revalidations) / lookups if lookups else 0.0
+            }
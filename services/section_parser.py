@@ -0,0 +1,76 @@
+from typing import Callable, Dict, List, Optional
+
+CONTENT_SECTIONS = ["caption", "description", "hashtags"]
+VIDEO_SECTIONS = ["script", "hook", "scenes", "cta"]
+
+
+class SectionParser:
+    """Incremental parser for Gemini's "LABEL: value" responses.
+
+    Text can be fed in arbitrary chunks as it streams in. A section starts at a
+    line beginning with its upper-cased label and runs until the next label, so
+    each section is complete, and reported to `on_section`, as soon as the
+    following label arrives (the last one on `close()`). List sections are
+    split on commas.
+    """
+
+    def __init__(self, sections: List[str], list_sections: Optional[List[str]] = None,
+                 on_section: Optional[Callable[[str, object], None]] = None):
+        self.sections = sections
+        self.list_sections = set(list_sections or ["hashtags"])
+        self.on_section = on_section
+        self.labels = {f"{name.upper()}:": name for name in sections}
+
+        self.result: Dict[str, object] = {name: [] if name in self.list_sections else "" for name in sections}
+        self.completed: List[str] = []
+        self.current: Optional[str] = None
+        self.current_text = ""
+        self.buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """Consume a chunk; returns the sections it completed"""
+        self.buffer += text
+        *lines, self.buffer = self.buffer.split("\n")
+        completed = []
+        for line in lines:
+            completed.extend(self._feed_line(line))
+        return completed
+
+    def close(self) -> Dict[str, object]:
+        """Flush the trailing line and the last section; returns all parsed sections"""
+        if self.buffer:
+            self._feed_line(self.buffer)
+            self.buffer = ""
+        self._finish_current()
+        return self.result
+
+    def _feed_line(self, line: str) -> List[str]:
+        line = line.strip()
+        for label, name in self.labels.items():
+            if line.startswith(label):
+                finished = self._finish_current()
+                self.current = name
+                self.current_text = line[len(label):].strip()
+                return finished
+
+        if self.current and line:
+            self.current_text = f"{self.current_text} {line}" if self.current_text else line
+        return []
+
+    def _finish_current(self) -> List[str]:
+        if not self.current:
+            return []
+
+        name = self.current
+        if name in self.list_sections:
+            value = [item.strip() for item in self.current_text.split(",") if item.strip()]
+        else:
+            value = self.current_text
+        self.result[name] = value
+        self.completed.append(name)
+        self.current = None
+        self.current_text = ""
+
+        if self.on_section:
+            self.on_section(name, value)
+        return [name]
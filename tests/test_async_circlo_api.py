@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+import pytest
+
+from services.async_circlo_api import AsyncCircloAPI
+from services.circuit_breaker import circuit_breakers
+from services.niche_cache import NicheAvailabilityCache
+from services.rate_limiter import rate_limiter
+from utils.fake_circlo_server import FakeCircloServer
+
+
+@pytest.fixture
+def server():
+    with FakeCircloServer(users=75, posts=2000) as server:
+        yield server
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers(monkeypatch):
+    monkeypatch.setattr(circuit_breakers, "breakers", {})
+    monkeypatch.setattr(rate_limiter, "buckets", {})
+
+
+def run(server, scenario):
+    async def main():
+        async with AsyncCircloAPI() as api:
+            api.base_url = server.base_url
+            api.niche_cache = NicheAvailabilityCache()
+            return await scenario(api)
+    return asyncio.run(main())
+
+
+def content(caption, **extra):
+    return {"caption": caption, "niche": "Blogger", "media_type": "image", "keywords": ["travel"],
+            "media_source": "https://example.com/i.png", **extra}
+
+
+def test_streams_every_preference_page(server):
+    async def scenario(api):
+        return [preference async for preference in api.iter_user_preferences(limit=20, prefetch=2)]
+
+    assert len(run(server, scenario)) == 75
+
+
+def test_create_find_and_track_a_post(server):
+    async def scenario(api):
+        data = content("Async harbour sunset")
+        results = await api.create_posts([data, content("Async second post")])
+        found = await api.find_post(data)
+        engagement = await api.get_posts_engagement([result.post_id for result in results])
+        return results, found, engagement
+
+    results, found, engagement = run(server, scenario)
+    assert all(result.success for result in results)
+    assert found == results[0].post_id
+    assert set(engagement) == {result.post_id for result in results}
+
+
+def test_find_post_raises_when_circlo_cannot_be_asked(server):
+    server.error_rates["401"] = 1.0
+
+    async def scenario(api):
+        return await api.find_post(content("Anything"))
+
+    with pytest.raises(RuntimeError):
+        run(server, scenario)
+
+
+def test_create_post_does_not_retry_past_its_deadline(server):
+    server.error_rates["429"] = 1.0
+    server.retry_after = 5
+
+    async def scenario(api):
+        started = time.monotonic()
+        result = await api.create_post(content("Throttled"), deadline_at=time.monotonic() + 1)
+        return result, time.monotonic() - started
+
+    result, elapsed = run(server, scenario)
+    assert not result.success
+    assert elapsed < 1
+    assert server.get_stats()["statuses"][429] == 1
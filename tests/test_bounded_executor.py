@@ -0,0 +1,89 @@
+import threading
+import time
+
+import pytest
+
+from services.bounded_executor import run_with_deadlines
+
+
+def timed_out(item, future):
+    return ("timeout", item, future is None)
+
+
+def test_results_keep_input_order():
+    def work(item):
+        time.sleep(0.05 * (3 - item))
+        return item * 10
+
+    assert run_with_deadlines(work, [0, 1, 2], concurrency=3, deadline=2, on_timeout=timed_out) == [0, 10, 20]
+
+
+def test_empty_items():
+    assert run_with_deadlines(lambda item: item, [], concurrency=2, deadline=1, on_timeout=timed_out) == []
+
+
+def test_concurrency_is_bounded():
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+
+    def work(item):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+        return item
+
+    assert run_with_deadlines(work, list(range(8)), concurrency=2, deadline=2, on_timeout=timed_out) == list(range(8))
+    assert peak[0] == 2
+
+
+def test_slow_item_times_out_while_others_finish():
+    release = threading.Event()
+
+    def work(item):
+        if item == "slow":
+            release.wait(5)
+        return item
+
+    try:
+        started = time.monotonic()
+        results = run_with_deadlines(work, ["a", "slow", "b"], concurrency=3, deadline=0.2, on_timeout=timed_out)
+        assert time.monotonic() - started < 1
+        assert results == ["a", ("timeout", "slow", False), "b"]
+    finally:
+        release.set()
+
+
+def test_queued_items_are_cancelled_once_the_batch_runs_out_of_time():
+    release = threading.Event()
+    ran = []
+
+    def work(item):
+        ran.append(item)
+        release.wait(5)
+        return item
+
+    try:
+        results = run_with_deadlines(work, [1, 2, 3], concurrency=1, deadline=0.1, on_timeout=timed_out)
+        assert results[0] == ("timeout", 1, False)
+        assert ("timeout", 3, True) in results
+        assert 3 not in ran
+    finally:
+        release.set()
+
+
+def test_errors_go_to_on_error_or_propagate():
+    def work(item):
+        if item == 2:
+            raise ValueError("bad item")
+        return item
+
+    results = run_with_deadlines(work, [1, 2], concurrency=2, deadline=1, on_timeout=timed_out,
+                                 on_error=lambda item, error: ("error", item, str(error)))
+    assert results == [1, ("error", 2, "bad item")]
+
+    with pytest.raises(ValueError):
+        run_with_deadlines(work, [1, 2], concurrency=2, deadline=1, on_timeout=timed_out)
@@ -0,0 +1,95 @@
+import pytest
+
+from config.settings import settings
+from services.circlo_api import CircloAPI
+from services.circuit_breaker import circuit_breakers
+from services.niche_cache import NicheAvailabilityCache
+from services.response_cache import ResponseCache
+from utils.fake_circlo_server import FakeCircloServer
+
+
+@pytest.fixture(scope="module")
+def server():
+    with FakeCircloServer(users=120, posts=2000, missing_niches=["Gamer"]) as server:
+        yield server
+
+
+@pytest.fixture
+def api(server, monkeypatch):
+    monkeypatch.setattr(circuit_breakers, "breakers", {})
+    api = CircloAPI()
+    api.base_url = server.base_url
+    api.niche_cache = NicheAvailabilityCache()
+    api.trending_cache = ResponseCache(max_entries=16, ttl_seconds=60)
+    return api
+
+
+def requests_to(server, route):
+    return server.get_stats()["requests"].get("/api" + route, 0)
+
+
+def content(caption, niche="Blogger", **extra):
+    return {"caption": caption, "niche": niche, "media_type": "image", "keywords": ["travel"],
+            "media_source": "https://example.com/i.png", **extra}
+
+
+def test_clients_share_one_pooled_session():
+    assert CircloAPI().session is CircloAPI().session
+
+
+def test_streams_every_preference_page(api, server):
+    before = requests_to(server, "/user-preferences")
+    preferences = list(api.iter_user_preferences(limit=50, prefetch=2))
+
+    assert len(preferences) == 120
+    assert len({preference.user_id for preference in preferences}) == 120
+    assert requests_to(server, "/user-preferences") - before == 3
+
+
+def test_closing_the_stream_early_stops_fetching(api, server):
+    before = requests_to(server, "/user-preferences")
+    preferences = api.iter_user_preferences(limit=10, prefetch=1)
+    next(preferences)
+    preferences.close()
+    assert requests_to(server, "/user-preferences") - before <= 2
+
+
+def test_rejected_niche_falls_back_to_general_and_is_remembered(api, server):
+    result = api.create_post(content("First gamer post", niche="Gamer"))
+    assert result.success
+    assert server.created_posts[result.post_id]["niche"] == "General"
+    assert api.niche_cache.is_niche_rejected("Gamer")
+
+    before = server.get_stats()["statuses"].get(500, 0)
+    assert api.create_post(content("Second gamer post", niche="Gamer")).success
+    assert server.get_stats()["statuses"].get(500, 0) == before
+
+
+def test_trending_posts_are_cached_and_revalidated(api, server):
+    before = requests_to(server, "/posts/by-keywords")
+    first = api.get_trending_posts(["music", "art"])
+    assert api.get_trending_posts(["music", "art"]) == first
+    assert requests_to(server, "/posts/by-keywords") - before == 1
+
+    for entry in api.trending_cache.entries.values():
+        entry.expires_at = 0
+    assert api.get_trending_posts(["music", "art"]) == first
+    assert api.trending_cache.get_stats()["revalidations"] == 1
+    assert server.get_stats()["statuses"][304] >= 1
+
+
+def test_fanout_covers_every_keyword(api, monkeypatch):
+    monkeypatch.setattr(settings, "TREND_FANOUT_CHUNK_SIZE", 2)
+    posts = api.get_trending_posts_fanout(["AI", "music", "food", "gaming", "art"], limit=5)
+    primary_keywords = {post["keywords"][0] for post in posts}
+    assert {"AI", "music", "food", "gaming", "art"} <= primary_keywords
+    assert len({post["id"] for post in posts}) == len(posts)
+
+
+def test_created_post_can_be_found_and_tracked(api):
+    data = content("Sunset over the harbour", idempotency_key="fp-harbour")
+    result = api.create_post(data)
+
+    assert api.find_post(data) == result.post_id
+    assert api.find_post(content("Never posted")) is None
+    assert set(api.get_posts_engagement([result.post_id, result.post_id, "post-3"])) == {result.post_id, "post-3"}
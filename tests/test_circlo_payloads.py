@@ -0,0 +1,37 @@
+from services.circlo_payloads import CircloPayloads
+
+
+def test_matching_post_is_found_by_the_caption_create_post_sends():
+    payloads = CircloPayloads()
+    content = {"caption": 'She said "wow"'}
+    posts = [{"id": "p1", "caption": "Something else"}, {"id": "p2", "caption": "She said 'wow'"}]
+    assert payloads.find_matching_post(posts, content) == "p2"
+    assert payloads.find_matching_post(posts[:1], content) is None
+
+
+def test_trending_cache_key_normalizes_the_keywords_sent():
+    payloads = CircloPayloads()
+    first = payloads.build_trending_params(["AI", "Music", "Food", "Art"], 15)
+    second = payloads.build_trending_params(["music ", "ai", "food"], 15)
+    assert first["keywords"] == "AI,Music,Food"
+    assert payloads.trending_cache_key(first) == payloads.trending_cache_key(second)
+    assert payloads.build_trending_params(["a", "b", "c", "d"], 5, max_keywords=None)["keywords"] == "a,b,c,d"
+
+
+def test_fanout_chunks_and_merge():
+    payloads = CircloPayloads()
+    assert payloads.chunk_keywords(["a", "b", "a", "", "c"], 2) == [["a", "b"], ["c"]]
+    merged = payloads.merge_posts([[{"id": 1}, {"id": 2}], [{"id": 2}, {"id": 3}, {"caption": "no id"}]])
+    assert merged == [{"id": 1}, {"id": 2}, {"id": 3}, {"caption": "no id"}]
+
+
+def test_responses_are_parsed():
+    payloads = CircloPayloads()
+    assert payloads.get_total_pages({"pagination": {"totalPages": "4"}}) == 4
+    assert payloads.get_total_pages({}) is None
+    assert payloads.parse_engagement({"posts": [{"id": "p1", "likeCount": 3}, {"likeCount": 9}]}) == {
+        "p1": {"likeCount": 3, "commentCount": 0}
+    }
+    assert payloads.idempotency_headers({"idempotency_key": "fp"}) == {"Idempotency-Key": "fp"}
+    assert payloads.idempotency_headers({}) == {}
+    assert 500 not in payloads.create_post_retry_statuses()
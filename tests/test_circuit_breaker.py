@@ -0,0 +1,91 @@
+import pytest
+
+from services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from services.rate_limiter import RateLimitWaitTimeout
+
+
+class Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+def open_breaker(**kwargs):
+    breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=0.01, **kwargs)
+    breaker.record_failure()
+    breaker.record_failure()
+    return breaker
+
+
+def test_opens_after_threshold_and_rejects_calls():
+    breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=60)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: Response(200))
+    assert breaker.get_state()["rejected_calls"] == 1
+
+
+def test_failure_status_counts_as_failure():
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=60)
+    assert breaker.call(lambda: Response(503)).status_code == 503
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_half_open_success_closes(monkeypatch):
+    breaker = open_breaker(half_open_max_calls=1)
+    monkeypatch.setattr(breaker, "opened_at", 0.0)
+
+    breaker.call(lambda: Response(200))
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_failure_reopens(monkeypatch):
+    breaker = open_breaker(half_open_max_calls=1)
+    monkeypatch.setattr(breaker, "opened_at", 0.0)
+
+    with pytest.raises(ValueError):
+        breaker.call(lambda: (_ for _ in ()).throw(ValueError("boom")))
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_half_open_slot_is_released_without_an_outcome(monkeypatch):
+    breaker = open_breaker(half_open_max_calls=1)
+    monkeypatch.setattr(breaker, "opened_at", 0.0)
+
+    def cancelled():
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        breaker.call(cancelled)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.half_open_calls == 0
+
+    # The slot came back, so the next trial call is let through
+    breaker.call(lambda: Response(200))
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_rate_limit_wait_timeout_records_no_outcome():
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=60)
+
+    def throttled():
+        raise RateLimitWaitTimeout("wait would pass the deadline")
+
+    for _ in range(3):
+        with pytest.raises(RateLimitWaitTimeout):
+            breaker.call(throttled)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.consecutive_failures == 0
+
+
+def test_listeners_see_transitions():
+    transitions = []
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=60)
+    breaker.add_listener(lambda name, old, new: transitions.append((name, old, new)))
+
+    breaker.record_failure()
+    breaker.record_success()
+    assert transitions == [("test", "closed", "open"), ("test", "open", "closed")]
@@ -0,0 +1,98 @@
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from config.settings import settings
+from models.content_models import GeneratedContent, PostResult, TrendAnalysis
+from models.series_models import Series, SeriesEpisode
+from services.database import ContentDatabase
+from services.dedupe_store import content_fingerprint
+
+
+def make_content(caption: str) -> GeneratedContent:
+    return GeneratedContent(content_type="image", caption=caption, description="d", keywords=["tech"],
+                            media_source="https://example.com/i.png", viral_score=70, trend_alignment=["ai"])
+
+
+@pytest.fixture
+def database():
+    database = ContentDatabase(":memory:")
+    yield database
+    database.close()
+
+
+def test_content_and_results_join_on_the_fingerprint(database, monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_BATCH_SIZE", 2)
+    content = [make_content(f"caption {i}") for i in range(5)]
+    assert database.save_generated_content(content, "user-1") == 5
+    assert {c.caption for c in database.get_generated_content("user-1")} == {c.caption for c in content}
+
+    content_id = content_fingerprint("image", "caption 0", ["tech"])
+    database.save_post_results([
+        PostResult(success=False, post_id="", content_type="image", posted_at=datetime.now(),
+                   engagement_metrics={}, content_id=content_id),
+        PostResult(success=True, post_id="p1", content_type="image", posted_at=datetime.now(),
+                   engagement_metrics={}, content_id=content_id)
+    ], "user-1")
+
+    assert database.get_content_post_result(content_id).post_id == "p1"
+    stats = database.get_post_stats(user_id="user-1")
+    assert (stats["total_posts"], stats["successful_posts"], stats["success_rate"]) == (2, 1, 0.5)
+
+
+def test_latest_trend_snapshot_per_user(database):
+    database.save_trend_analyses([TrendAnalysis(["old"], {}, "image", 1, 10)], "user-1")
+    database.save_trend_analysis(TrendAnalysis(["new"], {"morning": 3}, "video", 5, 80, ["meme"]), "user-1")
+
+    latest = database.get_latest_trend_analysis("user-1")
+    assert latest.viral_keywords == ["new"]
+    assert latest.meme_keywords == ["meme"]
+    assert database.get_latest_trend_analysis("user-2") is None
+
+
+def test_series_state_round_trips_and_updates(database):
+    episode = SeriesEpisode(episode_number=1, title="Pilot", script="s", scenes=[{"scene": 1}], duration="8 seconds",
+                            characters=["Ada"], plot_advancement="p", media_source="m", keywords=["k"], posted=True)
+    series = Series(series_id="s1", title="Saga", genre="drama", plot_summary="plot", main_characters=["Ada"],
+                    episodes=[episode], total_episodes=10, current_episode=1, created_at=datetime(2024, 1, 1))
+    database.save_series(series)
+
+    series.current_episode = 2
+    database.save_series(series)
+
+    restored = database.get_latest_series()
+    assert restored.current_episode == 2
+    assert restored.episodes == [episode]
+    assert restored.created_at == datetime(2024, 1, 1)
+
+
+def test_legacy_unique_outbox_key_is_migrated(tmp_path):
+    path = str(tmp_path / "legacy.db")
+    connection = sqlite3.connect(path)
+    connection.execute("""CREATE TABLE post_outbox (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        idempotency_key TEXT NOT NULL UNIQUE,
+        user_id TEXT,
+        content TEXT NOT NULL,
+        status TEXT NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        available_at REAL NOT NULL,
+        post_id TEXT,
+        last_error TEXT,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    )""")
+    connection.execute("""INSERT INTO post_outbox (idempotency_key, content, status, available_at, created_at,
+                                                   updated_at)
+                          VALUES ('fp-a', '{}', 'delivered', 0, '', '')""")
+    connection.commit()
+    connection.close()
+
+    database = ContentDatabase(path)
+    try:
+        assert database.get_outbox_stats()["delivered"] == 1
+        assert database.enqueue_outbox([("fp-a", make_content("a"))]) == 1
+        assert database.enqueue_outbox([("fp-a", make_content("a"))]) == 0
+    finally:
+        database.close()
@@ -0,0 +1,57 @@
+import json
+import time
+
+from services.dedupe_store import ContentFingerprintStore, content_fingerprint
+
+
+def test_fingerprint_ignores_case_whitespace_and_keyword_order():
+    assert (content_fingerprint("image", "Hello   World", ["b", "A"], "a  prompt")
+            == content_fingerprint("IMAGE", " hello world ", ["a", "B", "b"], "A prompt"))
+    assert content_fingerprint("image", "Hello", ["a"]) != content_fingerprint("video", "Hello", ["a"])
+
+
+def test_reserve_blocks_duplicates_until_released(tmp_path):
+    store = ContentFingerprintStore(str(tmp_path / "fingerprints.jsonl"))
+    assert store.reserve("fp", "generated")
+    assert not store.reserve("fp", "generated")
+    assert store.reserve("fp", "posted")
+
+    store.release("fp", "generated")
+    assert store.reserve("fp", "generated")
+    assert store.get_stats()["duplicates_skipped"] == 1
+
+
+def test_reservation_expires_after_the_claim_ttl(tmp_path):
+    store = ContentFingerprintStore(str(tmp_path / "fingerprints.jsonl"), claim_ttl_seconds=0.01)
+    assert store.reserve("fp", "generated")
+    time.sleep(0.02)
+    assert store.reserve("fp", "generated")
+
+
+def test_committed_fingerprints_persist(tmp_path):
+    path = str(tmp_path / "fingerprints.jsonl")
+    store = ContentFingerprintStore(path)
+    store.reserve("fp", "posted")
+    store.commit("fp", "posted")
+    store.commit("fp", "posted")
+
+    reloaded = ContentFingerprintStore(path)
+    assert reloaded.contains("fp", "posted")
+    assert not reloaded.contains("fp", "generated")
+    assert not reloaded.reserve("fp", "posted")
+    assert len(open(path).readlines()) == 1
+
+
+def test_expired_entries_are_dropped_and_compacted(tmp_path):
+    path = tmp_path / "fingerprints.jsonl"
+    old = time.time() - 3600
+    path.write_text(
+        json.dumps({"kind": "posted", "fingerprint": "old", "recorded_at": old}) + "\n"
+        + "not json\n"
+        + json.dumps({"kind": "posted", "fingerprint": "new", "recorded_at": time.time()}) + "\n"
+    )
+
+    store = ContentFingerprintStore(str(path), retention_seconds=60)
+    assert not store.contains("old", "posted")
+    assert store.contains("new", "posted")
+    assert [json.loads(line)["fingerprint"] for line in path.read_text().splitlines()] == ["new"]
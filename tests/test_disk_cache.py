@@ -0,0 +1,58 @@
+import os
+import time
+
+from services.disk_cache import DiskLRUCache
+
+
+def test_values_survive_a_restart(tmp_path):
+    DiskLRUCache(str(tmp_path)).put("ab12", {"text": "cached"})
+
+    cache = DiskLRUCache(str(tmp_path))
+    assert cache.get("ab12") == {"text": "cached"}
+    assert cache.get("cd34") is None
+    assert cache.get_stats()["hit_rate"] == 0.5
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = DiskLRUCache(str(tmp_path), max_entries=2)
+    cache.put("aa01", 1)
+    cache.put("bb02", 2)
+    cache.get("aa01")
+    cache.put("cc03", 3)
+
+    assert cache.get("bb02") is None
+    assert cache.get("aa01") == 1
+    assert not os.path.exists(tmp_path / "bb" / "bb02.json")
+
+
+def test_byte_budget_is_enforced(tmp_path):
+    cache = DiskLRUCache(str(tmp_path), max_bytes=200)
+    for i in range(5):
+        cache.put(f"{i:02d}ff", "x" * 60)
+    assert cache.get_stats()["bytes"] <= 200
+    assert cache.get("04ff") == "x" * 60
+
+
+def test_recency_is_rebuilt_from_file_mtimes(tmp_path):
+    cache = DiskLRUCache(str(tmp_path))
+    cache.put("aa01", 1)
+    cache.put("bb02", 2)
+    old = time.time() - 100
+    os.utime(tmp_path / "bb" / "bb02.json", (old, old))
+
+    restarted = DiskLRUCache(str(tmp_path), max_entries=1)
+    assert restarted.get("aa01") == 1
+    assert restarted.get("bb02") is None
+
+
+def test_expired_and_corrupt_entries_are_misses(tmp_path):
+    cache = DiskLRUCache(str(tmp_path), ttl_seconds=0.05)
+    cache.put("aa01", 1)
+    cache.put("bb02", 2)
+    (tmp_path / "bb" / "bb02.json").write_text("{not json")
+
+    assert cache.get("bb02") is None
+    time.sleep(0.1)
+    assert cache.get("aa01") is None
+    assert cache.get_stats()["expirations"] == 1
+    assert cache.get_stats()["entries"] == 0
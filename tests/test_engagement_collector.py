@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from config.settings import settings
+from models.content_models import PostResult
+from services.database import ContentDatabase
+from services.engagement_collector import EngagementCollector
+
+
+class FakeCirclo:
+    def __init__(self, engagement):
+        self.engagement = engagement
+        self.requested = []
+
+    def get_posts_engagement(self, post_ids):
+        self.requested.append(list(post_ids))
+        return {post_id: self.engagement[post_id] for post_id in post_ids if post_id in self.engagement}
+
+
+def posted(post_id: str, age: timedelta, success: bool = True) -> PostResult:
+    return PostResult(success=success, post_id=post_id, content_type="image",
+                      posted_at=datetime.now() - age, engagement_metrics={})
+
+
+@pytest.fixture
+def database():
+    database = ContentDatabase(":memory:")
+    yield database
+    database.close()
+
+
+def test_refreshes_due_posts_and_reschedules_them(database):
+    database.save_post_results([posted("p1", timedelta(hours=1)), posted("p2", timedelta(hours=2)),
+                                posted("", timedelta(hours=1), success=False)])
+    circlo = FakeCirclo({"p1": {"likeCount": 5, "commentCount": 1}})
+    collector = EngagementCollector(database, circlo)
+
+    assert collector.collect_once() == 2
+    assert sorted(circlo.requested[0]) == ["p1", "p2"]
+    assert database.get_post_result("p1").engagement_metrics == {"likeCount": 5, "commentCount": 1}
+
+    # Both were rescheduled, including p2 which the response did not include
+    assert collector.collect_once() == 0
+    assert collector.get_stats() == {"runs": 1, "posts_checked": 2, "posts_updated": 1}
+
+
+def test_posts_past_the_max_age_stop_being_tracked(database):
+    database.save_post_results([posted("old", settings.ENGAGEMENT_MAX_AGE + timedelta(days=1))])
+    collector = EngagementCollector(database, FakeCirclo({}))
+
+    collector.collect_once()
+    assert database.get_posts_due_for_engagement(10) == []
+    assert database.connection.execute("SELECT COUNT(*) FROM engagement_schedule").fetchone()[0] == 0
+
+
+def test_next_check_backs_off_with_age(database):
+    collector = EngagementCollector(database, FakeCirclo({}))
+    now = datetime.now()
+
+    fresh = collector._next_check(now - timedelta(seconds=10), now) - now.timestamp()
+    day_old = collector._next_check(now - timedelta(days=1), now) - now.timestamp()
+    assert fresh == settings.ENGAGEMENT_MIN_INTERVAL.total_seconds()
+    assert day_old == settings.ENGAGEMENT_MAX_INTERVAL.total_seconds()
+    assert collector._next_check(now - settings.ENGAGEMENT_MAX_AGE, now) is None
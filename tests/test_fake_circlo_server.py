@@ -0,0 +1,91 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.fake_circlo_server import FakeCircloServer, LatencyModel, SyntheticCorpus
+
+POST = {"caption": "Hello", "media_type": "image", "niche": "Blogger", "keywords": ["AI"]}
+
+
+@pytest.fixture
+def server():
+    server = FakeCircloServer(users=120, posts=1000)
+    yield server
+    # Requests go straight to handle(), so the socket was never served
+    server.httpd.server_close()
+
+
+def request(server, method, route, query=None, headers=None, body=None):
+    return server.handle(method, "/api" + route, query or {}, headers or {}, body)
+
+
+def test_preferences_are_paginated(server):
+    status, body, _ = request(server, "GET", "/user-preferences", {"page": ["3"], "limit": ["50"]})
+    assert status == 200
+    assert len(body["preferences"]) == 20
+    assert body["pagination"]["totalPages"] == 3
+
+
+@pytest.mark.parametrize("query", [{"page": ["x"]}, {"limit": ["ten"]}])
+def test_non_numeric_paging_is_a_bad_request(server, query):
+    assert request(server, "GET", "/user-preferences", query)[0] == 400
+
+
+def test_keyword_search_supports_conditional_get(server):
+    status, body, headers = request(server, "GET", "/posts/by-keywords", {"keywords": ["AI,music"], "limit": ["5"]})
+    assert status == 200
+    assert len(body["posts"]) == 5
+
+    status, body, _ = request(server, "GET", "/posts/by-keywords", {"keywords": ["AI,music"], "limit": ["5"]},
+                              {"If-None-Match": headers["ETag"]})
+    assert (status, body) == (304, None)
+
+
+def test_created_posts_are_searchable_and_report_engagement(server):
+    status, body, _ = request(server, "POST", "/user-preferences/recommend/create-post", body=POST)
+    assert status == 201
+    post_id = body["post"]["id"]
+
+    _, found, _ = request(server, "GET", "/posts/by-keywords", {"keywords": ["ai"]})
+    assert found["posts"][0]["id"] == post_id
+    _, by_ids, _ = request(server, "GET", "/posts/by-ids", {"ids": [f"{post_id},post-7,post-99999"]})
+    assert [post["id"] for post in by_ids["posts"]] == [post_id, "post-7"]
+
+
+def test_missing_niche_and_invalid_payloads(server):
+    server.missing_niches.add("Blogger")
+    status, body, _ = request(server, "POST", "/user-preferences/recommend/create-post", body=POST)
+    assert status == 500 and "No profiles found with niche" in body["error"]
+
+    status, _, _ = request(server, "POST", "/user-preferences/recommend/create-post",
+                           body={**POST, "niche": "General", "caption": ""})
+    assert status == 400
+
+
+def test_concurrent_creates_with_one_idempotency_key_make_one_post(server):
+    def create(_):
+        return request(server, "POST", "/user-preferences/recommend/create-post",
+                       headers={"Idempotency-Key": "key-1"}, body=POST)[1]["post"]["id"]
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        post_ids = set(executor.map(create, range(64)))
+
+    assert len(post_ids) == 1
+    assert server.get_stats()["posts_created"] == 1
+    assert server.get_stats()["idempotent_replays"] == 63
+
+
+def test_injected_errors_and_token(server):
+    server.error_rates["429"] = 1.0
+    status, _, headers = request(server, "GET", "/user-preferences")
+    assert status == 429 and headers["Retry-After"] == "1.0"
+
+    server.token = "secret"
+    assert request(server, "GET", "/user-preferences")[0] == 401
+
+
+def test_latency_specs_and_corpus_are_deterministic():
+    assert LatencyModel("fixed:250").sample() == 0.25
+    with pytest.raises(ValueError):
+        LatencyModel("lognormal:80")
+    assert SyntheticCorpus(seed=1).post(5) == SyntheticCorpus(seed=1).post(5)
@@ -0,0 +1,114 @@
+import threading
+import time
+from datetime import timedelta
+
+import pytest
+
+from config.settings import settings
+from services.job_manager import JobManager
+
+
+@pytest.fixture(autouse=True)
+def fast_polls(monkeypatch):
+    monkeypatch.setattr(settings, "JOB_POLL_INITIAL_INTERVAL", timedelta(seconds=0.01))
+    monkeypatch.setattr(settings, "JOB_POLL_MAX_INTERVAL", timedelta(seconds=0.02))
+
+
+@pytest.fixture
+def manager():
+    return JobManager(max_workers=2)
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+def test_polls_until_a_result(manager):
+    polls = iter([None, None, "done"])
+    delivered = []
+
+    future = manager.submit("video", lambda: "op-1", lambda operation: next(polls), callback=delivered.append)
+
+    assert future.result(timeout=2) == "done"
+    wait_until(lambda: delivered == ["done"])
+    assert manager.get_stats()["completed"] == 1
+    assert manager.get_stats()["polls"] == 3
+
+
+def test_failed_poll_resolves_to_the_fallback(manager):
+    def poll(operation):
+        raise RuntimeError("provider error")
+
+    future = manager.submit("video", lambda: "op-1", poll, fallback=lambda: "placeholder")
+    assert future.result(timeout=2) == "placeholder"
+    assert manager.get_stats()["failed"] == 1
+
+
+def test_failed_start_without_fallback_raises(manager):
+    def start():
+        raise RuntimeError("could not start")
+
+    future = manager.submit("video", start, lambda operation: "done")
+    with pytest.raises(RuntimeError):
+        future.result(timeout=2)
+
+
+def test_deadline_cancels_the_operation_and_falls_back(manager):
+    cancelled = []
+
+    future = manager.submit("video", lambda: "op-1", lambda operation: None, fallback=lambda: "placeholder",
+                            deadline=0.1, cancel=cancelled.append)
+
+    assert future.result(timeout=2) == "placeholder"
+    assert cancelled == ["op-1"]
+    assert manager.get_stats()["timed_out"] == 1
+
+
+def test_cancelling_the_future_cancels_the_operation(manager):
+    cancelled = []
+    polling = threading.Event()
+
+    def poll(operation):
+        polling.set()
+        return None
+
+    future = manager.submit("video", lambda: "op-1", poll, cancel=cancelled.append)
+    assert polling.wait(2)
+    assert future.cancel()
+
+    wait_until(lambda: cancelled == ["op-1"])
+    assert manager.get_stats()["cancelled"] == 1
+
+
+def test_result_arriving_after_cancel_is_dropped(manager):
+    release = threading.Event()
+    polling = threading.Event()
+
+    def poll(operation):
+        polling.set()
+        release.wait(2)
+        return "done"
+
+    future = manager.submit("video", lambda: "op-1", poll)
+    assert polling.wait(2)
+    future.cancel()
+    release.set()
+
+    wait_until(lambda: manager.get_stats()["cancelled"] == 1)
+    assert manager.get_stats()["completed"] == 0
+
+
+def test_poll_now_skips_the_backoff(manager, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_POLL_INITIAL_INTERVAL", timedelta(minutes=5))
+    ready = threading.Event()
+
+    future = manager.submit("video", lambda: "op-1", lambda operation: "done" if ready.is_set() else None)
+    wait_until(lambda: manager.get_stats()["scheduled"] == 1)
+
+    ready.set()
+    assert manager.poll_now("op-1")
+    assert future.result(timeout=2) == "done"
+    assert not manager.poll_now("op-unknown")
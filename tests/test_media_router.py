@@ -0,0 +1,160 @@
+import threading
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from config.settings import settings
+from services.media_router import MediaRouter, ProviderStats
+
+PLACEHOLDER = "https://placeholder.example/image.png"
+
+
+class FakeProvider:
+    def __init__(self, url=None, delay=0.0, error=None):
+        self.url = url
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.cached = False
+        self.cache_hit = False
+
+    def generate_image(self, prompt, style="realistic"):
+        self.calls += 1
+        self.cache_hit = self.cached
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.url
+
+    def is_fallback(self, url):
+        return url is None or url == PLACEHOLDER
+
+    def served_from_cache(self):
+        hit, self.cache_hit = self.cache_hit, False
+        return hit
+
+
+class JobProvider(FakeProvider):
+    """A provider that renders in the background and hands back a Future"""
+
+    def __init__(self, job: Future):
+        super().__init__()
+        self.job = job
+
+    def submit_image(self, prompt, style="realistic"):
+        self.calls += 1
+        return self.job
+
+
+@pytest.fixture(autouse=True)
+def router_settings(monkeypatch):
+    monkeypatch.setattr(settings, "MEDIA_ROUTER_MIN_SAMPLES", 2)
+    monkeypatch.setattr(settings, "MEDIA_HEDGE_MIN_DELAY", 0.05)
+
+
+def measured(router: MediaRouter, name: str, latency: float, ok: bool = True, samples: int = 2):
+    for _ in range(samples):
+        router.stats[name].record(latency, ok)
+
+
+def test_provider_stats_need_enough_samples():
+    stats = ProviderStats(window=10)
+    stats.record(1.0, True)
+    assert stats.percentile(50) is None
+    stats.record(9.0, False)
+    assert stats.percentile(50) is None
+    stats.record(3.0, True)
+    assert stats.percentile(50) == 3.0
+    assert stats.error_rate() == pytest.approx(1 / 3)
+
+
+def test_measured_fast_provider_is_preferred():
+    router = MediaRouter({"slow": FakeProvider("https://slow/a.png"), "fast": FakeProvider("https://fast/a.png")})
+    measured(router, "slow", 5.0)
+    measured(router, "fast", 1.0)
+    assert router._ranked("generate_image") == ["fast", "slow"]
+
+    measured(router, "fast", 1.0, ok=False, samples=6)
+    assert router._ranked("generate_image") == ["slow", "fast"]
+
+
+def test_placeholder_and_errors_fail_over():
+    router = MediaRouter({"broken": FakeProvider(error=RuntimeError("down")),
+                          "placeholder": FakeProvider(PLACEHOLDER),
+                          "working": FakeProvider("https://working/a.png")})
+    assert router.generate_image("cat") == "https://working/a.png"
+    assert router.stats["broken"].calls == 1
+    assert router.stats["placeholder"].outcomes[-1] is False
+
+
+def test_all_providers_failing_returns_the_first_fallback():
+    router = MediaRouter({"a": FakeProvider(PLACEHOLDER), "b": FakeProvider(error=RuntimeError("down"))})
+    assert router.generate_image("cat") == PLACEHOLDER
+
+
+def test_slow_primary_is_hedged_and_the_hedge_wins():
+    slow = FakeProvider("https://slow/a.png", delay=1.0)
+    fast = FakeProvider("https://fast/a.png")
+    router = MediaRouter({"slow": slow, "fast": fast})
+    measured(router, "slow", 0.05)
+    measured(router, "fast", 0.1)
+
+    started = time.monotonic()
+    assert router.generate_image("cat") == "https://fast/a.png"
+    assert time.monotonic() - started < 0.8
+    assert router.get_stats()["hedges"] == 1
+    assert router.get_stats()["hedge_wins"] == 1
+
+
+def test_cache_hits_are_not_recorded_as_latency():
+    provider = FakeProvider("https://cached/a.png")
+    router = MediaRouter({"only": provider})
+    provider.cached = True
+    router.generate_image("cat")
+    assert router.stats["only"].calls == 0
+
+    provider.cached = False
+    router.generate_image("cat")
+    assert router.stats["only"].calls == 1
+
+
+def test_native_job_is_cancelled_with_the_routed_future():
+    job = Future()
+    router = MediaRouter({"jobs": JobProvider(job)})
+
+    routed = router.submit_image("cat")
+    assert routed.cancel()
+    assert job.cancelled()
+
+
+def test_native_job_result_settles_the_routed_future():
+    job = Future()
+    router = MediaRouter({"jobs": JobProvider(job), "backup": FakeProvider("https://backup/a.png")})
+
+    routed = router.submit_image("cat")
+    threading.Timer(0.05, job.set_result, ("https://jobs/a.png",)).start()
+    assert routed.result(timeout=2) == "https://jobs/a.png"
+    assert router.stats["jobs"].calls == 1
+
+
+def test_native_job_already_done_counts_as_a_cache_hit():
+    job = Future()
+    job.set_result("https://jobs/cached.png")
+    router = MediaRouter({"jobs": JobProvider(job)})
+
+    assert router.generate_image("cat") == "https://jobs/cached.png"
+    assert router.stats["jobs"].calls == 0
+
+
+def test_video_duration_is_the_shortest_any_provider_renders():
+    class VideoProvider(FakeProvider):
+        def __init__(self, longest):
+            super().__init__()
+            self.longest = longest
+
+        def supported_video_duration(self, duration):
+            return min(duration, self.longest)
+
+    router = MediaRouter({"a": VideoProvider(8), "b": VideoProvider(10), "c": FakeProvider()})
+    assert router.supported_video_duration(60) == 8
@@ -0,0 +1,29 @@
+import time
+
+from services.niche_cache import NicheAvailabilityCache
+
+
+def test_rejected_niche_routes_to_general_until_it_expires():
+    cache = NicheAvailabilityCache(ttl_seconds=0.05)
+    assert cache.choose_shape("Cooking") == "requested"
+
+    cache.mark_niche_rejected("Cooking")
+    assert cache.choose_shape("Cooking") == "general"
+    assert cache.get_stats()["round_trips_saved"] == 1
+
+    time.sleep(0.1)
+    assert cache.choose_shape("Cooking") == "requested"
+
+
+def test_only_definitive_rejections_are_remembered():
+    cache = NicheAvailabilityCache(ttl_seconds=60)
+    for status in (429, 500, 503):
+        cache.record_shape("Tech", "requested", status)
+    assert cache.choose_shape("Tech") == "requested"
+
+    cache.record_shape("Tech", "requested", 422)
+    assert cache.choose_shape("Tech") == "general"
+
+    cache.record_shape("Tech", "requested", 201)
+    assert cache.choose_shape("Tech") == "requested"
+    assert cache.get_stats()["shape_outcomes"] == {"Tech/requested": True}
@@ -0,0 +1,203 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from config.settings import settings
+from models.content_models import GeneratedContent, PostResult
+from services.database import ContentDatabase
+from services.outbox import PostOutbox
+
+
+def make_content(caption: str) -> GeneratedContent:
+    return GeneratedContent(
+        content_type="image",
+        caption=caption,
+        description="",
+        keywords=["tech"],
+        media_source="https://example.com/image.png",
+        viral_score=50,
+        trend_alignment=[]
+    )
+
+
+class FakePostManager:
+    """Just the PostManager surface the outbox uses, with scripted post outcomes"""
+
+    def __init__(self):
+        self.outcomes = {}  # caption -> list of statuses, consumed one per attempt
+        self.posted = set()
+        self.found = {}
+        self.sent = []
+        self.released = []
+
+    def fingerprint(self, content):
+        return f"fp-{content.caption}"
+
+    def result(self, content, status):
+        return PostResult(
+            success=status == "posted",
+            post_id=f"post-{content.caption}" if status == "posted" else "",
+            content_type=content.content_type,
+            posted_at=datetime.now(),
+            engagement_metrics={},
+            status=status,
+            content_id=self.fingerprint(content)
+        )
+
+    def post_batch(self, content_list, keep_claims=False):
+        assert keep_claims
+        results = []
+        for content in content_list:
+            self.sent.append(content.caption)
+            statuses = self.outcomes.get(content.caption)
+            results.append(self.result(content, statuses.pop(0) if statuses else "posted"))
+        return results
+
+    def is_posted(self, content):
+        return content.caption in self.posted
+
+    def find_posted(self, content):
+        return self.found.get(content.caption)
+
+    def skip_if_posted(self, content):
+        return self.result(content, "skipped") if self.is_posted(content) else None
+
+    def queued_result(self, content):
+        return self.result(content, "queued")
+
+    def release_claim(self, content):
+        self.released.append(content.caption)
+
+
+@pytest.fixture(autouse=True)
+def immediate_retries(monkeypatch):
+    monkeypatch.setattr(settings, "OUTBOX_RETRY_BASE_DELAY", timedelta(0))
+    monkeypatch.setattr(settings, "OUTBOX_MAX_ATTEMPTS", 3)
+
+
+@pytest.fixture
+def database():
+    database = ContentDatabase(":memory:")
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def manager():
+    return FakePostManager()
+
+
+@pytest.fixture
+def outbox(database, manager):
+    return PostOutbox(database, manager, batch_size=10, poll_interval=0.01)
+
+
+def test_delivers_queued_content(outbox, database, manager):
+    assert outbox.enqueue([make_content("a"), make_content("b")], "user-1") == 2
+
+    results = outbox.drain_once()
+    assert [result.post_id for result in results] == ["post-a", "post-b"]
+    assert database.get_outbox_stats()["delivered"] == 2
+    assert {result.content_id for result in outbox.collect_results()} == {"fp-a", "fp-b"}
+    assert database.get_content_post_result("fp-a").post_id == "post-a"
+    assert outbox.drain_once() == []
+
+
+def test_live_key_is_not_queued_twice_but_a_delivered_one_can_be(outbox, manager):
+    assert outbox.enqueue([make_content("a")]) == 1
+    assert outbox.enqueue([make_content("a")]) == 0
+
+    outbox.drain_once()
+    assert outbox.enqueue([make_content("a")]) == 1
+
+
+def test_failed_post_is_retried_with_its_claim_held(outbox, database, manager):
+    manager.outcomes["a"] = ["failed"]
+    outbox.enqueue([make_content("a")])
+
+    outbox.drain_once()
+    assert database.get_outbox_stats()["pending"] == 1
+    assert manager.released == []
+    assert outbox.collect_results() == []
+
+    outbox.drain_once()
+    assert manager.sent == ["a", "a"]
+    assert database.get_outbox_stats()["delivered"] == 1
+
+
+def test_gives_up_after_max_attempts_and_releases_the_claim(outbox, database, manager):
+    manager.outcomes["a"] = ["failed"] * settings.OUTBOX_MAX_ATTEMPTS
+    outbox.enqueue([make_content("a")], "user-1")
+
+    for _ in range(settings.OUTBOX_MAX_ATTEMPTS):
+        outbox.drain_once()
+
+    assert database.get_outbox_stats()["failed"] == 1
+    assert manager.released == ["a"]
+    assert [result.status for result in outbox.collect_results()] == ["failed"]
+    assert outbox.drain_once() == []
+
+
+def test_unknown_outcome_is_reconciled_instead_of_resent(outbox, database, manager):
+    manager.outcomes["a"] = ["unknown"]
+    outbox.enqueue([make_content("a")])
+
+    outbox.drain_once()
+    assert database.get_outbox_stats()["uncertain"] == 1
+
+    manager.found["a"] = manager.result(make_content("a"), "posted")
+    outbox.drain_once()
+    assert manager.sent == ["a"]
+    assert database.get_outbox_stats()["delivered"] == 1
+
+
+def test_uncertain_entry_that_is_not_found_is_sent_again(outbox, database, manager):
+    manager.outcomes["a"] = ["unknown"]
+    outbox.enqueue([make_content("a")])
+
+    outbox.drain_once()
+    outbox.drain_once()
+    assert manager.sent == ["a", "a"]
+    assert database.get_outbox_stats()["delivered"] == 1
+
+
+def test_expired_lease_is_redelivered_as_uncertain(outbox, database, manager):
+    outbox.enqueue([make_content("a")])
+
+    # A poster that crashed mid-delivery leaves the entry leased but never acknowledged
+    entries = database.claim_outbox(10, 0)
+    assert not entries[0]["uncertain"]
+
+    manager.found["a"] = manager.result(make_content("a"), "posted")
+    results = outbox.drain_once()
+    assert [result.post_id for result in results] == ["post-a"]
+    assert manager.sent == []
+
+
+def test_already_posted_entry_is_acknowledged_with_its_stored_result(outbox, database, manager):
+    content = make_content("a")
+    database.save_post_results([manager.result(content, "posted")])
+    manager.posted.add("a")
+    outbox.enqueue([content])
+
+    assert [result.post_id for result in outbox.drain_once()] == ["post-a"]
+    assert manager.sent == []
+    assert database.get_outbox_stats()["delivered"] == 1
+
+
+def test_post_reports_skipped_and_queued_without_a_running_poster(outbox, manager):
+    manager.posted.add("a")
+
+    results = outbox.post([make_content("a"), make_content("b")], wait=5)
+    assert [result.status for result in results] == ["skipped", "queued"]
+
+
+def test_post_waits_for_the_running_poster(outbox):
+    outbox.start()
+    try:
+        results = outbox.post([make_content("a"), make_content("b")], wait=5)
+    finally:
+        outbox.stop(timeout=5)
+
+    assert [result.post_id for result in results] == ["post-a", "post-b"]
+    assert outbox.collect_results() == []
@@ -0,0 +1,104 @@
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from agents.post_manager import PostManager
+from models.content_models import GeneratedContent, PostResult
+from services.dedupe_store import ContentFingerprintStore
+
+
+def make_content(caption: str) -> GeneratedContent:
+    return GeneratedContent(content_type="image", caption=caption, description="", keywords=["tech"],
+                            media_source="https://example.com/i.png", viral_score=60, trend_alignment=["ai"])
+
+
+class FakeCirclo:
+    def __init__(self, failing=(), slow=(), release=None):
+        self.failing = set(failing)
+        self.slow = set(slow)
+        self.release = release
+        self.deadlines = []
+
+    def create_post(self, data, deadline_at=None):
+        self.deadlines.append(deadline_at)
+        if data["caption"] in self.slow:
+            self.release.wait(5)
+        success = data["caption"] not in self.failing
+        return PostResult(success=success, post_id=f"post-{data['caption']}" if success else "",
+                          content_type=data["media_type"], posted_at=datetime.now(), engagement_metrics={})
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = PostManager()
+    manager.fingerprints = ContentFingerprintStore(str(tmp_path / "fingerprints.jsonl"))
+    manager.circlo_api = FakeCirclo()
+    return manager
+
+
+def claim(manager, content):
+    assert manager.fingerprints.reserve(manager.fingerprint(content), "generated")
+
+
+def is_claimed(manager, content):
+    return not manager.fingerprints.reserve(manager.fingerprint(content), "generated")
+
+
+def test_posts_in_order_and_skips_already_posted_content(manager):
+    contents = [make_content("a"), make_content("b"), make_content("c")]
+    manager.fingerprints.add(manager.fingerprint(contents[1]), "posted")
+
+    results = manager.post_content_to_circlo(contents, concurrency=2, deadline=5)
+    assert [result.status for result in results] == ["posted", "skipped", "posted"]
+    assert [result.content_id for result in results] == [manager.fingerprint(c) for c in contents]
+    assert manager.is_posted(contents[0])
+    assert all(deadline is not None for deadline in manager.circlo_api.deadlines)
+
+
+def test_failed_post_releases_its_claim_unless_kept(manager):
+    manager.circlo_api = FakeCirclo(failing={"a", "b"})
+    released, kept = make_content("a"), make_content("b")
+    claim(manager, released)
+    claim(manager, kept)
+
+    manager.post_batch([released], deadline=5)
+    manager.post_batch([kept], deadline=5, keep_claims=True)
+
+    assert not is_claimed(manager, released)
+    assert is_claimed(manager, kept)
+    manager.release_claim(kept)
+    assert not is_claimed(manager, kept)
+
+
+def test_post_past_its_deadline_is_unknown_and_recorded_when_it_lands(manager):
+    release = threading.Event()
+    manager.circlo_api = FakeCirclo(slow={"slow"}, release=release)
+    content = make_content("slow")
+
+    started = time.monotonic()
+    [result] = manager.post_batch([content], deadline=0.2)
+    assert time.monotonic() - started < 1
+    assert result.status == "unknown"
+
+    release.set()
+    deadline = time.monotonic() + 2
+    while not manager.is_posted(content) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert manager.is_posted(content)
+
+
+def test_analytics_leave_skipped_and_queued_out_of_the_success_rate(manager):
+    contents = [make_content(caption) for caption in "abcd"]
+    results = [
+        PostResult(True, "p1", "image", datetime.now(), {}),
+        PostResult(False, "", "image", datetime.now(), {}),
+        manager._skipped_result(contents[2]),
+        manager.queued_result(contents[3])
+    ]
+
+    performance = manager.generate_analytics_report(contents, results)["performance"]
+    assert (performance["successful_posts"], performance["failed_posts"]) == (1, 1)
+    assert (performance["skipped_posts"], performance["queued_posts"]) == (1, 1)
+    assert performance["success_rate"] == 0.5
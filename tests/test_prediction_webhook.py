@@ -0,0 +1,114 @@
+import base64
+import hashlib
+import hmac
+import json
+import time
+import urllib.request
+
+import pytest
+
+from services.prediction_webhook import PredictionWebhookReceiver
+
+KEY = b"test-signing-key"
+SECRET = "whsec_" + base64.b64encode(KEY).decode()
+
+
+def signed_headers(body: bytes, webhook_id: str = "msg-1", timestamp=None, key: bytes = KEY) -> dict:
+    timestamp = str(int(time.time() if timestamp is None else timestamp))
+    digest = hmac.new(key, f"{webhook_id}.{timestamp}.".encode() + body, hashlib.sha256).digest()
+    return {
+        "webhook-id": webhook_id,
+        "webhook-timestamp": timestamp,
+        "webhook-signature": "v1," + base64.b64encode(digest).decode()
+    }
+
+
+def prediction(status: str = "succeeded", prediction_id: str = "pred-1") -> bytes:
+    return json.dumps({"id": prediction_id, "status": status, "output": ["https://example.com/v.mp4"]}).encode()
+
+
+@pytest.fixture
+def completed():
+    return []
+
+
+@pytest.fixture
+def receiver(completed):
+    return PredictionWebhookReceiver(host="127.0.0.1", port=0, secret=SECRET, on_completed=completed.append)
+
+
+def test_signed_delivery_is_stored_and_reported(receiver, completed):
+    body = prediction()
+    assert receiver.handle(signed_headers(body), body) == 200
+    assert completed == ["pred-1"]
+    assert receiver.pop("pred-1")["status"] == "succeeded"
+    assert receiver.pop("pred-1") is None
+
+
+def test_any_of_several_signatures_may_match(receiver):
+    body = prediction()
+    headers = signed_headers(body)
+    headers["webhook-signature"] = "v1,bm90LXRoZS1zaWduYXR1cmU= " + headers["webhook-signature"]
+    assert receiver.handle(headers, body) == 200
+
+
+@pytest.mark.parametrize("tamper", [
+    lambda headers, body: (signed_headers(body, key=b"wrong-key"), body),
+    lambda headers, body: (headers, body.replace(b"succeeded", b"failed")),
+    lambda headers, body: ({**headers, "webhook-id": "msg-2"}, body),
+    lambda headers, body: (signed_headers(body, timestamp=time.time() - 3600), body),
+    lambda headers, body: ({k: v for k, v in headers.items() if k != "webhook-signature"}, body),
+    lambda headers, body: ({**headers, "webhook-timestamp": "soon"}, body),
+])
+def test_invalid_signatures_are_rejected(receiver, completed, tamper):
+    body = prediction()
+    headers, body = tamper(signed_headers(body), body)
+    assert receiver.handle(headers, body) == 401
+    assert completed == []
+    assert receiver.get_stats()["rejected"] == 1
+
+
+def test_receiver_without_a_secret_rejects_everything_and_will_not_start(completed):
+    receiver = PredictionWebhookReceiver(port=0, secret="", on_completed=completed.append)
+    body = prediction()
+    assert receiver.handle(signed_headers(body), body) == 401
+    with pytest.raises(RuntimeError):
+        receiver.start()
+
+
+def test_non_terminal_and_malformed_payloads(receiver, completed):
+    body = prediction(status="processing")
+    assert receiver.handle(signed_headers(body), body) == 200
+    body = b"not json"
+    assert receiver.handle(signed_headers(body), body) == 400
+    body = json.dumps({"status": "succeeded"}).encode()
+    assert receiver.handle(signed_headers(body), body) == 400
+    assert completed == []
+
+
+def test_unclaimed_deliveries_expire(completed):
+    receiver = PredictionWebhookReceiver(port=0, secret=SECRET, retention_seconds=0.05)
+    body = prediction()
+    receiver.handle(signed_headers(body), body)
+    assert receiver.get_stats()["unclaimed"] == 1
+
+    time.sleep(0.1)
+    assert receiver.pop("pred-1") is None
+    assert receiver.get_stats()["expired"] == 1
+
+
+def test_serves_deliveries_over_http(receiver, completed):
+    receiver.start()
+    try:
+        body = prediction()
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{receiver.httpd.server_address[1]}/",
+            data=body, headers=signed_headers(body), method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=5) as response:
+            assert response.status == 200
+    finally:
+        receiver.stop()
+
+    assert completed == ["pred-1"]
+    assert not receiver.is_running()
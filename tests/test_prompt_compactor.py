@@ -0,0 +1,53 @@
+from services.prompt_compactor import PromptCompactor, TokenUsageTracker, estimate_tokens
+
+
+def test_only_whitelisted_non_empty_fields_are_sent():
+    compacted = PromptCompactor().compact("caption", {
+        "trend_data": {"viral_keywords": ["ai"], "meme_keywords": [], "raw_posts": ["..."] * 50},
+        "content_idea": {"title": "Launch", "unused": "x"}
+    }, budget=1000)
+
+    assert compacted == {"trend_data": '{"viral_keywords":["ai"]}', "content_idea": '{"title":"Launch"}'}
+
+
+def test_lists_strings_and_count_mappings_shrink_to_fit():
+    compacted = PromptCompactor().compact("caption", {
+        "trend_data": {
+            "viral_keywords": [f"keyword-{i}" for i in range(40)],
+            "engagement_patterns": {f"hour-{i}": i for i in range(20)}
+        },
+        "content_idea": {"description": "word " * 200}
+    }, budget=60)
+
+    assert sum(estimate_tokens(text) for text in compacted.values()) <= 60
+    assert '"hour-19":19' in compacted["trend_data"]
+    assert '"hour-0":0' not in compacted["trend_data"]
+
+
+def test_trims_dict_sections_when_the_largest_section_is_not_a_dict():
+    compacted = PromptCompactor().compact("context", {
+        "context": "word " * 800,
+        "details": {"first": "a" * 20, "second": "b" * 20}
+    }, budget=18)
+
+    assert compacted["details"] in ('{"first":"aaaaaaaaaaaaaaaaaaaa"}', "{}")
+    assert len(compacted["context"]) > len(compacted["details"])
+
+
+def test_render_fits_the_whole_prompt_into_the_budget():
+    template = "Write a caption.\nTrends: {trend_data}\nIdea: {content_idea}"
+    prompt = PromptCompactor().render("caption", template, budget=40,
+                                      trend_data={"viral_keywords": [f"k{i}" for i in range(100)]},
+                                      content_idea={"title": "t" * 400})
+    assert estimate_tokens(prompt) <= 40
+
+
+def test_usage_tracker_averages_per_template():
+    tracker = TokenUsageTracker()
+    tracker.record("caption", 100, 20, 1.0)
+    tracker.record("caption", 300, 40, 3.0)
+    tracker.record_cached("caption")
+
+    stats = tracker.get_stats()["caption"]
+    assert (stats["calls"], stats["cached_calls"]) == (2, 1)
+    assert (stats["avg_input_tokens"], stats["avg_output_tokens"], stats["avg_latency_seconds"]) == (200, 30, 2.0)
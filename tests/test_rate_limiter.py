@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+import pytest
+import requests
+
+from config.settings import settings
+from services.rate_limiter import RateLimiter, RateLimitWaitTimeout, TokenBucket
+
+
+class Response:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    monkeypatch.setattr(settings, "RETRY_BASE_DELAY", 0.0)
+    monkeypatch.setattr(settings, "RETRY_MAX_ATTEMPTS", 3)
+    return RateLimiter()
+
+
+def test_bucket_spends_burst_then_asks_to_wait():
+    bucket = TokenBucket(rate=1.0, capacity=2)
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() == 0.0
+    assert 0 < bucket.try_acquire() <= 1.0
+
+
+def test_acquire_raises_when_wait_would_pass_deadline():
+    bucket = TokenBucket(rate=0.1, capacity=1)
+    bucket.try_acquire()
+    with pytest.raises(RateLimitWaitTimeout):
+        bucket.acquire(deadline_at=time.monotonic() + 0.5)
+
+
+def test_acquire_async_raises_when_wait_would_pass_deadline():
+    bucket = TokenBucket(rate=0.1, capacity=1)
+    bucket.try_acquire()
+    with pytest.raises(RateLimitWaitTimeout):
+        asyncio.run(bucket.acquire_async(deadline_at=time.monotonic() + 0.5))
+
+
+def test_pause_holds_back_callers():
+    bucket = TokenBucket(rate=100.0, capacity=5)
+    bucket.pause(10)
+    assert bucket.try_acquire() > 9
+
+
+def test_call_retries_retryable_status(limiter):
+    responses = [Response(503), Response(200)]
+    first = responses[0]
+    assert limiter.call("test.endpoint", lambda: responses.pop(0)).status_code == 200
+    assert first.closed
+
+
+def test_call_returns_last_response_when_attempts_run_out(limiter):
+    sent = []
+
+    def send():
+        sent.append(Response(503))
+        return sent[-1]
+
+    assert limiter.call("test.endpoint", send).status_code == 503
+    assert len(sent) == settings.RETRY_MAX_ATTEMPTS
+    assert all(response.closed for response in sent[:-1])
+
+
+def test_non_idempotent_call_is_not_resent_after_a_timeout(limiter):
+    attempts = []
+
+    def send():
+        attempts.append(1)
+        raise requests.ReadTimeout("read timed out")
+
+    with pytest.raises(requests.ReadTimeout):
+        limiter.call("test.endpoint", send, idempotent=False)
+    assert len(attempts) == 1
+
+
+def test_no_retry_starts_past_the_deadline(limiter):
+    attempts = []
+
+    def send():
+        attempts.append(1)
+        return Response(429, {"Retry-After": "5"})
+
+    result = limiter.call("test.endpoint", send, deadline_at=time.monotonic() + 1)
+    assert result.status_code == 429
+    assert len(attempts) == 1
+
+
+def test_retry_after_is_honoured():
+    limiter = RateLimiter()
+    assert limiter.retry_delay("test.endpoint", 0, 429, {"Retry-After": "2"}) == 2.0
+    assert limiter.get_bucket("test.endpoint").try_acquire() > 1
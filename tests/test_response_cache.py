@@ -0,0 +1,39 @@
+import time
+
+from services.response_cache import ResponseCache
+
+
+def test_entries_go_stale_but_stay_available_for_revalidation():
+    cache = ResponseCache(max_entries=4, ttl_seconds=0.05)
+    cache.put("trends", ["post"], etag='"v1"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+    assert cache.get("trends").is_fresh()
+
+    time.sleep(0.1)
+    entry = cache.get("trends")
+    assert not entry.is_fresh()
+    assert entry.validator_headers() == {"If-None-Match": '"v1"',
+                                         "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+
+    assert cache.refresh("trends").is_fresh()
+    assert cache.refresh("missing") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2, ttl_seconds=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a").value == 1
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_hit_rate_counts_revalidations_as_hits():
+    cache = ResponseCache(max_entries=2, ttl_seconds=60)
+    cache.record_hit()
+    cache.record_revalidation()
+    cache.record_miss()
+    cache.record_miss()
+    assert cache.get_stats()["hit_rate"] == 0.5
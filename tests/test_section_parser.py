@@ -0,0 +1,53 @@
+from services.section_parser import CONTENT_SECTIONS, VIDEO_SECTIONS, SectionParser
+
+RESPONSE = "CAPTION: Morning light\nDESCRIPTION: A calm start\nto the day\nHASHTAGS: #sun, #calm, \n"
+
+
+def test_parses_labelled_sections():
+    parser = SectionParser(CONTENT_SECTIONS)
+    parser.feed(RESPONSE)
+    assert parser.close() == {
+        "caption": "Morning light",
+        "description": "A calm start to the day",
+        "hashtags": ["#sun", "#calm"]
+    }
+
+
+def test_chunk_boundaries_do_not_matter():
+    whole = SectionParser(CONTENT_SECTIONS)
+    whole.feed(RESPONSE)
+
+    chunked = SectionParser(CONTENT_SECTIONS)
+    for char in RESPONSE:
+        chunked.feed(char)
+
+    assert chunked.close() == whole.close()
+
+
+def test_section_completes_when_the_next_label_arrives():
+    seen = []
+    parser = SectionParser(CONTENT_SECTIONS, on_section=lambda name, value: seen.append((name, value)))
+
+    # Labels are matched on whole lines, so the partial DESCRIPTION line is held back
+    assert parser.feed("CAPTION: Hello\nDESCRIPTION: Wor") == []
+    assert parser.feed("ld\n") == ["caption"]
+    assert seen == [("caption", "Hello")]
+
+    parser.close()
+    assert seen[-1] == ("description", "World")
+    assert parser.completed == ["caption", "description"]
+
+
+def test_missing_sections_keep_their_defaults():
+    parser = SectionParser(CONTENT_SECTIONS)
+    parser.feed("Some preamble\nCAPTION: Only a caption")
+    assert parser.close() == {"caption": "Only a caption", "description": "", "hashtags": []}
+
+
+def test_custom_list_sections():
+    parser = SectionParser(VIDEO_SECTIONS, list_sections=["scenes"])
+    parser.feed("HOOK: Wait for it\nSCENES: open, reveal, close\nCTA: Follow")
+    result = parser.close()
+    assert result["scenes"] == ["open", "reveal", "close"]
+    assert result["cta"] == "Follow"
+    assert result["script"] == ""
@@ -0,0 +1,64 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from services.single_flight import AsyncSingleFlight, SingleFlight
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(2)
+        return "value"
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(flight.do, "key", fetch) for _ in range(4)]
+        deadline = time.monotonic() + 2
+        while flight.get_stats()["coalesced"] < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        results = [future.result(timeout=2) for future in futures]
+
+    assert results == ["value"] * 4
+    assert len(calls) == 1
+    assert flight.get_stats() == {"executed": 1, "coalesced": 3, "in_flight": 0}
+
+
+def test_errors_are_shared_and_the_key_is_freed():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError("upstream error")
+
+    with pytest.raises(ValueError):
+        flight.do("key", fail)
+    assert flight.do("key", lambda: "retried") == "retried"
+
+
+def test_async_calls_share_one_task_and_survive_a_cancelled_waiter():
+    async def scenario():
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "value"
+
+        first = asyncio.ensure_future(flight.do("key", fetch))
+        second = asyncio.ensure_future(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await second == "value"
+        assert len(calls) == 1
+        assert flight.get_stats() == {"executed": 1, "coalesced": 1, "in_flight": 0}
+
+    asyncio.run(scenario())
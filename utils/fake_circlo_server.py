@@ -0,0 +1,430 @@
+"""Local stand-in for the Circlo API, for load and latency testing.
+
+Serves /user-preferences, /posts/by-keywords, /posts/by-ids and
+/user-preferences/recommend/create-post under /api with configurable
+latency, error injection and synthetic corpora that are generated on demand,
+so millions of posts cost no memory.
+
+Run it and point the app at it:
+
+    python -m utils.fake_circlo_server --port 8787 --posts 5000000 \
+        --latency lognormal:80:0.5 --error 429=0.02 --error niche=0.1
+    CIRCLO_BASE_URL=http://127.0.0.1:8787/api python main.py
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import math
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+KEYWORD_VOCABULARY = [
+    "AI", "technology", "innovation", "digital", "future", "meme", "funny", "viral",
+    "music", "travel", "food", "fitness", "fashion", "gaming", "art", "photography",
+    "business", "education", "health", "lifestyle", "startup", "crypto", "design", "nature"
+]
+NICHES = ["General", "Blogger", "Traveler", "Foodie", "Fitness Coach", "Gamer", "Artist", "Musician"]
+POST_TYPES = ["image", "video"]
+
+
+class LatencyModel:
+    """Samples per-request latency in seconds from a spec such as 'lognormal:80:0.5'.
+
+    Supported specs (values in milliseconds):
+      none | fixed:MS | uniform:MIN:MAX | normal:MEAN:STD | exponential:MEAN | lognormal:MEDIAN:SIGMA
+    """
+
+    def __init__(self, spec: str = "none", seed: Optional[int] = None):
+        self.spec = spec
+        parts = spec.split(":")
+        self.kind = parts[0]
+        self.args = [float(value) for value in parts[1:]]
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+        expected_args = {"none": 0, "fixed": 1, "uniform": 2, "normal": 2, "exponential": 1, "lognormal": 2}
+        if self.kind not in expected_args or len(self.args) != expected_args[self.kind]:
+            raise ValueError(f"Invalid latency spec: {spec}")
+
+    def sample(self) -> float:
+        with self.lock:
+            if self.kind == "none":
+                ms = 0.0
+            elif self.kind == "fixed":
+                ms = self.args[0]
+            elif self.kind == "uniform":
+                ms = self.random.uniform(*self.args)
+            elif self.kind == "normal":
+                ms = self.random.gauss(*self.args)
+            elif self.kind == "exponential":
+                ms = self.random.expovariate(1 / self.args[0]) if self.args[0] > 0 else 0.0
+            else:
+                ms = self.random.lognormvariate(math.log(self.args[0]), self.args[1])
+        return max(0.0, ms) / 1000
+
+
+class SyntheticCorpus:
+    """Deterministic users and posts derived from their index, never stored"""
+
+    def __init__(self, users: int = 1000, posts: int = 1_000_000, seed: int = 42):
+        self.users = users
+        self.posts = posts
+        self.seed = seed
+        self.created_at = datetime(2025, 1, 1)
+
+    def _rng(self, kind: str, index: int) -> random.Random:
+        return random.Random(f"{self.seed}:{kind}:{index}")
+
+    def user_preference(self, index: int) -> Dict:
+        rng = self._rng("user", index)
+        return {
+            "id": f"pref-{index}",
+            "userId": f"user-{index}",
+            "preferredKeywords": rng.sample(KEYWORD_VOCABULARY, 5),
+            "preferredNiches": rng.sample(NICHES, 2),
+            "preferredGenders": [],
+            "visualRepresentationAffinities": rng.sample(["modern", "futuristic", "minimalist", "vintage"], 2),
+            "activeHours": [f"{hour:02d}:00 UTC" for hour in sorted(rng.sample(range(24), 3))],
+            "engagementRatio": round(rng.uniform(0.1, 0.95), 2)
+        }
+
+    def post(self, index: int) -> Dict:
+        rng = self._rng("post", index)
+        vocabulary_size = len(KEYWORD_VOCABULARY)
+        keywords = list(dict.fromkeys([
+            KEYWORD_VOCABULARY[index % vocabulary_size],
+            KEYWORD_VOCABULARY[(index // vocabulary_size) % vocabulary_size],
+            rng.choice(KEYWORD_VOCABULARY)
+        ]))
+        return {
+            "id": f"post-{index}",
+            "postType": rng.choice(POST_TYPES),
+            "caption": f"Synthetic {keywords[0]} post #{index}" + (" 😂" if "meme" in keywords else ""),
+            "keywords": keywords,
+            "likeCount": int(rng.paretovariate(1.5) * 10),
+            "commentCount": int(rng.paretovariate(2.0) * 2),
+            "createdAt": (self.created_at + timedelta(seconds=index)).isoformat()
+        }
+
+    def keyword_index(self, keyword: str) -> int:
+        """Vocabulary slot for a keyword; unknown keywords map to a stable slot"""
+        lowered = keyword.strip().lower()
+        for i, known in enumerate(KEYWORD_VOCABULARY):
+            if known.lower() == lowered:
+                return i
+        return int(hashlib.sha1(lowered.encode()).hexdigest(), 16) % len(KEYWORD_VOCABULARY)
+
+    def posts_for_keywords(self, keywords: List[str], limit: int) -> List[Dict]:
+        """Newest posts whose primary keyword matches any requested keyword"""
+        vocabulary_size = len(KEYWORD_VOCABULARY)
+        streams = []
+        for slot in dict.fromkeys(self.keyword_index(keyword) for keyword in keywords if keyword.strip()):
+            newest = self.posts - 1 - ((self.posts - 1 - slot) % vocabulary_size)
+            if newest >= 0:
+                streams.append(range(newest, -1, -vocabulary_size))
+
+        # Interleave keyword streams newest-first
+        indices = [i for group in itertools.zip_longest(*streams) for i in group if i is not None]
+        return [self.post(i) for i in indices[:limit]]
+
+
+class FakeCircloServer:
+    """Threaded HTTP server imitating the Circlo endpoints used by CircloAPI"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, users: int = 1000, posts: int = 1_000_000,
+                 latency: str = "none", error_rates: Optional[Dict[str, float]] = None,
+                 missing_niches: Optional[List[str]] = None, token: Optional[str] = None,
+                 retry_after: float = 1.0, seed: int = 42):
+        self.corpus = SyntheticCorpus(users, posts, seed)
+        self.latency = LatencyModel(latency, seed)
+        # Keys are HTTP statuses ("401", "429", "500", "503") or "niche" for the missing-niche 500
+        self.error_rates = error_rates or {}
+        self.missing_niches = set(missing_niches or [])
+        self.token = token
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        # Reentrant so _create_post can roll injected errors while holding it
+        self.lock = threading.RLock()
+
+        self.created_posts: Dict[str, Dict] = {}
+        self.idempotent_posts: Dict[str, str] = {}
+        self.idempotent_replays = 0
+        self.post_counter = itertools.count(1)
+        self.request_counts: Dict[str, int] = {}
+        self.status_counts: Dict[int, int] = {}
+
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/api"
+
+    def start(self) -> str:
+        """Serve in a background thread and return the base URL"""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="fake-circlo", daemon=True)
+        self.thread.start()
+        return self.base_url
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            return {
+                "requests": dict(self.request_counts),
+                "statuses": dict(self.status_counts),
+                "posts_created": len(self.created_posts),
+                "idempotent_replays": self.idempotent_replays
+            }
+
+    def _roll(self, error: str) -> bool:
+        rate = self.error_rates.get(error, 0.0)
+        if rate <= 0:
+            return False
+        with self.lock:
+            return self.random.random() < rate
+
+    def _record(self, route: str, status: int):
+        with self.lock:
+            self.request_counts[route] = self.request_counts.get(route, 0) + 1
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+
+    def _injected_error(self) -> Optional[tuple]:
+        """Pick an injected failure for this request, if any"""
+        for status in ("401", "429", "503", "500"):
+            if self._roll(status):
+                body = {"error": "Unauthorized" if status == "401" else "Injected failure"}
+                headers = {"Retry-After": str(self.retry_after)} if status == "429" else {}
+                return int(status), body, headers
+        return None
+
+    def handle(self, method: str, path: str, query: Dict[str, List[str]], headers, body: Optional[Dict]) -> tuple:
+        """Route a request; returns (status, body, extra headers)"""
+        route = path[len("/api"):] if path.startswith("/api") else path
+
+        if route == "/__stats":
+            return 200, self.get_stats(), {}
+
+        if self.token and headers.get("Authorization") != f"Bearer {self.token}":
+            return 401, {"error": "Invalid or expired token"}, {}
+
+        error = self._injected_error()
+        if error:
+            return error
+
+        if method == "GET" and route == "/user-preferences":
+            return self._user_preferences(query)
+        if method == "GET" and route == "/posts/by-keywords":
+            return self._posts_by_keywords(query, headers)
+        if method == "GET" and route == "/posts/by-ids":
+            return self._posts_by_ids(query)
+        if method == "POST" and route == "/user-preferences/recommend/create-post":
+            return self._create_post(body or {}, headers.get("Idempotency-Key"))
+        return 404, {"error": f"Not found: {method} {route}"}, {}
+
+    def _int_param(self, query: Dict, name: str, default: int) -> Optional[int]:
+        """Integer query parameter, or None if it is not a number"""
+        try:
+            return int(query.get(name, [str(default)])[0])
+        except ValueError:
+            return None
+
+    def _user_preferences(self, query: Dict) -> tuple:
+        page = self._int_param(query, "page", 1)
+        limit = self._int_param(query, "limit", 50)
+        if page is None or limit is None:
+            return 400, {"error": "page and limit must be integers"}, {}
+        page = max(1, page)
+        limit = max(1, min(500, limit))
+        start = (page - 1) * limit
+        end = min(self.corpus.users, start + limit)
+        preferences = [self.corpus.user_preference(i) for i in range(start, end)]
+        return 200, {
+            "preferences": preferences,
+            "pagination": {
+                "page": page,
+                "limit": limit,
+                "total": self.corpus.users,
+                "totalPages": math.ceil(self.corpus.users / limit)
+            }
+        }, {}
+
+    def _posts_by_keywords(self, query: Dict, headers) -> tuple:
+        keywords = query.get("keywords", [""])[0].split(",")
+        limit = self._int_param(query, "limit", 15)
+        if limit is None:
+            return 400, {"error": "limit must be an integer"}, {}
+        limit = max(1, min(500, limit))
+        wanted = {keyword.strip().lower() for keyword in keywords if keyword.strip()}
+        with self.lock:
+            created = [dict(post) for post in reversed(list(self.created_posts.values()))
+                       if wanted & {keyword.lower() for keyword in post.get("keywords", [])}]
+        posts = (created + self.corpus.posts_for_keywords(keywords, limit))[:limit]
+
+        # The synthetic corpus never changes, so the ETag only depends on the query and matching created posts
+        etag = '"' + hashlib.sha1(f"{sorted(keywords)}:{limit}:{len(created)}".encode()).hexdigest() + '"'
+        if headers.get("If-None-Match") == etag:
+            return 304, None, {"ETag": etag}
+        return 200, {"posts": posts}, {"ETag": etag}
+
+    def _posts_by_ids(self, query: Dict) -> tuple:
+        post_ids = [post_id for post_id in query.get("ids", [""])[0].split(",") if post_id]
+        posts = []
+        for post_id in post_ids[:500]:
+            with self.lock:
+                created = self.created_posts.get(post_id)
+            if created:
+                posts.append(self._with_engagement(created))
+            elif post_id.startswith("post-") and post_id[5:].isdigit() and int(post_id[5:]) < self.corpus.posts:
+                posts.append(self.corpus.post(int(post_id[5:])))
+        return 200, {"posts": posts}, {}
+
+    def _with_engagement(self, post: Dict) -> Dict:
+        """Created posts gain likes and comments as they age"""
+        age = (datetime.now() - datetime.fromisoformat(post["createdAt"])).total_seconds()
+        likes = int(math.sqrt(max(0.0, age)) * 3)
+        return {**post, "likeCount": likes, "commentCount": likes // 10}
+
+    def _create_post(self, payload: Dict, idempotency_key: Optional[str] = None) -> tuple:
+        # Lookup and insert share one lock section, so concurrent retries with a key create one post
+        with self.lock:
+            if idempotency_key:
+                post_id = self.idempotent_posts.get(idempotency_key)
+                if post_id:
+                    self.idempotent_replays += 1
+                    return 201, {"post": self.created_posts[post_id]}, {}
+
+            niche = payload.get("niche", "")
+            if niche in self.missing_niches or (niche != "General" and self._roll("niche")):
+                return 500, {"error": f"No profiles found with niche {niche}"}, {}
+            if not payload.get("media_type") or not payload.get("caption"):
+                return 400, {"error": "media_type and caption are required"}, {}
+
+            post = self._new_post(payload, niche)
+            self.created_posts[post["id"]] = post
+            if idempotency_key:
+                self.idempotent_posts[idempotency_key] = post["id"]
+        return 201, {"post": post}, {}
+
+    def _new_post(self, payload: Dict, niche: str) -> Dict:
+        post_id = f"fake-{next(self.post_counter)}"
+        return {
+            "id": post_id,
+            "postType": payload.get("media_type"),
+            "caption": payload.get("caption"),
+            "keywords": payload.get("keywords", []),
+            "niche": niche,
+            "mediaSource": payload.get("media_source"),
+            "likeCount": 0,
+            "commentCount": 0,
+            "createdAt": datetime.now().isoformat()
+        }
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _dispatch(self, method: str):
+                parsed = urlparse(self.path)
+                body = None
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    try:
+                        body = json.loads(self.rfile.read(length))
+                    except ValueError:
+                        body = None
+
+                delay = server.latency.sample()
+                if delay:
+                    time.sleep(delay)
+
+                status, response_body, extra_headers = server.handle(
+                    method, parsed.path, parse_qs(parsed.query), self.headers, body
+                )
+                server._record(parsed.path, status)
+
+                payload = json.dumps(response_body).encode() if response_body is not None else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in extra_headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self._dispatch("GET")
+
+            def do_POST(self):
+                self._dispatch("POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def _parse_error_rates(values: List[str]) -> Dict[str, float]:
+    rates = {}
+    for value in values:
+        key, _, rate = value.partition("=")
+        rates[key.strip()] = float(rate)
+    return rates
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Circlo API stand-in for load and latency testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--users", type=int, default=1000, help="synthetic user preference count")
+    parser.add_argument("--posts", type=int, default=1_000_000, help="synthetic post corpus size")
+    parser.add_argument("--latency", default="none",
+                        help="none | fixed:MS | uniform:MIN:MAX | normal:MEAN:STD | exponential:MEAN | "
+                             "lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--error", action="append", default=[], metavar="KIND=RATE",
+                        help="inject errors, e.g. 429=0.05, 500=0.01, 401=0.001, niche=0.2 (repeatable)")
+    parser.add_argument("--missing-niche", action="append", default=[],
+                        help="niche that always fails with 'No profiles found with niche'")
+    parser.add_argument("--token", default=None, help="require this bearer token")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    server = FakeCircloServer(
+        host=args.host, port=args.port, users=args.users, posts=args.posts, latency=args.latency,
+        error_rates=_parse_error_rates(args.error), missing_niches=args.missing_niche,
+        token=args.token, retry_after=args.retry_after, seed=args.seed
+    )
+    print(f"🧪 Fake Circlo API listening on {server.base_url}")
+    print(f"   👥 {args.users:,} users, 📝 {args.posts:,} posts, ⏱️ latency {args.latency}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Fake Circlo API stopped")
+        print(json.dumps(server.get_stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+import hashlib
+import json
+
+
+def stable_digest(*parts) -> str:
+    """SHA-256 hex digest of JSON-serializable parts, identical across processes and restarts"""
+    serialized = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str, separators=(",", ":"))
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()